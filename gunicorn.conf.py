@@ -1,11 +1,44 @@
 """Gunicorn settings."""
 
-# import multiprocessing
+import multiprocessing
+import os
 from os import getenv
+from typing import Any
 
-# workers = multiprocessing.cpu_count() * 2 + 1  # production
-workers = 2  # DEV ONLY!!!
-worker_class = "sync"
+# dev (default) - reload on changes, production - sized by CPUs, preloaded
+profile = getenv("GUNICORN_PROFILE", "dev")
+
+# wsgi - sync workers, asgi - uvicorn workers (for /api/plan/async/)
+interface = getenv("GUNICORN_INTERFACE", "wsgi")
+if interface == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "core.wsgi:application"
+    worker_class = "sync"
+
+# CPUs available to the container (cpuset), not all CPUs of the host
+try:
+    cpus = len(os.sched_getaffinity(0))
+except AttributeError:
+    cpus = multiprocessing.cpu_count()
+
+if profile == "production":
+    # an event loop keeps one CPU busy, sync workers wait for the DB
+    workers = cpus + 1 if interface == "asgi" else cpus * 2 + 1
+    threads = 4
+    # load and warm up the app before fork (shared copy-on-write)
+    preload_app = True
+    reload = False
+else:
+    workers = 2  # DEV ONLY!!!
+    threads = 4  # for each worker (use in threading, ignored by asgi)
+    # auto reload (uvicorn workers hang on reloading, restart them manually)
+    reload = interface == "wsgi"
+
+# explicit sizing (empty variables in .env are ignored)
+workers = int(getenv("GUNICORN_WORKERS") or workers)
+threads = int(getenv("GUNICORN_THREADS") or threads)
 
 timeout = 30  # in sec, for client requests
 
@@ -20,10 +53,37 @@ bind = f"{getenv('DJANGO_HOST', None)}:{getenv('DJANGO_PORT', None)}"
 
 # daemon = True
 
-threads = 4  # for each worker (use in threading)
-
 graceful_timeout = 30  # before forcing connections to close
 
-reload = True  # auto reload
-
 # secure_scheme_headers = {'X-FORWARDED-PROTO': 'https'}
+
+
+def when_ready(server: Any) -> None:
+    """Warm up the preloaded app in the master before forking workers."""
+    from core.warmup import format_memory, memory_usage, warm_up
+
+    if server.cfg.preload_app:
+        server.log.info("Application warmed up in %.2f s", warm_up())
+    server.log.info("Master memory: %s", format_memory(memory_usage()))
+
+
+def post_worker_init(worker: Any) -> None:
+    """Warm up the app in the worker unless the master did it."""
+    from core.warmup import format_memory, memory_usage, warm_up
+
+    if not worker.cfg.preload_app:
+        worker.log.info("Worker warmed up in %.2f s", warm_up())
+    worker.log.info(
+        "Worker %s memory: %s", worker.pid, format_memory(memory_usage())
+    )
+
+
+def worker_exit(server: Any, worker: Any) -> None:
+    """Report the memory of a worker stopped or recycled."""
+    from core.warmup import format_memory, memory_usage
+
+    server.log.info(
+        "Worker %s exits, memory: %s",
+        worker.pid,
+        format_memory(memory_usage()),
+    )
@@ -24,6 +24,19 @@ class CustomUserAdmin(UserAdmin):
     """Overridden User Admin model."""
 
     inlines = (ProfileInline,)
+    # автодополнение (менеджер проекта, фильтры) - по префиксу username,
+    # вместо icontains по имени, фамилии и email
+    autocomplete_search_fields = ("^username",)
+
+    def get_search_fields(
+        self,
+        request: HttpRequest,
+    ) -> list[str] | tuple[str, ...]:
+        """Search by the username prefix in the autocomplete view."""
+        match = request.resolver_match
+        if match and match.url_name == "autocomplete":
+            return self.autocomplete_search_fields
+        return super().get_search_fields(request)
 
     def get_inline_instances(
         self,
@@ -3,34 +3,127 @@
 from typing import Any, Generic, Type, TypeVar
 
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin.options import InlineModelAdmin
 from django.contrib.contenttypes.admin import GenericTabularInline
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import QuerySet
 from django.forms import Textarea
 from django.http.request import HttpRequest
 
+from app_plan.filters import AutocompleteListFilter, autocomplete_filter_media
 from app_plan.forms import StageInlineForm, TaskInlineForm
-from app_plan.formsets import StageInlineFormSet, TaskInlineFormSet
+from app_plan.formsets import (
+    PaginatedFormSetMixin,
+    PaginatedGenericInlineFormSet,
+    PaginatedInlineFormSet,
+    StageInlineFormSet,
+    TaskInlineFormSet,
+)
 from app_plan.models import (
     Artifact,
     Contact,
     Project,
     ProjectTeamMember,
     Stage,
+    StatusChoices,
     Task,
+    TaskDependency,
+)
+from app_plan.search import SEARCH_FIELDS, search_queryset
+from app_plan.services import transition_projects
+from app_plan.widgets import (
+    ProjectAutocompleteSelect,
+    SelectRelatedRawIdWidget,
 )
 
 ModelType = TypeVar("ModelType", bound=models.Model)
 
+# связи, которые разыменовывает __str__ этапов и задач
+STAGE_STR_RELATED = ("project", "responsible__user")
+TASK_STR_RELATED = (
+    "stage__project",
+    "stage__responsible__user",
+    "assignee__user",
+)
+
 custom_formfield_overrides: dict[Type[models.Field], dict[str, Any]] = {
     models.TextField: {"widget": Textarea(attrs={"rows": 2, "cols": 32})},
 }
 
 
+def is_autocomplete(request: HttpRequest) -> bool:
+    """Check whether the request is served by the autocomplete view."""
+    match = request.resolver_match
+    return bool(match and match.url_name == "autocomplete")
+
+
 class CommonModelAdmin(admin.ModelAdmin, Generic[ModelType]):
     """Implementation of common behavior of admin models."""
 
+    # поиск для виджетов автодополнения - по префиксу индексированных
+    # колонок, результаты упорядочены по ним же
+    autocomplete_search_fields: tuple[str, ...] = ()
+
+    @property
+    def media(self) -> forms.Media:
+        """Add scripts of the autocomplete list filters."""
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, tuple) and issubclass(
+                list_filter[1], AutocompleteListFilter
+            ):
+                return media + autocomplete_filter_media(self.admin_site)
+        return media
+
+    def get_search_fields(
+        self,
+        request: HttpRequest,
+    ) -> list[str] | tuple[str, ...]:
+        """Use the indexed search fields in the autocomplete view."""
+        if self.autocomplete_search_fields and is_autocomplete(request):
+            return self.autocomplete_search_fields
+        return super().get_search_fields(request)
+
+    def get_search_results(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+        search_term: str,
+    ) -> tuple[QuerySet, bool]:
+        """Search full-text indexes, prepare autocomplete results.
+
+        Autocomplete results are prepared for the index and for __str__.
+        """
+        autocomplete = is_autocomplete(request)
+        if search_term.strip() and not autocomplete:
+            if self.model in SEARCH_FIELDS:
+                return search_queryset(queryset, search_term), False
+
+        if autocomplete and self.autocomplete_search_fields:
+            # введенный текст - префикс целиком, а не набор слов
+            if search_term.strip() and '"' not in search_term:
+                search_term = f'"{search_term.strip()}"'
+
+        queryset, may_have_duplicates = super().get_search_results(
+            request,
+            queryset,
+            search_term,
+        )
+        if not autocomplete:
+            return queryset, may_have_duplicates
+
+        if isinstance(self.list_select_related, (list, tuple)):
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.autocomplete_search_fields:
+            ordering = [
+                name.lstrip("^=@") for name in self.autocomplete_search_fields
+            ]
+            queryset = queryset.order_by(*ordering, "pk")
+        return queryset, may_have_duplicates
+
     def get_readonly_fields(
         self,
         request: HttpRequest,
@@ -62,31 +155,71 @@ class CommonModelAdmin(admin.ModelAdmin, Generic[ModelType]):
         return excluded
 
 
-class ArtifactInline(GenericTabularInline):
+class PaginatedInlineMixin(InlineModelAdmin):
+    """Inline that renders one page of the related objects.
+
+    The cost of a change page does not depend on the size of the
+    object: every inline shows at most ``per_page`` rows and links to
+    its other pages.
+    """
+
+    template = "admin/app_plan/edit_inline/paginated_tabular.html"
+    # размер страницы, по умолчанию из настроек
+    per_page: int | None = None
+
+    def get_formset(
+        self,
+        request: HttpRequest,
+        obj: Any | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Pass the requested page to the formset class."""
+        formset = super().get_formset(request, obj, **kwargs)
+        if issubclass(formset, PaginatedFormSetMixin):
+            prefix = formset.get_default_prefix()
+            formset.page_number = request.GET.get(f"{prefix}-page")
+            formset.query = request.GET
+            if self.per_page:
+                formset.per_page = self.per_page
+        return formset
+
+
+class ArtifactInline(PaginatedInlineMixin, GenericTabularInline):
     """Inline Artifact representation."""
 
     model = Artifact
+    formset = PaginatedGenericInlineFormSet  # type: ignore[assignment]
     extra = 1  # кол-во пустых форм для добавления
     formfield_overrides = custom_formfield_overrides
 
 
-class ProjectTeamMemberInline(admin.TabularInline):
+class ProjectTeamMemberInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline Project Team management."""
 
     model = ProjectTeamMember
+    formset = PaginatedInlineFormSet
     extra = 1
+    autocomplete_fields = ("user",)
     verbose_name = "Teammate"
     verbose_name_plural = "Project Team"
 
+    def get_queryset(
+        self,
+        request: HttpRequest,
+    ) -> QuerySet[ProjectTeamMember]:
+        """Join users shown in the rows' titles."""
+        return super().get_queryset(request).select_related("user")
 
-class ContactInline(admin.TabularInline):
+
+class ContactInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline Project Contacts management."""
 
     model = Contact
+    formset = PaginatedInlineFormSet
     extra = 1
 
 
-class StageInline(admin.TabularInline):
+class StageInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline Stages representation. Use as inner block for a Projects."""
 
     model = Stage
@@ -97,8 +230,14 @@ class StageInline(admin.TabularInline):
     fields = ("name", "responsible", "date_start", "date_end", "status")
     readonly_fields = ("completion_percentage",)
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Stage]:
+        """Join responsible users shown in the rows' titles."""
+        return (
+            super().get_queryset(request).select_related("responsible__user")
+        )
+
 
-class TaskInline(admin.TabularInline):
+class TaskInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline Task representation."""
 
     model = Task
@@ -107,6 +246,38 @@ class TaskInline(admin.TabularInline):
     extra = 1
     fields = ("name", "assignee", "date_start", "date_end", "status")
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Task]:
+        """Join assigned users shown in the rows' titles."""
+        return super().get_queryset(request).select_related("assignee__user")
+
+
+class TaskDependencyInline(admin.TabularInline):
+    """Inline predecessors of a task."""
+
+    model = TaskDependency
+    fk_name = "successor"
+    extra = 1
+    raw_id_fields = ("predecessor",)  # задач в проекте может быть очень много
+    fields = ("predecessor", "lag_days")
+    verbose_name = "Predecessor"
+    verbose_name_plural = "Predecessors (finish-to-start)"
+
+    def formfield_for_foreignkey(
+        self,
+        db_field: models.ForeignKey,
+        request: HttpRequest,
+        **kwargs: Any,
+    ) -> forms.ModelChoiceField | None:
+        """Load the predecessor label with its relations in one query."""
+        if db_field.name == "predecessor":
+            kwargs["widget"] = SelectRelatedRawIdWidget(
+                db_field.remote_field,
+                self.admin_site,
+                using=kwargs.get("using"),
+                select_related=TASK_STR_RELATED,
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 
 @admin.register(Project)
 class ProjectAdmin(CommonModelAdmin):
@@ -120,9 +291,13 @@ class ProjectAdmin(CommonModelAdmin):
         "date_end",
         "completion_percentage",
     )
-    list_filter = ("status", "manager")
+    list_select_related = ("manager",)
+    list_filter = ("status", ("manager", AutocompleteListFilter))
     search_fields = ("name", "description")
+    autocomplete_search_fields = ("^name",)
+    autocomplete_fields = ("manager",)
     formfield_overrides = custom_formfield_overrides
+    actions = ("complete_projects", "archive_projects")
 
     # встраиваем управление командой, этапами, контактами и артефактами
     inlines = (
@@ -174,6 +349,42 @@ class ProjectAdmin(CommonModelAdmin):
                 inlines.append(inline_cls(self.model, self.admin_site))
         return inlines
 
+    def _transition(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet[Project],
+        status: str,
+    ) -> None:
+        """Cascade the status to selected projects, stages and tasks."""
+        affected = transition_projects(
+            list(queryset.values_list("pk", flat=True)),
+            status,
+        )
+        self.message_user(
+            request,
+            f"Updated {affected['projects']} projects, "
+            f"{affected['stages']} stages and {affected['tasks']} tasks.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Complete selected projects (cascade)")
+    def complete_projects(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet[Project],
+    ) -> None:
+        """Mark projects with all stages and tasks as completed."""
+        self._transition(request, queryset, StatusChoices.COMPLETED)
+
+    @admin.action(description="Archive selected projects (cascade)")
+    def archive_projects(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet[Project],
+    ) -> None:
+        """Archive projects with all stages and tasks."""
+        self._transition(request, queryset, StatusChoices.ARCHIVED)
+
 
 @admin.register(Stage)
 class StageAdmin(CommonModelAdmin):
@@ -188,8 +399,15 @@ class StageAdmin(CommonModelAdmin):
         "date_end",
         "completion_percentage",
     )
-    list_filter = ("status", "project", "responsible")
+    list_select_related = STAGE_STR_RELATED
+    list_filter = (
+        "status",
+        ("project", AutocompleteListFilter),
+        ("responsible", AutocompleteListFilter),
+    )
     search_fields = ("name",)
+    autocomplete_search_fields = ("^name",)
+    autocomplete_fields = ("project", "responsible")
     formfield_overrides = custom_formfield_overrides
 
     # встраиваем управление задачами и артефактами
@@ -222,6 +440,10 @@ class StageAdmin(CommonModelAdmin):
         Show only the current project's participants.
         """
         if db_field.name == "responsible":
+            # __str__ участника выводит имя пользователя
+            kwargs["queryset"] = ProjectTeamMember.objects.select_related(
+                "user"
+            )
             # Пытаемся получить ID объекта из URL, чтобы найти проект
             # Это сработает на странице редактирования существующего этапа
             if not request.resolver_match:
@@ -234,12 +456,20 @@ class StageAdmin(CommonModelAdmin):
             stage_id = request.resolver_match.kwargs.get("object_id")
             if stage_id:
                 try:
-                    stage = Stage.objects.get(pk=stage_id)
+                    project_id = Stage.objects.values_list(
+                        "project_id", flat=True
+                    ).get(pk=stage_id)
                     # фильтр по проекту, к которому относится этап
-                    kwargs["queryset"] = ProjectTeamMember.objects.filter(
-                        project=stage.project,
+                    kwargs["queryset"] = kwargs["queryset"].filter(
+                        project_id=project_id,
                     )
-                except Stage.DoesNotExist:
+                    kwargs["widget"] = ProjectAutocompleteSelect(
+                        db_field,
+                        self.admin_site,
+                        project_id=project_id,
+                        using=kwargs.get("using"),
+                    )
+                except (Stage.DoesNotExist, ValidationError):
                     pass
 
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -283,15 +513,19 @@ class TaskAdmin(CommonModelAdmin):
         "date_start",
         "date_end",
     )
+    # колонка "stage" выводит __str__ этапа со всеми его связями
+    list_select_related = TASK_STR_RELATED
     list_filter = (
         "status",
-        "assignee",
+        ("stage", AutocompleteListFilter),
+        ("assignee", AutocompleteListFilter),
     )
     search_fields = ("name",)
+    autocomplete_fields = ("stage", "assignee")
     formfield_overrides = custom_formfield_overrides
 
-    # встраиваем управление артефактами
-    inlines = (ArtifactInline,)
+    # встраиваем управление зависимостями и артефактами
+    inlines = (TaskDependencyInline, ArtifactInline)
 
     def formfield_for_foreignkey(
         self,
@@ -303,7 +537,16 @@ class TaskAdmin(CommonModelAdmin):
 
         Show only the current project's participants.
         """
+        if db_field.name == "stage":
+            # __str__ этапа выводит проект и ответственного
+            kwargs["queryset"] = Stage.objects.select_related(
+                *STAGE_STR_RELATED
+            )
+
         if db_field.name == "assignee":
+            kwargs["queryset"] = ProjectTeamMember.objects.select_related(
+                "user"
+            )
             if not request.resolver_match:
                 return super().formfield_for_foreignkey(
                     db_field,
@@ -314,26 +557,91 @@ class TaskAdmin(CommonModelAdmin):
             task_id = request.resolver_match.kwargs.get("object_id")
             if task_id:
                 try:
-                    task = Task.objects.get(pk=task_id)
+                    project_id = Task.objects.values_list(
+                        "stage__project_id", flat=True
+                    ).get(pk=task_id)
                     # фильтр по проекту, к которому относится этап задачи
-                    kwargs["queryset"] = ProjectTeamMember.objects.filter(
-                        project=task.stage.project,
+                    kwargs["queryset"] = kwargs["queryset"].filter(
+                        project_id=project_id,
+                    )
+                    kwargs["widget"] = ProjectAutocompleteSelect(
+                        db_field,
+                        self.admin_site,
+                        project_id=project_id,
+                        using=kwargs.get("using"),
                     )
-                except Task.DoesNotExist:
+                except (Task.DoesNotExist, ValidationError):
                     pass
 
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
+@admin.register(ProjectTeamMember)
+class ProjectTeamMemberAdmin(CommonModelAdmin):
+    """Project Team member Admin model."""
+
+    list_display = ("user", "project", "role")
+    list_select_related = ("user", "project")
+    list_filter = (("project", AutocompleteListFilter),)
+    search_fields = ("user__username", "project__name", "role")
+    autocomplete_search_fields = ("^user__username",)
+    autocomplete_fields = ("project", "user")
+
+    def get_search_results(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+        search_term: str,
+    ) -> tuple[QuerySet, bool]:
+        """Search among the members of one project if it is given.
+
+        The project is passed by ProjectAutocompleteSelect widgets.
+        """
+        queryset, may_have_duplicates = super().get_search_results(
+            request,
+            queryset,
+            search_term,
+        )
+        project_id = request.GET.get("project")
+        if project_id and is_autocomplete(request):
+            try:
+                queryset = queryset.filter(project_id=project_id)
+            except ValidationError:
+                queryset = queryset.none()
+        return queryset, may_have_duplicates
+
+
 @admin.register(Artifact)
 class ArtifactAdmin(CommonModelAdmin):
     """Artifact Admin model."""
 
-    ...
+    list_display = ("title", "content_type", "content_object", "created_at")
+    list_select_related = ("content_type",)
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Artifact]:
+        """Prefetch the objects of the generic relation by content type.
+
+        A generic foreign key can not be joined: objects of every type
+        are loaded with one query, with the relations their __str__ uses.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                GenericPrefetch(
+                    "content_object",
+                    [
+                        Project.objects.all(),
+                        Stage.objects.select_related(*STAGE_STR_RELATED),
+                        Task.objects.select_related("stage", "assignee__user"),
+                    ],
+                )
+            )
+        )
 
 
 @admin.register(Contact)
 class ContactAdmin(CommonModelAdmin):
     """Contact Admin model."""
 
-    ...
+    search_fields = ("full_name", "role")
@@ -8,3 +8,7 @@ class AppPlanConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "app_plan"
+
+    def ready(self) -> None:
+        """Import signals when the app is ready."""
+        import app_plan.dj_signals  # noqa
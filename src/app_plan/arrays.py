@@ -0,0 +1,50 @@
+"""Helpers for loading ORM data into NumPy arrays."""
+
+from datetime import date
+from typing import Any, Sequence
+
+import numpy as np
+from django.db import connections
+from django.db.models import QuerySet
+
+
+def fetch_columns(queryset: QuerySet, width: int) -> list[tuple]:
+    """Execute a values_list queryset and return its columns.
+
+    The rows are read from the cursor directly: ORM conversion of every
+    UUID key dominates the load time of large result sets, while the
+    keys are mostly needed only to match rows with each other.
+
+    Args:
+        queryset (QuerySet): values_list queryset.
+        width (int): Number of selected columns.
+
+    Returns:
+        list[tuple]: Raw database values column by column.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return list(zip(*rows)) or [()] * width
+
+
+def date_ordinals(values: Sequence[date]) -> np.ndarray:
+    """Convert dates to an array of proleptic Gregorian ordinals."""
+    return np.fromiter(
+        map(date.toordinal, values),
+        dtype=np.int64,
+        count=len(values),
+    )
+
+
+def index_of(keys: np.ndarray, values: Sequence[Any]) -> np.ndarray:
+    """Return positions of values in keys, -1 for missing values."""
+    if not len(keys) or not len(values):
+        return np.full(len(values), -1, dtype=np.int64)
+
+    wanted = np.array(values)
+    sorter = np.argsort(keys)
+    found = np.searchsorted(keys, wanted, sorter=sorter)
+    positions = sorter[np.minimum(found, len(keys) - 1)]
+    return np.where(keys[positions] == wanted, positions, -1)
@@ -0,0 +1,204 @@
+"""Async variants of the read-heavy API endpoints.
+
+Under an ASGI server (see ``gunicorn.conf.py``) waiting for the database
+or the cache does not hold a worker thread, so one worker serves many
+polling clients at once. The responses are the same as the ones of the
+DRF endpoints, and the cache and conditional GET validators are shared
+with them. Only JSON is rendered, the project list is paginated by page
+numbers only. Like the DRF endpoints they read from replicas when those
+are configured (see ``core.db.routers``).
+"""
+
+from typing import Any, cast
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from app_plan.cache import aget_or_build
+from app_plan.conditional import aproject_validators
+from app_plan.models import Artifact, Project
+from app_plan.serializers import (
+    CalendarQuerySerializer,
+    CalendarSerializer,
+    ProjectDetailSerializer,
+    ProjectListSerializer,
+    ProjectTreeSerializer,
+)
+from app_plan.views import CalendarView, ProjectViewSet
+from core.db.routers import use_replicas
+
+PROJECT_NOT_FOUND = "No Project matches the given query."
+
+
+class AsyncJSONView(View):
+    """Base of the async endpoints rendering JSON like DRF does."""
+
+    http_method_names = ["get", "options"]
+    renderer = JSONRenderer()
+
+    def render(self, data: Any, status: int = 200) -> HttpResponse:
+        """Return data rendered by the DRF JSON renderer."""
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status,
+        )
+
+
+class AsyncProjectListView(AsyncJSONView):
+    """Projects with completion percentages, page by page."""
+
+    @use_replicas
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """Return a page of projects (the ``page`` query parameter)."""
+        # проценты выполнения - по хранимым счетчикам этапов, без JOIN
+        queryset = ProjectViewSet.queryset
+        page_size = cast(int, api_settings.PAGE_SIZE)
+        count = await queryset.acount()
+        try:
+            number = int(request.GET.get("page", 1))
+        except ValueError:
+            number = 0
+        offset, end = (number - 1) * page_size, number * page_size
+        if number < 1 or (number > 1 and offset >= count):
+            return self.render({"detail": "Invalid page."}, status=404)
+
+        projects = [project async for project in queryset[offset:end]]
+        url = request.build_absolute_uri()
+        previous = None
+        if number == 2:
+            previous = remove_query_param(url, "page")
+        elif number > 2:
+            previous = replace_query_param(url, "page", number - 1)
+        return self.render(
+            {
+                "count": count,
+                "next": (
+                    replace_query_param(url, "page", number + 1)
+                    if end < count
+                    else None
+                ),
+                "previous": previous,
+                "results": ProjectListSerializer(
+                    projects, many=True, context={"request": request}
+                ).data,
+            }
+        )
+
+
+class AsyncProjectView(AsyncJSONView):
+    """Cached project representation with conditional GET support."""
+
+    # название представления в кэше (см. CACHED_VIEWS)
+    name = "detail"
+
+    @use_replicas
+    async def get(self, request: HttpRequest, pk: str) -> HttpResponse:
+        """Return the representation or 304 if the client has it."""
+        try:
+            project_id = UUID(pk)
+        except ValueError:
+            return self.render({"detail": "Not found."}, status=404)
+
+        validators = await aproject_validators(project_id, f"{self.name}:json")
+        if validators is None:
+            return self.render({"detail": PROJECT_NOT_FOUND}, status=404)
+
+        last_modified = int(validators.last_modified.timestamp())
+        not_modified = get_conditional_response(
+            request,
+            etag=validators.etag,
+            last_modified=last_modified,
+        )
+        if not_modified is not None:
+            response = HttpResponse(status=not_modified.status_code)
+        else:
+            # ключ кэша тот же, что у синхронного представления
+            origin = f"{request.scheme}://{request.get_host()}"
+            try:
+                data = await aget_or_build(
+                    project_id,
+                    self.name,
+                    origin,
+                    lambda: self.build(request, project_id),
+                    settings.PLAN_PROJECT_CACHE_TIMEOUT,
+                )
+            except Project.DoesNotExist:
+                return self.render({"detail": PROJECT_NOT_FOUND}, status=404)
+            response = self.render(data)
+
+        response["ETag"] = validators.etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    async def build(self, request: HttpRequest, project_id: UUID) -> Any:
+        """Serialize the project details."""
+        project = await ProjectViewSet.queryset.prefetch_related("team").aget(
+            pk=project_id
+        )
+        return ProjectDetailSerializer(
+            project, context={"request": request}
+        ).data
+
+
+class AsyncProjectTreeView(AsyncProjectView):
+    """Cached project hierarchy with conditional GET support."""
+
+    name = "tree"
+
+    async def build(self, request: HttpRequest, project_id: UUID) -> Any:
+        """Serialize the project hierarchy in a fixed number of queries."""
+        queryset = ProjectViewSet.queryset.with_tree()  # type: ignore
+        project = await queryset.aget(pk=project_id)
+
+        # артефакты всех уровней - одним запросом, сгруппированные по объекту
+        artifacts: dict = {}
+        # типы содержимого при первом обращении загружаются синхронно
+        tree_artifacts = await sync_to_async(
+            Artifact.objects.for_project_tree  # type: ignore[attr-defined]
+        )(project_id)
+        async for artifact in tree_artifacts:
+            artifacts.setdefault(artifact.object_id, []).append(artifact)
+
+        return ProjectTreeSerializer(
+            project,
+            context={"request": request, "artifacts": artifacts},
+        ).data
+
+
+class AsyncCalendarView(AsyncJSONView):
+    """Stages and tasks overlapping a date window."""
+
+    @use_replicas
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """Return stages and tasks scheduled between date_from and date_to.
+
+        Takes the same query parameters as the synchronous calendar.
+        """
+        query = CalendarQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return self.render(query.errors, status=400)
+        params = query.validated_data
+
+        serializer = CalendarSerializer(
+            {
+                "date_from": params["date_from"],
+                "date_to": params["date_to"],
+                "stages": [
+                    stage async for stage in CalendarView.get_stages(params)
+                ],
+                "tasks": [
+                    task async for task in CalendarView.get_tasks(params)
+                ],
+            }
+        )
+        return self.render(serializer.data)
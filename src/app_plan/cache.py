@@ -0,0 +1,179 @@
+"""Versioned cache of serialized project data.
+
+Every project (and the organization as a whole) has a version number
+in the cache. Cached representations - project detail, tree, workload -
+are stored under keys containing the version, so bumping the version
+makes all of them stale at once without knowing their keys. Versions
+are bumped by the signals in ``app_plan.dj_signals`` and by the
+set-based operations in ``app_plan.services``.
+
+Cached data is always built from the primary database: a replica may
+still lag behind the commit which bumped the version, and its data would
+stay in the cache under the new version.
+
+Hits, misses and invalidations are counted in the cache itself, so the
+numbers are shared by all workers (see ``cache_stats``).
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db.routers import replica_reads
+from core.shared_counters import increment
+
+# область кэша, общая для всей организации
+ORGANIZATION = "all"
+
+# кэшируемые представления
+CACHED_VIEWS = ("detail", "tree", "workload")
+
+INVALIDATIONS = "invalidations"
+
+
+def get_or_build(
+    scope: Any,
+    name: str,
+    suffix: str,
+    build: Callable[[], Any],
+    timeout: int,
+) -> Any:
+    """Return data from the cache or build and cache it.
+
+    Args:
+        scope (Any): Project id or ORGANIZATION.
+        name (str): One of CACHED_VIEWS.
+        suffix (str): Distinguishes variants of the representation.
+        build (Callable[[], Any]): Builds the data on a miss.
+        timeout (int): Lifetime of the cached data in seconds.
+    """
+    key, data = _lookup(scope, name, suffix)
+    if data is None:
+        # версия может быть уже новой, а реплика - еще отставать
+        with replica_reads(False):
+            data = build()
+        cache.set(key, data, timeout)
+    return data
+
+
+async def aget_or_build(
+    scope: Any,
+    name: str,
+    suffix: str,
+    build: Callable[[], Awaitable[Any]],
+    timeout: int,
+) -> Any:
+    """Async variant of ``get_or_build`` with an async ``build``.
+
+    Shares the cached data with ``get_or_build``. Cache backends are
+    synchronous, so the lookup runs in a thread.
+    """
+    key, data = await sync_to_async(_lookup)(scope, name, suffix)
+    if data is None:
+        with replica_reads(False):
+            data = await build()
+        await cache.aset(key, data, timeout)
+    return data
+
+
+def invalidate_projects(project_ids: Iterable[Any]) -> None:
+    """Make cached data of the projects and the organization stale.
+
+    The versions change after the current transaction is committed, so
+    a concurrent request can not cache old data under the new version.
+    """
+    scopes = {str(project_id) for project_id in project_ids}
+    if not scopes:
+        return
+
+    def bump() -> None:
+        cache.set_many(
+            dict.fromkeys(
+                map(_version_key, (*scopes, ORGANIZATION)),
+                time.time_ns(),
+            ),
+            timeout=None,
+        )
+        increment(_stat_key(INVALIDATIONS), len(scopes))
+
+    transaction.on_commit(bump)
+
+
+def project_version(project_id: Any) -> int:
+    """Return the cache version of a project.
+
+    The version is the time of its last invalidation in nanoseconds, so
+    it also changes on edits which leave no ``updated_at`` in the
+    project subtree, such as renaming a user.
+    """
+    return _version(str(project_id))
+
+
+def cache_stats() -> dict[str, Any]:
+    """Return hits, misses and hit ratio per view and invalidations."""
+    values = cache.get_many([_stat_key(name) for name in _stat_names()])
+
+    def value(name: str) -> int:
+        return values.get(_stat_key(name), 0)
+
+    stats: dict[str, Any] = {}
+    for view in CACHED_VIEWS:
+        hits, misses = value(f"hits:{view}"), value(f"misses:{view}")
+        total = hits + misses
+        stats[view] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    stats[INVALIDATIONS] = value(INVALIDATIONS)
+    return stats
+
+
+def reset_cache_stats() -> None:
+    """Reset the hit/miss and invalidation counters."""
+    cache.delete_many([_stat_key(name) for name in _stat_names()])
+
+
+def _lookup(scope: Any, name: str, suffix: str) -> tuple[str, Any]:
+    """Return the key of the current version and the cached data or None."""
+    key = f"plan:{name}:{scope}:{_version(scope)}:{suffix}"
+    data = cache.get(key)
+    increment(_stat_key(f"{'misses' if data is None else 'hits'}:{name}"))
+    return key, data
+
+
+def _version(scope: Any) -> int:
+    """Return the current version of a scope, starting a new one if lost.
+
+    A version evicted from the cache is replaced by the current time,
+    never by a number used before.
+    """
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def _version_key(scope: Any) -> str:
+    """Return the cache key holding the version of a scope."""
+    return f"plan:version:{scope}"
+
+
+def _stat_key(name: str) -> str:
+    """Return the cache key of a counter."""
+    return f"plan:stats:{name}"
+
+
+def _stat_names() -> list[str]:
+    """Return names of all counters."""
+    names = [
+        f"{kind}:{view}"
+        for view in CACHED_VIEWS
+        for kind in ("hits", "misses")
+    ]
+    return [*names, INVALIDATIONS]
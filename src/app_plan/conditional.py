@@ -0,0 +1,144 @@
+"""Validators for conditional GET of project representations.
+
+The ETag and Last-Modified of a project are derived from its whole
+subtree: the latest ``updated_at`` of the project, its stages, tasks,
+team members, contacts and artifacts. Row counts of the child tables are
+mixed into the ETag because deleting a child does not change any
+``updated_at``. Everything is computed by one query with scalar
+subqueries, without loading the objects.
+
+Related users have no ``updated_at``: their changes are reflected by
+the cache version of the project (see ``app_plan.cache``), which is
+mixed into both validators.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import (
+    F,
+    Func,
+    IntegerField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+)
+
+from app_plan.cache import project_version
+from app_plan.models import (
+    Artifact,
+    Contact,
+    Project,
+    ProjectTeamMember,
+    Stage,
+    Task,
+)
+
+
+class Validators(NamedTuple):
+    """Conditional request validators of a project."""
+
+    etag: str
+    last_modified: datetime
+
+
+def project_validators(project_id: Any, variant: str) -> Validators | None:
+    """Return the ETag and Last-Modified of the project subtree.
+
+    Args:
+        project_id (Any): Primary key of the project.
+        variant (str): Representation (e.g. "tree:json"), part of the ETag.
+
+    Returns:
+        Validators | None: None if the project does not exist.
+    """
+    children: dict[str, QuerySet] = {
+        "stages": Stage.objects.filter(project_id=OuterRef("pk")),
+        "tasks": Task.objects.filter(stage__project_id=OuterRef("pk")),
+        "team": ProjectTeamMember.objects.filter(project_id=OuterRef("pk")),
+        "contacts": Contact.objects.filter(project_id=OuterRef("pk")),
+        "artifacts": _subtree_artifacts(),
+    }
+    annotations: dict[str, Subquery] = {}
+    for name, queryset in children.items():
+        queryset = queryset.order_by()
+        annotations[f"{name}_changed"] = _aggregate(
+            queryset,
+            Func(F("updated_at"), function="MAX"),
+        )
+        annotations[f"{name}_count"] = _aggregate(
+            queryset,
+            Func(F("pk"), function="COUNT", output_field=IntegerField()),
+        )
+
+    row = (
+        Project.objects.filter(pk=project_id)
+        .annotate(**annotations)
+        .values("updated_at", *annotations)
+        .first()
+    )
+    if row is None:
+        return None
+
+    # версия кэша - время последней инвалидации проекта
+    row["version"] = project_version(project_id)
+    invalidated = datetime.fromtimestamp(row["version"] / 1e9, tz=timezone.utc)
+    last_modified = max(
+        invalidated,
+        *(value for value in row.values() if isinstance(value, datetime)),
+    )
+    state = "|".join(f"{key}={row[key]}" for key in sorted(row))
+    digest = hashlib.sha1(
+        f"{variant}|{state}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return Validators(f'"{digest}"', last_modified)
+
+
+async def aproject_validators(
+    project_id: Any,
+    variant: str,
+) -> Validators | None:
+    """Async variant of ``project_validators``.
+
+    The query is built and executed in one call in a thread: content
+    types are loaded synchronously, and the async ORM would run the
+    query in a thread as well.
+    """
+    return await sync_to_async(project_validators)(project_id, variant)
+
+
+def _subtree_artifacts() -> QuerySet:
+    """Build a subquery of artifacts of a project, its stages and tasks."""
+    get_ct = ContentType.objects.get_for_model
+    project_id = OuterRef(OuterRef("pk"))
+    # для вложенных подзапросов внешний запрос - сами артефакты
+    return Artifact.objects.filter(
+        Q(content_type=get_ct(Project), object_id=OuterRef("pk"))
+        | Q(
+            content_type=get_ct(Stage),
+            object_id__in=Stage.objects.filter(project_id=project_id).values(
+                "pk"
+            ),
+        )
+        | Q(
+            content_type=get_ct(Task),
+            object_id__in=Task.objects.filter(
+                stage__project_id=project_id
+            ).values("pk"),
+        )
+    )
+
+
+def _aggregate(queryset: QuerySet, function: Func) -> Subquery:
+    """Aggregate the whole subquery into one value.
+
+    Aggregate functions are wrapped in Func instead of Aggregate: Django
+    adds no GROUP BY, and the subquery returns a single row for any
+    filter.
+    """
+    return Subquery(queryset.annotate(value=function).values("value"))
@@ -0,0 +1,131 @@
+"""Stored completion counters for projects and stages.
+
+The counters are kept in sync incrementally by the signals in
+``app_plan.dj_signals``. Set-based operations that bypass signals
+(``bulk_create``, ``QuerySet.update``) must call the ``recount_*``
+functions for the affected parents.
+"""
+
+from typing import Any, Iterable, NamedTuple
+
+from django.db import models
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from app_plan.models import Project, Stage, StatusChoices, Task
+
+
+class CounterSpec(NamedTuple):
+    """Description of the counters a child model contributes to."""
+
+    parent_field: str
+    parent_model: type[models.Model]
+    total_field: str
+    completed_field: str
+
+
+COUNTER_SPECS: dict[type[models.Model], CounterSpec] = {
+    Task: CounterSpec("stage_id", Stage, "tasks_total", "tasks_completed"),
+    Stage: CounterSpec(
+        "project_id",
+        Project,
+        "stages_total",
+        "stages_completed",
+    ),
+}
+
+
+def shift_counters(
+    child_model: type[models.Model],
+    parent_id: Any,
+    total: int,
+    completed: int,
+) -> None:
+    """Atomically shift the counters of a single parent object.
+
+    Args:
+        child_model (type[models.Model]): Task or Stage.
+        parent_id (Any): Primary key of the parent Stage or Project.
+        total (int): Delta for the total counter.
+        completed (int): Delta for the completed counter.
+    """
+    if not (total or completed) or parent_id is None:
+        return
+
+    spec = COUNTER_SPECS[child_model]
+    spec.parent_model._default_manager.filter(pk=parent_id).update(
+        **{
+            spec.total_field: _shifted(spec.total_field, total),
+            spec.completed_field: _shifted(spec.completed_field, completed),
+        }
+    )
+
+
+def _shifted(field: str, delta: int) -> Case:
+    """Return the counter shifted by delta, not below zero.
+
+    The sum is not computed when it would be negative: on UNSIGNED
+    columns MariaDB fails with error 1690 (value out of range) before
+    GREATEST could clamp it.
+    """
+    return Case(
+        When(**{f"{field}__gte": -delta}, then=F(field) + delta),
+        default=Value(0),
+    )
+
+
+def _recount(
+    child_model: type[models.Model],
+    parent_ids: Iterable[Any] | None = None,
+) -> int:
+    """Rebuild the counters of parents from their children in one UPDATE."""
+    spec = COUNTER_SPECS[child_model]
+    parent_field = spec.parent_field.removesuffix("_id")
+
+    counts = (
+        child_model._default_manager.filter(**{parent_field: OuterRef("pk")})
+        .order_by()
+        .values(parent_field)
+    )
+    total = counts.annotate(cnt=Count("pk")).values("cnt")
+    completed = counts.annotate(
+        cnt=Count("pk", filter=Q(status=StatusChoices.COMPLETED))
+    ).values("cnt")
+
+    parents = spec.parent_model._default_manager.all()
+    if parent_ids is not None:
+        parents = parents.filter(pk__in=list(parent_ids))
+
+    return parents.update(
+        **{
+            spec.total_field: Coalesce(Subquery(total), 0),
+            spec.completed_field: Coalesce(Subquery(completed), 0),
+        }
+    )
+
+
+def recount_stage_counters(stage_ids: Iterable[Any] | None = None) -> int:
+    """Rebuild task counters of the given stages (all if None).
+
+    Returns:
+        int: Number of updated stages.
+    """
+    return _recount(Task, stage_ids)
+
+
+def recount_project_counters(project_ids: Iterable[Any] | None = None) -> int:
+    """Rebuild stage counters of the given projects (all if None).
+
+    Returns:
+        int: Number of updated projects.
+    """
+    return _recount(Stage, project_ids)
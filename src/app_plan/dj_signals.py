@@ -0,0 +1,261 @@
+"""Django signals for app_plan."""
+
+from typing import Any, Type
+
+from django.apps import AppConfig
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from app_auth.models import User
+from app_plan.cache import invalidate_projects
+from app_plan.counters import COUNTER_SPECS, shift_counters
+from app_plan.models import (
+    Artifact,
+    Contact,
+    Project,
+    ProjectTeamMember,
+    Stage,
+    StatusChoices,
+    Task,
+)
+from app_plan.search import ensure_sqlite_indexes
+
+
+def _counter_state(parent_id: Any, status: str) -> tuple[Any, int]:
+    """Return the parent id and the completed flag of a counted object."""
+    return parent_id, int(status == StatusChoices.COMPLETED)
+
+
+@receiver(signal=pre_save, sender=Stage)
+@receiver(signal=pre_save, sender=Task)
+def remember_counter_state(
+    sender: Type[Stage | Task],
+    instance: Stage | Task,
+    **kwargs: Any,
+) -> None:
+    """Remember the stored parent and status before the object is updated.
+
+    Args:
+        sender (Type[Stage | Task]): Model class.
+        instance (Stage | Task): Instance that is about to be saved.
+    """
+    instance._counter_state = None  # type: ignore
+    if instance._state.adding:
+        return
+
+    parent_field = COUNTER_SPECS[sender].parent_field
+    stored = (
+        sender._default_manager.filter(pk=instance.pk)
+        .values_list(parent_field, "status")
+        .first()
+    )
+    if stored:
+        instance._counter_state = _counter_state(*stored)  # type: ignore
+
+
+@receiver(signal=post_save, sender=Stage)
+@receiver(signal=post_save, sender=Task)
+def update_counters_on_save(
+    sender: Type[Stage | Task],
+    instance: Stage | Task,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Keep the parent counters in sync on create, status change, reparent.
+
+    Args:
+        sender (Type[Stage | Task]): Model class.
+        instance (Stage | Task): Saved instance.
+        created (bool): True if the object was created for the first time.
+    """
+    spec = COUNTER_SPECS[sender]
+    parent_id, completed = _counter_state(
+        getattr(instance, spec.parent_field),
+        instance.status,
+    )
+    previous = getattr(instance, "_counter_state", None)
+
+    if created or previous is None:
+        shift_counters(sender, parent_id, 1, completed)
+        return
+
+    prev_parent_id, prev_completed = previous
+    if prev_parent_id == parent_id:
+        shift_counters(sender, parent_id, 0, completed - prev_completed)
+        return
+
+    # объект перенесен в другой этап/проект
+    shift_counters(sender, prev_parent_id, -1, -prev_completed)
+    shift_counters(sender, parent_id, 1, completed)
+
+
+@receiver(signal=post_delete, sender=Stage)
+@receiver(signal=post_delete, sender=Task)
+def update_counters_on_delete(
+    sender: Type[Stage | Task],
+    instance: Stage | Task,
+    **kwargs: Any,
+) -> None:
+    """Decrease the parent counters after the object is deleted.
+
+    Args:
+        sender (Type[Stage | Task]): Model class.
+        instance (Stage | Task): Deleted instance.
+    """
+    parent_id, completed = _counter_state(
+        getattr(instance, COUNTER_SPECS[sender].parent_field),
+        instance.status,
+    )
+    shift_counters(sender, parent_id, -1, -completed)
+
+
+@receiver(signal=post_save, sender=Stage)
+@receiver(signal=post_save, sender=Task)
+@receiver(signal=post_delete, sender=Stage)
+@receiver(signal=post_delete, sender=Task)
+def invalidate_plan_item_cache(
+    sender: Type[Stage | Task],
+    instance: Stage | Task,
+    **kwargs: Any,
+) -> None:
+    """Make cached data of the affected projects stale.
+
+    Args:
+        sender (Type[Stage | Task]): Model class.
+        instance (Stage | Task): Saved or deleted instance.
+    """
+    parent_ids = {getattr(instance, COUNTER_SPECS[sender].parent_field)}
+    previous = getattr(instance, "_counter_state", None)
+    if previous:
+        # при переносе устаревают оба проекта
+        parent_ids.add(previous[0])
+
+    if sender is Stage:
+        invalidate_projects(parent_ids)
+        return
+    invalidate_projects(
+        Stage.objects.filter(pk__in=parent_ids).values_list(
+            "project_id", flat=True
+        )
+    )
+
+
+@receiver(signal=post_save, sender=Project)
+@receiver(signal=post_delete, sender=Project)
+def invalidate_project_cache(
+    sender: Type[Project],
+    instance: Project,
+    **kwargs: Any,
+) -> None:
+    """Make cached data of the project stale.
+
+    Args:
+        sender (Type[Project]): Model class.
+        instance (Project): Saved or deleted instance.
+    """
+    invalidate_projects([instance.pk])
+
+
+@receiver(signal=post_save, sender=Contact)
+@receiver(signal=post_save, sender=ProjectTeamMember)
+@receiver(signal=post_delete, sender=Contact)
+@receiver(signal=post_delete, sender=ProjectTeamMember)
+def invalidate_project_child_cache(
+    sender: Type[Contact | ProjectTeamMember],
+    instance: Contact | ProjectTeamMember,
+    **kwargs: Any,
+) -> None:
+    """Make cached data of the instance's project stale.
+
+    Args:
+        sender (Type[Contact | ProjectTeamMember]): Model class.
+        instance (Contact | ProjectTeamMember): Saved or deleted instance.
+    """
+    invalidate_projects([instance.project_id])
+
+
+@receiver(signal=post_save, sender=Artifact)
+@receiver(signal=post_delete, sender=Artifact)
+def invalidate_artifact_cache(
+    sender: Type[Artifact],
+    instance: Artifact,
+    **kwargs: Any,
+) -> None:
+    """Make cached data of the project the artifact belongs to stale.
+
+    Args:
+        sender (Type[Artifact]): Model class.
+        instance (Artifact): Saved or deleted instance.
+    """
+    model = ContentType.objects.get_for_id(
+        instance.content_type_id
+    ).model_class()
+    if model is Project:
+        invalidate_projects([instance.object_id])
+    elif model is Stage:
+        invalidate_projects(
+            Stage.objects.filter(pk=instance.object_id).values_list(
+                "project_id", flat=True
+            )
+        )
+    elif model is Task:
+        invalidate_projects(
+            Task.objects.filter(pk=instance.object_id).values_list(
+                "stage__project_id", flat=True
+            )
+        )
+
+
+@receiver(signal=post_save, sender=User)
+def invalidate_user_projects_cache(
+    sender: Type[User],
+    instance: User,
+    created: bool,
+    update_fields: frozenset[str] | None = None,
+    **kwargs: Any,
+) -> None:
+    """Make cached data of the projects showing the user's name stale.
+
+    Args:
+        sender (Type[User]): Model class.
+        instance (User): Saved instance.
+        created (bool): True if the user was created for the first time.
+        update_fields (frozenset[str] | None): Fields passed to save().
+    """
+    # новый пользователь еще не в проектах; вход сохраняет только last_login
+    if created or (
+        update_fields is not None and "username" not in update_fields
+    ):
+        return
+    invalidate_projects(
+        Project.objects.filter(Q(manager=instance) | Q(team=instance))
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+@receiver(signal=post_migrate)
+def create_search_indexes(
+    sender: AppConfig,
+    using: str,
+    **kwargs: Any,
+) -> None:
+    """Create SQLite full-text tables after the app is migrated.
+
+    Args:
+        sender (AppConfig): Config of the migrated app.
+        using (str): Alias of the migrated database.
+    """
+    # в реплики таблицы приходят репликацией
+    if sender.label == "app_plan" and router.allow_migrate_model(
+        using, Project
+    ):
+        ensure_sqlite_indexes(connections[using])
@@ -0,0 +1,179 @@
+"""Streaming export of projects, stages and tasks to CSV or NDJSON.
+
+Rows are read in chunks by keyset pagination over the primary key
+(``WHERE id > last ORDER BY id LIMIT n``): the MySQL driver buffers a
+whole result set on the client, so one big query would hold the whole
+table in the worker memory. Related names are joined in the same query.
+Every chunk is encoded into one block of text, so memory does not depend
+on the size of the export.
+
+Chunks are separate queries: rows changed during a long export may be
+exported in their old or new state.
+"""
+
+import csv
+import io
+from typing import Iterator, NamedTuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+
+from app_plan.models import Project, Stage, Task
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class ExportTable(NamedTuple):
+    """Exported model with column names and their lookups."""
+
+    model: type[Model]
+    columns: tuple[tuple[str, str], ...]
+
+    @property
+    def headers(self) -> list[str]:
+        """Return the column names."""
+        return [name for name, _ in self.columns]
+
+
+# первая колонка каждой таблицы - первичный ключ (ключ пагинации)
+EXPORT_TABLES = {
+    "projects": ExportTable(
+        Project,
+        (
+            ("id", "pk"),
+            ("name", "name"),
+            ("description", "description"),
+            ("status", "status"),
+            ("date_start", "date_start"),
+            ("date_end", "date_end"),
+            ("manager", "manager__username"),
+            ("stages_total", "stages_total"),
+            ("stages_completed", "stages_completed"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "stages": ExportTable(
+        Stage,
+        (
+            ("id", "pk"),
+            ("project_id", "project_id"),
+            ("project", "project__name"),
+            ("name", "name"),
+            ("description", "description"),
+            ("status", "status"),
+            ("date_start", "date_start"),
+            ("date_end", "date_end"),
+            ("responsible", "responsible__user__username"),
+            ("tasks_total", "tasks_total"),
+            ("tasks_completed", "tasks_completed"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "tasks": ExportTable(
+        Task,
+        (
+            ("id", "pk"),
+            ("project_id", "stage__project_id"),
+            ("project", "stage__project__name"),
+            ("stage_id", "stage_id"),
+            ("stage", "stage__name"),
+            ("name", "name"),
+            ("description", "description"),
+            ("status", "status"),
+            ("date_start", "date_start"),
+            ("date_end", "date_end"),
+            ("assignee", "assignee__user__username"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+}
+
+
+def iter_chunks(table: str, chunk_size: int) -> Iterator[list[tuple]]:
+    """Read rows of an exported table in primary key order.
+
+    Args:
+        table (str): Key of EXPORT_TABLES.
+        chunk_size (int): Rows per query.
+
+    Yields:
+        list[tuple]: Rows with the values of the table columns.
+
+    Raises:
+        ValueError: If chunk_size is less than 1.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+    spec = EXPORT_TABLES[table]
+    queryset = spec.model._default_manager.order_by("pk").values_list(
+        *(lookup for _, lookup in spec.columns)
+    )
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if chunk:
+            yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]
+
+
+def export_table(
+    table: str, file_format: str, chunk_size: int
+) -> Iterator[str]:
+    """Encode an exported table chunk by chunk.
+
+    Args:
+        table (str): Key of EXPORT_TABLES.
+        file_format (str): Key of EXPORT_FORMATS.
+        chunk_size (int): Rows per query and per yielded block.
+
+    Yields:
+        str: Blocks of CSV (the first one is the header) or NDJSON text.
+    """
+    headers = EXPORT_TABLES[table].headers
+    chunks = iter_chunks(table, chunk_size)
+    if file_format == "csv":
+        yield from _csv_blocks(headers, chunks)
+    else:
+        yield from _ndjson_blocks(headers, chunks)
+
+
+def _csv_blocks(
+    headers: list[str],
+    chunks: Iterator[list[tuple]],
+) -> Iterator[str]:
+    """Encode rows as CSV, one block per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield _flush(buffer)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield _flush(buffer)
+
+
+def _ndjson_blocks(
+    headers: list[str],
+    chunks: Iterator[list[tuple]],
+) -> Iterator[str]:
+    """Encode rows as JSON objects, one per line."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for chunk in chunks:
+        yield "".join(
+            f"{encoder.encode(dict(zip(headers, row)))}\n" for row in chunk
+        )
+
+
+def _flush(buffer: io.StringIO) -> str:
+    """Return the text written to the buffer and empty it."""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
@@ -0,0 +1,83 @@
+"""Custom admin list filters for app_plan."""
+
+from typing import Any
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin import AdminSite
+from django.contrib.admin.utils import get_model_from_relation
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Field, Model
+from django.http.request import HttpRequest
+from django.utils.safestring import SafeString
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """Filter by a related object chosen with an autocomplete widget.
+
+    The sidebar does not list the related objects: only the selected one
+    is loaded (by primary key), the rest are searched page by page by
+    the admin autocomplete view. The related model admin must define
+    ``search_fields``, and the model admin must include its ``media`` (see
+    ``autocomplete_filter_media``).
+    """
+
+    template = "admin/app_plan/autocomplete_filter.html"
+
+    def __init__(
+        self,
+        field: Field,
+        request: HttpRequest,
+        params: dict[str, Any],
+        model: type[Model],
+        model_admin: admin.ModelAdmin,
+        field_path: str,
+    ) -> None:
+        """Remember the admin site serving the autocomplete view."""
+        self.admin_site = model_admin.admin_site
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+
+    def field_choices(
+        self,
+        field: Field,
+        request: HttpRequest,
+        model_admin: admin.ModelAdmin,
+    ) -> list[tuple[str, Any]]:
+        """Do not load the related objects into the sidebar."""
+        return []
+
+    def has_output(self) -> bool:
+        """Always show the filter, the choices are loaded on demand."""
+        return True
+
+    @property
+    def widget(self) -> SafeString:
+        """Render the autocomplete select with the selected object."""
+        form_field = forms.ModelChoiceField(
+            queryset=get_model_from_relation(
+                self.field
+            )._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                self.field,
+                self.admin_site,
+                attrs={"class": "autocomplete-list-filter"},
+            ),
+        )
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return form_field.widget.render(
+            self.lookup_kwarg,
+            value,
+            attrs={"id": f"{self.lookup_kwarg}-filter"},
+        )
+
+
+def autocomplete_filter_media(admin_site: AdminSite) -> forms.Media:
+    """Return scripts and styles of AutocompleteListFilter widgets."""
+    # select2 с переводами на язык текущего запроса
+    widget_media = AutocompleteSelect(None, admin_site).media
+    return widget_media + forms.Media(
+        js=("app_plan/js/autocomplete_filter.js",),
+    )
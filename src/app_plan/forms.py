@@ -28,9 +28,10 @@ class StageInlineForm(forms.ModelForm):
             if not isinstance(responsible_filed, forms.ModelChoiceField):
                 return
 
+            # __str__ участника выводит имя пользователя
             responsible_filed.queryset = ProjectTeamMember.objects.filter(
                 project=parent_project
-            )
+            ).select_related("user")
 
 
 class TaskInlineForm(forms.ModelForm):
@@ -54,6 +55,7 @@ class TaskInlineForm(forms.ModelForm):
             if not isinstance(assignee_filed, forms.ModelChoiceField):
                 return
 
+            # __str__ участника выводит имя пользователя
             assignee_filed.queryset = ProjectTeamMember.objects.filter(
                 project=parent_project
-            )
+            ).select_related("user")
@@ -1,23 +1,139 @@
 """Custom formsets for app_plan."""
 
-from django.forms.models import BaseInlineFormSet
+from typing import Any, cast
 
+from django import forms
+from django.conf import settings
+from django.contrib.contenttypes.forms import BaseGenericInlineFormSet
+from django.core.paginator import Page, Paginator
+from django.db.models import QuerySet
+from django.forms.models import BaseInlineFormSet, BaseModelFormSet
+from django.http import QueryDict
 
-class StageInlineFormSet(BaseInlineFormSet):
+from app_plan.models import Project
+
+
+class PaginatedFormSetMixin(BaseModelFormSet):
+    """Model formset that shows one page of the existing objects.
+
+    The page is chosen by the ``<prefix>-page`` query parameter, the
+    inline admin passes it together with the rest of the query string
+    (see ``app_plan.admin.PaginatedInlineMixin``). The admin form is
+    posted to the same URL, so the saved page is the rendered one.
+    """
+
+    per_page: int = settings.PLAN_ADMIN_INLINE_PAGE_SIZE
+    page_number: str | None = None
+    # параметры запроса страницы, в которой выводится набор форм
+    query: QueryDict | None = None
+
+    def get_queryset(self) -> QuerySet:
+        """Return the objects of the current page only."""
+        if not hasattr(self, "page"):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page: Page = paginator.get_page(self.page_number)
+            self._queryset = cast(QuerySet, self.page.object_list)
+        return self._queryset
+
+    @property
+    def page_parameter(self) -> str:
+        """Return the query parameter holding the page number."""
+        return f"{self.prefix}-page"
+
+    @property
+    def page_links(self) -> list[tuple[int | str, str | None]]:
+        """Return page numbers with their query strings.
+
+        Skipped ranges of pages are marked by an ellipsis without a
+        query string.
+        """
+        self.get_queryset()
+        links: list[tuple[int | str, str | None]] = []
+        for number in self.page.paginator.get_elided_page_range(
+            self.page.number
+        ):
+            if number == Paginator.ELLIPSIS:
+                links.append((number, None))
+                continue
+
+            query = QueryDict(mutable=True)
+            if self.query:
+                query = self.query.copy()
+            query[self.page_parameter] = str(number)
+            links.append((number, query.urlencode()))
+        return links
+
+
+class PaginatedInlineFormSet(PaginatedFormSetMixin, BaseInlineFormSet):
+    """Inline formset with paginated existing objects."""
+
+
+class PaginatedGenericInlineFormSet(
+    PaginatedFormSetMixin,
+    BaseGenericInlineFormSet,
+):
+    """Generic inline formset with paginated existing objects."""
+
+
+class SharedChoicesFormSet(PaginatedInlineFormSet):
+    """Inline formset whose forms share materialized choices.
+
+    Django evaluates the queryset of a choice field once per rendered
+    row, so a formset of N rows repeats the same query N times. Choices
+    of ``shared_choice_fields`` are materialized by the first form and
+    reused by the rest. Rows also get the parent object cached, so their
+    ``__str__`` in the row titles does not load it again.
+    """
+
+    # поля со списками выбора, общими для всех форм набора
+    shared_choice_fields: tuple[str, ...] = ()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Prepare an empty cache of the choices."""
+        self._shared_choices: dict[str, list[Any]] = {}
+        super().__init__(*args, **kwargs)
+
+    def add_fields(self, form: forms.Form, index: int | None) -> None:
+        """Give the form the shared choices (empty_form included)."""
+        super().add_fields(form, index)
+        instance = getattr(form, "instance", None)
+        if instance is not None and self.instance.pk is not None:
+            if getattr(instance, self.fk.attname) == self.instance.pk:
+                # строка набора уже принадлежит родительскому объекту
+                self.fk.set_cached_value(instance, self.instance)
+
+        for name in self.shared_choice_fields:
+            field = form.fields.get(name)
+            if not isinstance(field, forms.ModelChoiceField):
+                continue
+
+            # запрос выполняется один раз на весь набор форм
+            if name not in self._shared_choices:
+                self._shared_choices[name] = list(field.iterator(field))
+            field.choices = self._shared_choices[name]
+
+
+class StageInlineFormSet(SharedChoicesFormSet):
     """Custom formset for StageInline admin model."""
 
+    shared_choice_fields = ("responsible",)
+
     def get_form_kwargs(self, index: int | None) -> dict:
         """Add parent Project to kwargs for a form."""
         kwargs = super().get_form_kwargs(index)
-        kwargs["parent_project"] = self.instance
+        kwargs["parent_project"] = self.get_parent_project()
         return kwargs
 
+    def get_parent_project(self) -> Project | None:
+        """Return the project whose team is offered in the forms."""
+        return self.instance
+
 
-class TaskInlineFormSet(BaseInlineFormSet):
+class TaskInlineFormSet(StageInlineFormSet):
     """Custom formset for TaskInline admin model."""
 
-    def get_form_kwargs(self, index: int | None) -> dict:
-        """Add parent Project to kwargs for a form."""
-        kwargs = super().get_form_kwargs(index)
-        kwargs["parent_project"] = self.instance.project
-        return kwargs
+    shared_choice_fields = ("assignee",)
+
+    def get_parent_project(self) -> Project | None:
+        """Tasks get assignees from the project of the edited stage."""
+        return self.instance.project
@@ -0,0 +1,340 @@
+"""Reproducible synthetic planning data for benchmarks.
+
+Objects are built in memory and saved with ``bulk_create``, a chunk of
+projects with all their children per transaction. Counters of projects
+and stages are computed while generating, so no recount is needed.
+
+The same seed, prefix and parameters give the same objects (ids
+included), except for the creation timestamps. Sizes follow skewed
+distributions: most projects are small, a few are large, as in real
+workloads.
+"""
+
+import math
+import random
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Callable
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Model
+from faker import Faker
+
+from app_auth.models import Profile, User
+from app_plan.models import (
+    Artifact,
+    Contact,
+    Project,
+    ProjectTeamMember,
+    Stage,
+    StatusChoices,
+    Task,
+)
+
+# начало временной шкалы, чтобы данные не зависели от даты запуска
+ANCHOR = date(2025, 1, 1)
+
+WORDS = (
+    "analysis api audit backend billing cache catalog client cloud "
+    "dashboard data delivery deploy design docs export frontend gateway "
+    "import integration invoice mobile migration monitoring onboarding "
+    "order payment platform portal report research review search security "
+    "service storage support sync testing training warehouse workflow"
+).split()
+TEAM_ROLES = (
+    "Developer",
+    "Analyst",
+    "Designer",
+    "QA engineer",
+    "DevOps engineer",
+    "Team lead",
+)
+CONTACT_ROLES = ("Customer", "Sponsor", "Supplier", "Consultant", "Auditor")
+
+# разброс размеров (сигма логнормального распределения)
+SIZE_SIGMA = 0.8
+
+# модели в порядке зависимостей по внешним ключам
+SAVE_ORDER: tuple[type[Model], ...] = (
+    User,
+    Profile,
+    Project,
+    ProjectTeamMember,
+    Stage,
+    Task,
+    Contact,
+    Artifact,
+)
+
+# сколько задач копится в памяти перед записью пачки проектов
+FLUSH_TASKS = 20000
+
+
+class PlanGenerator:
+    """Builds users, projects and their children from a seed."""
+
+    def __init__(
+        self,
+        seed: int,
+        prefix: str,
+        batch_size: int,
+        password: str,
+    ) -> None:
+        """Prepare the random generators.
+
+        Args:
+            seed (int): Seed of all random values.
+            prefix (str): Prefix of usernames and project names.
+            batch_size (int): Rows per INSERT.
+            password (str): Password of the generated users.
+        """
+        # префикс входит в зерно: разные наборы не пересекаются по id
+        self.rng = random.Random(f"{prefix}:{seed}")
+        self.fake = Faker()
+        self.fake.seed_instance(f"{prefix}:{seed}")
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password = password
+        self.counts: Counter[str] = Counter()
+        self._pending: dict[type[Model], list[Model]] = {}
+
+    def create_users(self, count: int) -> list[Any]:
+        """Create staff users with profiles.
+
+        Returns:
+            list[Any]: Primary keys of the users.
+        """
+        # хэш пароля считается один раз - он медленный намеренно
+        password = make_password(self.password)
+        user_ids = []
+        for number in range(count):
+            first_name = self.fake.first_name()
+            last_name = self.fake.last_name()
+            user = User(
+                id=self._uuid(),
+                username=f"{self.prefix}{number:06d}",
+                email=f"{self.prefix}{number:06d}@example.com",
+                first_name=first_name,
+                last_name=last_name,
+                password=password,
+                is_staff=True,
+            )
+            self._add(user)
+            self._add(
+                Profile(
+                    id=self._uuid(),
+                    user_id=user.pk,
+                    phone=self.fake.phone_number(),
+                )
+            )
+            user_ids.append(user.pk)
+            if len(self._pending[User]) >= self.batch_size:
+                self.flush()
+        self.flush()
+        return user_ids
+
+    def create_projects(
+        self,
+        count: int,
+        user_ids: list[Any],
+        stages: float,
+        tasks: float,
+        contacts: float,
+        artifacts: float,
+        progress: Callable[[Counter[str]], None] | None = None,
+    ) -> None:
+        """Create projects with teams, stages, tasks and attachments.
+
+        Args:
+            count (int): Number of projects.
+            user_ids (list[Any]): Users to staff the projects with.
+            stages (float): Mean number of stages per project.
+            tasks (float): Mean number of tasks per stage.
+            contacts (float): Mean number of contacts per project.
+            artifacts (float): Mean number of artifacts per project.
+            progress (Callable | None): Called with the created object
+                counts after every saved chunk.
+        """
+        for number in range(count):
+            self._build_project(
+                number, user_ids, stages, tasks, contacts, artifacts
+            )
+            if len(self._pending.get(Task, ())) >= FLUSH_TASKS:
+                self.flush()
+                if progress:
+                    progress(self.counts)
+        self.flush()
+        if progress:
+            progress(self.counts)
+
+    def flush(self) -> None:
+        """Save the pending objects in one transaction."""
+        with transaction.atomic():
+            for model in SAVE_ORDER:
+                objects = self._pending.pop(model, [])
+                if objects:
+                    model._default_manager.bulk_create(
+                        objects, batch_size=self.batch_size
+                    )
+                    self.counts[model.__name__.lower()] += len(objects)
+
+    def _build_project(
+        self,
+        number: int,
+        user_ids: list[Any],
+        stages: float,
+        tasks: float,
+        contacts: float,
+        artifacts: float,
+    ) -> None:
+        """Build one project with all its children."""
+        rng = self.rng
+        date_start = ANCHOR + timedelta(days=rng.randint(-540, 360))
+        duration = rng.randint(60, 720)
+        # доля выполненной работы определяет статусы этапов и задач
+        done = rng.choice((0.0, 1.0)) if rng.random() < 0.2 else rng.random()
+        archived = rng.random() < 0.05
+
+        project = Project(
+            id=self._uuid(),
+            name=f"{self.prefix} {self._title(2)} {number}",
+            description=self._description(),
+            date_start=date_start,
+            date_end=date_start + timedelta(days=duration),
+            manager_id=rng.choice(user_ids) if user_ids else None,
+            status=self._status(done, archived),
+        )
+        self._add(project)
+
+        team = [
+            ProjectTeamMember(
+                id=self._uuid(),
+                project_id=project.pk,
+                user_id=user_id,
+                role=rng.choice(TEAM_ROLES),
+            )
+            for user_id in rng.sample(
+                user_ids, min(len(user_ids), rng.randint(3, 12))
+            )
+        ]
+        for member in team:
+            self._add(member)
+
+        targets: list[Model] = [project]
+        stages_count = self._size(stages, minimum=1)
+        span = duration / stages_count
+        for index in range(stages_count):
+            stage_start = date_start + timedelta(days=int(index * span))
+            stage_end = date_start + timedelta(days=int((index + 1) * span))
+            # этапы выполняются по порядку
+            stage_done = min(max(done * stages_count - index, 0.0), 1.0)
+            stage = Stage(
+                id=self._uuid(),
+                project_id=project.pk,
+                name=f"{self._title(1)} stage {index + 1}",
+                description=self._description(),
+                date_start=stage_start,
+                date_end=stage_end,
+                responsible_id=self._member(team, 0.8),
+                status=self._status(stage_done, archived),
+            )
+            self._add(stage)
+            targets.append(stage)
+            project.stages_total += 1
+            if stage.status == StatusChoices.COMPLETED:
+                project.stages_completed += 1
+
+            for _ in range(self._size(tasks)):
+                task_start = stage_start + timedelta(
+                    days=rng.randint(0, max((stage_end - stage_start).days, 0))
+                )
+                task = Task(
+                    id=self._uuid(),
+                    stage_id=stage.pk,
+                    name=self._title(rng.randint(2, 4)),
+                    description=self._description(),
+                    date_start=task_start,
+                    date_end=min(
+                        task_start + timedelta(days=rng.randint(1, 30)),
+                        stage_end,
+                    ),
+                    assignee_id=self._member(team, 0.9),
+                    status=self._status(
+                        float(rng.random() < stage_done), archived
+                    ),
+                )
+                self._add(task)
+                stage.tasks_total += 1
+                if task.status == StatusChoices.COMPLETED:
+                    stage.tasks_completed += 1
+                if rng.random() < 0.01:
+                    targets.append(task)
+
+        for _ in range(self._size(contacts, minimum=0)):
+            self._add(
+                Contact(
+                    id=self._uuid(),
+                    project_id=project.pk,
+                    full_name=self.fake.name(),
+                    role=rng.choice(CONTACT_ROLES),
+                    email=self.fake.email(),
+                    phone=self.fake.phone_number(),
+                )
+            )
+
+        for _ in range(self._size(artifacts, minimum=0)):
+            # чаще всего документы прикладываются к самому проекту
+            target = project if rng.random() < 0.5 else rng.choice(targets)
+            title = self._title(2)
+            self._add(
+                Artifact(
+                    id=self._uuid(),
+                    title=title,
+                    description=self._description(),
+                    file=f"artifacts/generated/{title.replace(' ', '_')}.pdf",
+                    content_object=target,
+                )
+            )
+
+    def _add(self, instance: Model) -> None:
+        """Queue an object for the next flush."""
+        self._pending.setdefault(type(instance), []).append(instance)
+
+    def _uuid(self) -> uuid.UUID:
+        """Return a random UUID reproducible by the seed."""
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _size(self, mean: float, minimum: int = 1) -> int:
+        """Return a log-normally distributed size with the given mean."""
+        if mean <= 0:
+            return 0
+        mu = math.log(mean) - SIZE_SIGMA**2 / 2
+        return max(minimum, round(self.rng.lognormvariate(mu, SIZE_SIGMA)))
+
+    def _title(self, words: int) -> str:
+        """Return a capitalized phrase of random words."""
+        return " ".join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def _description(self) -> str | None:
+        """Return a random sentence or None (for 40% of objects)."""
+        if self.rng.random() < 0.4:
+            return None
+        return f"{self._title(self.rng.randint(4, 12))}."
+
+    def _member(self, team: list[ProjectTeamMember], share: float) -> Any:
+        """Return a random team member id or None for the rest."""
+        if not team or self.rng.random() >= share:
+            return None
+        return self.rng.choice(team).pk
+
+    def _status(self, done: float, archived: bool) -> str:
+        """Return a status for the share of the completed work."""
+        if archived:
+            return StatusChoices.ARCHIVED
+        if done >= 1:
+            return StatusChoices.COMPLETED
+        if done <= 0:
+            return StatusChoices.NOT_STARTED
+        return StatusChoices.IN_PROGRESS
@@ -0,0 +1,571 @@
+"""Bulk import of projects, team members, stages and tasks.
+
+Records are read from CSV (with a header) or JSON lines files and saved
+with ``bulk_create`` in chunks, every chunk in its own transaction.
+Signals are not sent: counters of the touched stages and projects are
+recounted and their cache is invalidated per chunk.
+
+References use natural keys: a project by its name, a stage by its
+project and name, a user by username. Names are resolved with one query
+per chunk and must be unambiguous; explicit ids (e.g. ``project_id``, as
+written by the export) take precedence over the names.
+
+A record without ``id`` gets an id derived from the source key of the
+file (its name by default) and the record's line (a team member - from
+its project and user), so names may repeat and the same file always
+gives the same ids, wherever it is stored. Records whose id already
+exists (team members whose user is already in the team) are skipped and
+counted, so an interrupted import can simply be run again on the same
+file. Other rows are inserted without ignoring any database errors.
+"""
+
+import csv
+import json
+import uuid
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    cast,
+)
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Field, Model
+
+from app_auth.models import User
+from app_plan.cache import invalidate_projects
+from app_plan.counters import recount_project_counters, recount_stage_counters
+from app_plan.models import Project, ProjectTeamMember, Stage, Task
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# порядок загрузки: объекты ссылаются только на предыдущие виды
+IMPORT_KINDS = ("projects", "team", "stages", "tasks")
+
+# пространство имен идентификаторов, выведенных из естественных ключей
+NATURAL_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "app_plan/import")
+
+# поля проектов, этапов и задач; остальные колонки игнорируются
+ITEM_FIELDS = ("name", "description", "status", "date_start", "date_end")
+
+Record = dict[str, Any]
+
+# отметка неоднозначного названия в кэше названий
+AMBIGUOUS = object()
+
+
+class ImportRecordError(Exception):
+    """A record can not be imported."""
+
+    def __init__(self, line: int, message: str) -> None:
+        """Keep the line of the record in the file."""
+        self.line = line
+        self.message = message
+        super().__init__(line, message)
+
+    def __str__(self) -> str:
+        """Return the message with the line number."""
+        return f"Line {self.line}: {self.message}"
+
+
+class ImportProgress(NamedTuple):
+    """State of the import after a committed chunk."""
+
+    records: int
+    line: int
+    # записи, уже существовавшие в базе
+    skipped: int
+
+
+def natural_id(model: type[Model], *key: Any) -> uuid.UUID:
+    """Return the id of an object derived from a key of its record."""
+    name = "\x1f".join([model._meta.label_lower, *map(str, key)])
+    return uuid.uuid5(NATURAL_NAMESPACE, name)
+
+
+def read_records(path: str, file_format: str) -> Iterator[tuple[int, Record]]:
+    """Read records of a file with their line numbers.
+
+    Args:
+        path (str): Path to the file.
+        file_format (str): One of IMPORT_FORMATS.
+
+    Yields:
+        tuple[int, Record]: Line number and record; empty CSV cells
+            are None.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, {
+                    key: value if value != "" else None
+                    for key, value in record.items()
+                }
+            return
+
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as error:
+                raise ImportRecordError(line, str(error)) from error
+            if not isinstance(record, dict):
+                raise ImportRecordError(line, "A JSON object is expected.")
+            yield line, record
+
+
+def import_records(
+    kind: str,
+    records: Iterable[tuple[int, Record]],
+    source: str,
+    chunk_size: int,
+    progress: Callable[[ImportProgress], None] | None = None,
+) -> ImportProgress:
+    """Save records of one kind chunk by chunk.
+
+    Args:
+        kind (str): One of IMPORT_KINDS.
+        records (Iterable[tuple[int, Record]]): Line numbers and records.
+        source (str): Stable key of the file in the ids of its records.
+        chunk_size (int): Records saved in one transaction.
+        progress (Callable | None): Called after every committed chunk.
+
+    Raises:
+        ImportRecordError: If a record is invalid, repeats an id or
+            refers to a missing object; the chunks before it stay saved.
+        ValueError: If chunk_size is less than 1.
+
+    Returns:
+        ImportProgress: Number of processed and skipped records and the
+            last line.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+    importer = _Importer(source)
+    build = getattr(importer, f"build_{kind}")
+    state = ImportProgress(0, 0, 0)
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        with transaction.atomic():
+            skipped = build(chunk)
+        state = ImportProgress(
+            state.records + len(chunk),
+            chunk[-1][0],
+            state.skipped + skipped,
+        )
+        if progress:
+            progress(state)
+    return state
+
+
+class _Importer:
+    """Builds and saves chunks of records, caching resolved names.
+
+    Every ``build_*`` method returns the number of skipped records.
+    """
+
+    def __init__(self, source: str) -> None:
+        """Prepare empty caches of resolved names."""
+        self.source = source
+        self.user_ids: dict[Any, Any] = {}
+        # id проектов и этапов по названиям
+        self.project_ids: dict[Any, Any] = {}
+        self.stage_ids: dict[Any, Any] = {}
+
+    def build_projects(self, chunk: list[tuple[int, Record]]) -> int:
+        """Save projects; the manager is a username."""
+        managers = self._users(chunk, "manager")
+        projects = [
+            (
+                line,
+                Project(
+                    id=_record_id(line, record, Project, self.source, line),
+                    manager_id=managers.get(record.get("manager")),
+                    **_values(Project, line, record, ITEM_FIELDS),
+                ),
+            )
+            for line, record in _require(chunk, "name")
+        ]
+        skipped = _save(Project, projects)
+        invalidate_projects(project.pk for _, project in projects)
+        return skipped
+
+    def build_team(self, chunk: list[tuple[int, Record]]) -> int:
+        """Save team members; the user is a username."""
+        users = self._users(_require(chunk, "user"), "user")
+        project_ids = self._project_ids(chunk)
+        _check_projects(chunk, project_ids)
+        pairs = [
+            (project_id, users[record["user"]])
+            for (_, record), project_id in zip(chunk, project_ids)
+        ]
+        # пользователь может уже состоять в команде под другим id
+        in_team = set(
+            ProjectTeamMember.objects.filter(
+                project_id__in={project_id for project_id, _ in pairs},
+                user_id__in={user_id for _, user_id in pairs},
+            ).values_list("project_id", "user_id")
+        )
+        members = []
+        lines: dict[tuple[Any, Any], int] = {}
+        for (line, record), pair in zip(chunk, pairs):
+            first = lines.setdefault(pair, line)
+            if first != line:
+                raise ImportRecordError(
+                    line, f"{record['user']!r} is already on line {first}."
+                )
+            if pair in in_team:
+                continue
+            project_id, user_id = pair
+            members.append(
+                (
+                    line,
+                    ProjectTeamMember(
+                        id=_record_id(
+                            line,
+                            record,
+                            ProjectTeamMember,
+                            project_id,
+                            record["user"],
+                        ),
+                        project_id=project_id,
+                        user_id=user_id,
+                        **_values(ProjectTeamMember, line, record, ("role",)),
+                    ),
+                )
+            )
+        return len(chunk) - len(members) + _save(ProjectTeamMember, members)
+
+    def build_stages(self, chunk: list[tuple[int, Record]]) -> int:
+        """Save stages; the responsible is a username of the team."""
+        project_ids = self._project_ids(_require(chunk, "name"))
+        _check_projects(chunk, project_ids)
+        responsible = self._members(chunk, project_ids, "responsible")
+        stages = [
+            (
+                line,
+                Stage(
+                    id=_record_id(line, record, Stage, self.source, line),
+                    project_id=project_id,
+                    responsible_id=responsible.get(
+                        (project_id, record.get("responsible"))
+                    ),
+                    **_values(Stage, line, record, ITEM_FIELDS),
+                ),
+            )
+            for (line, record), project_id in zip(chunk, project_ids)
+        ]
+        skipped = _save(Stage, stages)
+        recount_project_counters(set(project_ids))
+        invalidate_projects(project_ids)
+        return skipped
+
+    def build_tasks(self, chunk: list[tuple[int, Record]]) -> int:
+        """Save tasks; the assignee is a username of the team."""
+        stage_ids = self._stage_ids(_require(chunk, "name"))
+        # этапы проверяются вместе с получением их проектов
+        stage_projects = dict(
+            Stage.objects.filter(pk__in=set(stage_ids)).values_list(
+                "pk", "project_id"
+            )
+        )
+        for (line, record), stage_id in zip(chunk, stage_ids):
+            if stage_id not in stage_projects:
+                stage = record.get("stage_id") or record["stage"]
+                raise ImportRecordError(line, f"No stage {stage!r}.")
+        project_ids = [stage_projects[stage_id] for stage_id in stage_ids]
+        assignees = self._members(chunk, project_ids, "assignee")
+        tasks = [
+            (
+                line,
+                Task(
+                    id=_record_id(line, record, Task, self.source, line),
+                    stage_id=stage_id,
+                    assignee_id=assignees.get(
+                        (project_id, record.get("assignee"))
+                    ),
+                    **_values(Task, line, record, ITEM_FIELDS),
+                ),
+            )
+            for (line, record), stage_id, project_id in zip(
+                chunk, stage_ids, project_ids
+            )
+        ]
+        skipped = _save(Task, tasks)
+        recount_stage_counters(set(stage_ids))
+        invalidate_projects(set(project_ids))
+        return skipped
+
+    def _project_ids(self, chunk: list[tuple[int, Record]]) -> list[Any]:
+        """Return project ids given directly or by unambiguous names."""
+        names = {
+            record["project"]
+            for _, record in chunk
+            if not record.get("project_id") and record.get("project")
+        }
+        _resolve(
+            self.project_ids,
+            Project.objects.filter(
+                name__in=names - self.project_ids.keys()
+            ).values_list("name", "pk"),
+        )
+
+        project_ids = []
+        for line, record in chunk:
+            if record.get("project_id"):
+                project_ids.append(_uuid(line, record["project_id"]))
+            elif record.get("project"):
+                project_ids.append(
+                    _resolved(
+                        self.project_ids,
+                        record["project"],
+                        line,
+                        f"project {record['project']!r}",
+                        "project_id",
+                    )
+                )
+            else:
+                raise ImportRecordError(
+                    line, "project_id or project is required."
+                )
+        return project_ids
+
+    def _stage_ids(self, chunk: list[tuple[int, Record]]) -> list[Any]:
+        """Return stage ids given directly or by project and name."""
+        named = [
+            (line, record)
+            for line, record in chunk
+            if not record.get("stage_id") and record.get("stage")
+        ]
+        keys = list(zip(self._project_ids(named), named))
+        wanted = {
+            (project_id, record["stage"]) for project_id, (_, record) in keys
+        } - self.stage_ids.keys()
+        _resolve(
+            self.stage_ids,
+            (
+                ((project_id, name), pk)
+                for project_id, name, pk in Stage.objects.filter(
+                    project_id__in={project_id for project_id, _ in wanted},
+                    name__in={name for _, name in wanted},
+                ).values_list("project_id", "name", "pk")
+                if (project_id, name) in wanted
+            ),
+        )
+        by_line = {
+            line: _resolved(
+                self.stage_ids,
+                (project_id, record["stage"]),
+                line,
+                f"stage {record['stage']!r}",
+                "stage_id",
+            )
+            for project_id, (line, record) in keys
+        }
+
+        stage_ids = []
+        for line, record in chunk:
+            if record.get("stage_id"):
+                stage_ids.append(_uuid(line, record["stage_id"]))
+            elif line in by_line:
+                stage_ids.append(by_line[line])
+            else:
+                raise ImportRecordError(line, "stage_id or stage is required.")
+        return stage_ids
+
+    def _users(
+        self,
+        chunk: list[tuple[int, Record]],
+        field: str,
+    ) -> dict[Any, Any]:
+        """Resolve usernames of the chunk, loading unknown ones at once."""
+        usernames = {record[field] for _, record in chunk if record.get(field)}
+        missing = usernames - self.user_ids.keys()
+        if missing:
+            self.user_ids.update(
+                User.objects.filter(username__in=missing).values_list(
+                    "username", "pk"
+                )
+            )
+        for line, record in chunk:
+            if record.get(field) and record[field] not in self.user_ids:
+                raise ImportRecordError(line, f"No user {record[field]!r}.")
+        return self.user_ids
+
+    def _members(
+        self,
+        chunk: list[tuple[int, Record]],
+        project_ids: list[Any],
+        field: str,
+    ) -> dict[tuple[Any, Any], Any]:
+        """Resolve team members by project and username in one query."""
+        pairs = {
+            (project_id, record[field])
+            for (_, record), project_id in zip(chunk, project_ids)
+            if record.get(field)
+        }
+        if not pairs:
+            return {}
+
+        members = {
+            (project_id, username): pk
+            for pk, project_id, username in ProjectTeamMember.objects.filter(
+                project_id__in={project_id for project_id, _ in pairs},
+                user__username__in={username for _, username in pairs},
+            ).values_list("pk", "project_id", "user__username")
+        }
+        for (line, record), project_id in zip(chunk, project_ids):
+            pair = (project_id, record.get(field))
+            if record.get(field) and pair not in members:
+                raise ImportRecordError(
+                    line,
+                    f"{record[field]!r} is not in the project team.",
+                )
+        return members
+
+
+def _require(
+    chunk: list[tuple[int, Record]],
+    field: str,
+) -> list[tuple[int, Record]]:
+    """Check that every record of the chunk has the field."""
+    for line, record in chunk:
+        if not record.get(field):
+            raise ImportRecordError(line, f"{field} is required.")
+    return chunk
+
+
+def _values(
+    model: type[Model],
+    line: int,
+    record: Record,
+    fields: Iterable[str],
+) -> Record:
+    """Convert and validate model field values of a record.
+
+    Missing fields get their default values. Only field-level checks
+    are done, without queries.
+    """
+    values: Record = {}
+    for name in fields:
+        field = cast(Field, model._meta.get_field(name))
+        value = record.get(name)
+        if value is None and field.has_default():
+            value = field.get_default()
+        if value in (None, "") and field.null:
+            values[name] = None
+            continue
+        try:
+            values[name] = field.clean(value, None)
+        except ValidationError as error:
+            raise ImportRecordError(
+                line, f"{name}: {' '.join(error.messages)}"
+            ) from error
+    return values
+
+
+def _record_id(
+    line: int,
+    record: Record,
+    model: type[Model],
+    *key: Any,
+) -> uuid.UUID:
+    """Return the id given in the record or derived from the key."""
+    if record.get("id"):
+        return _uuid(line, record["id"])
+    return natural_id(model, *key)
+
+
+def _uuid(line: int, value: Any) -> uuid.UUID:
+    """Parse a UUID given in a record."""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError as error:
+        raise ImportRecordError(line, f"Invalid id {value!r}.") from error
+
+
+def _resolve(
+    cache: dict[Any, Any],
+    pairs: Iterable[tuple[Any, Any]],
+) -> None:
+    """Add names and ids found in the database to a cache of names."""
+    for name, pk in pairs:
+        cache[name] = AMBIGUOUS if name in cache else pk
+
+
+def _resolved(
+    cache: dict[Any, Any],
+    name: Any,
+    line: int,
+    label: str,
+    id_field: str,
+) -> Any:
+    """Return the id of a name resolved by ``_resolve``."""
+    pk = cache.get(name)
+    if pk is None:
+        raise ImportRecordError(line, f"No {label}.")
+    if pk is AMBIGUOUS:
+        raise ImportRecordError(
+            line, f"Several objects match {label}, give {id_field}."
+        )
+    return pk
+
+
+def _check_projects(
+    chunk: list[tuple[int, Record]],
+    project_ids: list[Any],
+) -> None:
+    """Check that referenced projects exist, in one query per chunk.
+
+    A missing project is reported with the line of the record instead of
+    a foreign key error of the whole chunk.
+    """
+    existing = set(
+        Project.objects.filter(pk__in=set(project_ids)).values_list(
+            "pk", flat=True
+        )
+    )
+    for (line, record), project_id in zip(chunk, project_ids):
+        if project_id not in existing:
+            project = record.get("project_id") or record["project"]
+            raise ImportRecordError(line, f"No project {project!r}.")
+
+
+def _save(model: type[Model], objects: Sequence[tuple[int, Model]]) -> int:
+    """Insert the objects, skipping the ids that already exist.
+
+    Args:
+        model (type[Model]): Model of the objects.
+        objects (Sequence[tuple[int, Model]]): Lines and new objects.
+
+    Raises:
+        ImportRecordError: If two records of the chunk have the same id.
+
+    Returns:
+        int: Number of skipped objects.
+    """
+    lines: dict[Any, int] = {}
+    for line, obj in objects:
+        first = lines.setdefault(obj.pk, line)
+        if first != line:
+            raise ImportRecordError(
+                line, f"Id {obj.pk} is already used on line {first}."
+            )
+    existing = set(
+        model._default_manager.filter(pk__in=lines).values_list(
+            "pk", flat=True
+        )
+    )
+    model._default_manager.bulk_create(
+        [obj for _, obj in objects if obj.pk not in existing],
+        batch_size=settings.PLAN_BULK_BATCH_SIZE,
+    )
+    return len(existing)
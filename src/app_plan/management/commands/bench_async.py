@@ -0,0 +1,317 @@
+"""Load test of the read endpoints served by WSGI and ASGI workers."""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from app_plan.models import Project
+
+# размер буфера чтения одного соединения
+READ_LIMIT = 2**16
+
+ENDPOINTS = ("list", "detail", "tree", "calendar")
+
+
+class Command(BaseCommand):
+    r"""Compare the sync (DRF) and async endpoints under concurrent load.
+
+    Both servers must use the same database, for example:
+
+        GUNICORN_INTERFACE=wsgi DJANGO_PORT=8000 \
+            gunicorn -c ../gunicorn.conf.py
+        GUNICORN_INTERFACE=asgi DJANGO_PORT=8001 \
+            gunicorn -c ../gunicorn.conf.py
+        manage.py bench_async --wsgi http://127.0.0.1:8000 \
+            --asgi http://127.0.0.1:8001 --concurrency 500
+    """
+
+    help = (
+        "Polls project list/detail/tree and calendar endpoints with many "
+        "keep-alive connections and prints throughput and latencies of "
+        "the WSGI and ASGI servers side by side."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--wsgi",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the WSGI server (empty to skip).",
+        )
+        parser.add_argument(
+            "--asgi",
+            default="http://127.0.0.1:8001",
+            help="Base URL of the ASGI server (empty to skip).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Simultaneous connections (pollers).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10,
+            help="Seconds of load per endpoint and server.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Pause of every poller between its requests in seconds.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for a response before counting an error.",
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=ENDPOINTS,
+            default=ENDPOINTS,
+            help="Polled endpoints (all by default).",
+        )
+        parser.add_argument(
+            "--project",
+            help="Id of the polled project (by default the first one).",
+        )
+        parser.add_argument(
+            "--conditional",
+            action="store_true",
+            help=(
+                "Send If-None-Match with the last received ETag, as "
+                "dashboards do (304 responses of detail and tree)."
+            ),
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Save results to a JSON file.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        servers = {
+            name: options[name].rstrip("/")
+            for name in ("wsgi", "asgi")
+            if options[name]
+        }
+        if not servers:
+            raise CommandError("Give at least one of --wsgi and --asgi.")
+        if options["concurrency"] < 1 or options["duration"] <= 0:
+            raise CommandError("Concurrency and duration must be positive.")
+
+        results: dict[str, dict[str, dict[str, float]]] = {}
+        paths = self.get_paths(options["project"])
+        for endpoint in options["endpoints"]:
+            path = paths[endpoint]
+            self.stdout.write(self.style.MIGRATE_HEADING(endpoint))
+            results[endpoint] = {}
+            for name, base_url in servers.items():
+                # асинхронные варианты доступны под префиксом async/
+                url = base_url + (
+                    path.replace("/api/plan/", "/api/plan/async/", 1)
+                    if name == "asgi"
+                    else path
+                )
+                stats = asyncio.run(
+                    self.load(
+                        url,
+                        options["concurrency"],
+                        options["duration"],
+                        options["conditional"],
+                        options["interval"],
+                        options["timeout"],
+                    )
+                )
+                results[endpoint][name] = stats
+                self.stdout.write(
+                    f"{name}: {stats['rps']:.0f} req/s, "
+                    f"p50 {stats['p50'] * 1000:.1f} ms, "
+                    f"p95 {stats['p95'] * 1000:.1f} ms, "
+                    f"p99 {stats['p99'] * 1000:.1f} ms, "
+                    f"errors {stats['errors']:.0f}"
+                )
+
+        if options["output"]:
+            options["output"].write_text(json.dumps(results, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Results saved to {options['output']}.")
+            )
+
+    @staticmethod
+    def get_paths(project_id: str | None) -> dict[str, str]:
+        """Return the polled paths of the synchronous API."""
+        projects = Project.objects.order_by("pk")
+        if project_id:
+            projects = projects.filter(pk=project_id)
+        project = projects.first()
+        if project is None:
+            raise CommandError("The database has no project to poll.")
+
+        date_to = project.date_start + timedelta(days=30)
+        return {
+            "list": "/api/plan/projects/",
+            "detail": f"/api/plan/projects/{project.pk}/",
+            "tree": f"/api/plan/projects/{project.pk}/tree/",
+            "calendar": (
+                f"/api/plan/calendar/?project={project.pk}"
+                f"&date_from={project.date_start}&date_to={date_to}"
+            ),
+        }
+
+    async def load(
+        self,
+        url: str,
+        concurrency: int,
+        duration: float,
+        conditional: bool,
+        interval: float,
+        timeout: float,
+    ) -> dict[str, float]:
+        """Poll the URL from many connections for the given time.
+
+        Returns:
+            dict[str, float]: Requests per second, latency percentiles
+                in seconds and the number of failed requests.
+        """
+        started = time.perf_counter()
+        latencies: list[float] = []
+        errors = [0]
+        await asyncio.gather(
+            *(
+                self.poll(
+                    url,
+                    started + duration,
+                    conditional,
+                    interval,
+                    timeout,
+                    latencies,
+                    errors,
+                )
+                for _ in range(concurrency)
+            )
+        )
+        # ответы на запросы, начатые до конца замера, тоже учитываются
+        elapsed = time.perf_counter() - started
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        return {
+            "rps": len(latencies) / elapsed,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "errors": errors[0],
+        }
+
+    @staticmethod
+    async def poll(
+        url: str,
+        deadline: float,
+        conditional: bool,
+        interval: float,
+        timeout: float,
+        latencies: list[float],
+        errors: list[int],
+    ) -> None:
+        """Repeat GET requests over one keep-alive connection.
+
+        Latencies of successful requests (200 and 304) are appended to
+        ``latencies``, failures are counted in ``errors[0]``. The
+        connection is opened again after the server closes it. With an
+        interval the poller starts at a random moment within it.
+        """
+        parts = urlsplit(url)
+        host, port = parts.hostname or "localhost", parts.port or 80
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        head = (
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        etag = None
+        if interval:
+            # опрашивающие клиенты запускаются вразброс
+            await asyncio.sleep(random.uniform(0, interval))
+
+        connection: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
+        connection = None
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                # TimeoutError - подкласс OSError
+                async with asyncio.timeout(timeout):
+                    if connection is None:
+                        connection = await asyncio.open_connection(
+                            host, port, limit=READ_LIMIT
+                        )
+                    reader, writer = connection
+                    condition = f"If-None-Match: {etag}\r\n" if etag else ""
+                    writer.write(f"{head}{condition}\r\n".encode())
+                    status, keep_alive, received = await Command.read_response(
+                        reader
+                    )
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors[0] += 1
+                keep_alive = False
+            else:
+                if status in (200, 304):
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+                if conditional and received:
+                    etag = received
+            if not keep_alive and connection is not None:
+                connection[1].close()
+                connection = None
+            if interval:
+                remaining = deadline - time.perf_counter()
+                await asyncio.sleep(min(interval, max(remaining, 0)))
+        if connection is not None:
+            connection[1].close()
+
+    @staticmethod
+    async def read_response(
+        reader: asyncio.StreamReader,
+    ) -> tuple[int, bool, str | None]:
+        """Read one response with a Content-Length body.
+
+        Returns:
+            tuple[int, bool, str | None]: Status code, whether the
+                connection stays open and the ETag of the response.
+        """
+        status = int((await reader.readuntil(b"\r\n")).split()[1])
+        length, keep_alive, etag = 0, True, None
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value.lower() != "close"
+            elif name == "etag":
+                etag = value
+            elif name == "transfer-encoding":
+                # потоковые ответы эндпоинты опроса не возвращают
+                raise ValueError("Chunked responses are not supported.")
+        await reader.readexactly(length)
+        return status, keep_alive, etag
@@ -0,0 +1,157 @@
+"""Benchmark of the typical planning queries."""
+
+import json
+import statistics
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+
+from app_plan.models import Stage, StatusChoices, Task
+
+OPEN_STATUSES = (StatusChoices.NOT_STARTED, StatusChoices.IN_PROGRESS)
+
+
+class Command(BaseCommand):
+    """Show query plans and timings of the filters used by the service.
+
+    Typical workflow on a seeded database:
+
+        manage.py migrate app_plan 0002
+        manage.py bench_plan_queries --output before.json
+        manage.py migrate app_plan
+        manage.py bench_plan_queries --baseline before.json
+    """
+
+    help = (
+        "Prints EXPLAIN output and timings of status/date-range queries "
+        "on Stage and Task. Compare runs with --output/--baseline."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="How many times each query is executed.",
+        )
+        parser.add_argument(
+            "--no-explain",
+            action="store_true",
+            help="Do not print query plans.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Save timings to a JSON file.",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            help="JSON file of a previous run to compare timings with.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        queries = self.get_queries()
+        results: dict[str, float] = {}
+
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            if not options["no_explain"]:
+                self.stdout.write(queryset.explain())
+            results[name] = self.measure(queryset, options["repeat"])
+            self.stdout.write(f"median: {results[name] * 1000:.2f} ms\n")
+
+        if options["baseline"]:
+            self.compare(json.loads(options["baseline"].read_text()), results)
+
+        if options["output"]:
+            options["output"].write_text(json.dumps(results, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Timings saved to {options['output']}.")
+            )
+
+    def get_queries(self) -> dict[str, QuerySet]:
+        """Build the benchmarked querysets for the most loaded objects."""
+        busiest_stage = (
+            Task.objects.values("stage_id")
+            .annotate(cnt=Count("pk"))
+            .order_by("-cnt")
+            .first()
+        )
+        busiest_assignee = (
+            Task.objects.filter(assignee__isnull=False)
+            .values("assignee_id")
+            .annotate(cnt=Count("pk"))
+            .order_by("-cnt")
+            .first()
+        )
+        if not busiest_stage or not busiest_assignee:
+            raise CommandError("The database has no tasks to benchmark.")
+
+        stage_id = busiest_stage["stage_id"]
+        project_id = Stage.objects.get(pk=stage_id).project_id
+        today = timezone.localdate()
+        window = (today, today + timedelta(days=30))
+
+        return {
+            "stages of a project by status": Stage.objects.filter(
+                project_id=project_id,
+                status=StatusChoices.IN_PROGRESS,
+            ),
+            "tasks of a stage by status": Task.objects.filter(
+                stage_id=stage_id,
+                status=StatusChoices.COMPLETED,
+            ),
+            "open tasks of an assignee by deadline": Task.objects.filter(
+                assignee_id=busiest_assignee["assignee_id"],
+                status__in=OPEN_STATUSES,
+                date_end__lte=window[1],
+            ).order_by("date_end"),
+            "stages overlapping a 30-day window": Stage.objects.filter(
+                date_start__lte=window[1],
+                date_end__gte=window[0],
+            ).values_list("pk", flat=True),
+            "tasks overlapping a 30-day window": Task.objects.filter(
+                date_start__lte=window[1],
+                date_end__gte=window[0],
+            ).values_list("pk", flat=True),
+        }
+
+    @staticmethod
+    def measure(queryset: QuerySet, repeat: int) -> float:
+        """Return the median execution time of a queryset in seconds."""
+        timings: list[float] = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            # .all() - новый клон без кэша результатов на каждую итерацию
+            list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def compare(
+        self,
+        baseline: dict[str, float],
+        results: dict[str, float],
+    ) -> None:
+        """Print the timings of the current run against the baseline."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Comparison"))
+        for name, current in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            speedup = before / current if current else float("inf")
+            self.stdout.write(
+                f"{name}: {before * 1000:.2f} ms -> "
+                f"{current * 1000:.2f} ms (x{speedup:.1f})"
+            )
@@ -0,0 +1,69 @@
+"""Export projects, stages or tasks to CSV or NDJSON."""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from app_plan.export import EXPORT_FORMATS, EXPORT_TABLES, export_table
+
+
+class Command(BaseCommand):
+    """Write a full export of a table to a file or stdout."""
+
+    help = (
+        "Exports all projects, stages or tasks to CSV or NDJSON, "
+        "reading rows in chunks."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("table", choices=tuple(EXPORT_TABLES))
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=tuple(EXPORT_FORMATS),
+            default="csv",
+            help="File format, CSV by default.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write, stdout by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.PLAN_EXPORT_CHUNK_SIZE,
+            help="Number of rows read from the database in one query.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        blocks = export_table(
+            options["table"],
+            options["file_format"],
+            options["chunk_size"],
+        )
+        if options["output"] == "-":
+            for block in blocks:
+                self.stdout.write(block, ending="")
+            return
+
+        # newline="" - переводы строк CSV пишутся как есть
+        with open(
+            options["output"], "w", encoding="utf-8", newline=""
+        ) as file:
+            file.writelines(blocks)
+        # stdout может быть занят самой выгрузкой, отчет пишется в stderr
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {options['table']} to {options['output']}."
+            )
+        )
@@ -0,0 +1,126 @@
+"""Generate a synthetic planning dataset for benchmarks."""
+
+import re
+import time
+from collections import Counter
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from app_auth.models import User
+from app_plan.generator import PlanGenerator
+
+
+class Command(BaseCommand):
+    """Create users, projects and their children with bulk inserts.
+
+    Sizes are means of skewed distributions, the total number of tasks
+    is about projects * stages * tasks, e.g. 1M tasks:
+
+        manage.py generate_plan --projects 1000 --stages 10 --tasks 100
+    """
+
+    help = (
+        "Generates a reproducible (seeded) dataset of users, projects, "
+        "team members, stages, tasks, contacts and artifacts."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix",
+            default="gen",
+            help="Prefix of usernames and project names, must be new.",
+        )
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument(
+            "--stages",
+            type=float,
+            default=10,
+            help="Mean number of stages per project.",
+        )
+        parser.add_argument(
+            "--tasks",
+            type=float,
+            default=100,
+            help="Mean number of tasks per stage.",
+        )
+        parser.add_argument(
+            "--contacts",
+            type=float,
+            default=3,
+            help="Mean number of contacts per project.",
+        )
+        parser.add_argument(
+            "--artifacts",
+            type=float,
+            default=2,
+            help="Mean number of artifacts per project.",
+        )
+        parser.add_argument(
+            "--password",
+            default="12345678",
+            help="Password of the generated users.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.PLAN_BULK_BATCH_SIZE,
+            help="Number of rows in one INSERT.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        prefix: str = options["prefix"]
+        # только имена, которые создал бы генератор: prefix + номер
+        pattern = rf"^{re.escape(prefix)}\d+$"
+        if User.objects.filter(username__regex=pattern).exists():
+            raise CommandError(
+                f"Users with the prefix {prefix!r} exist, choose another."
+            )
+
+        generator = PlanGenerator(
+            options["seed"],
+            prefix,
+            options["batch_size"],
+            options["password"],
+        )
+        started = time.monotonic()
+
+        def report(counts: Counter[str]) -> None:
+            """Print the created objects after every saved chunk."""
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{elapsed:.0f} s: "
+                + ", ".join(
+                    f"{count} {name}" for name, count in counts.items()
+                )
+            )
+
+        user_ids = generator.create_users(options["users"])
+        report(generator.counts)
+        generator.create_projects(
+            options["projects"],
+            user_ids,
+            options["stages"],
+            options["tasks"],
+            options["contacts"],
+            options["artifacts"],
+            report,
+        )
+
+        elapsed = time.monotonic() - started
+        tasks = generator.counts["task"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {tasks} tasks in {elapsed:.1f} s "
+                f"({tasks / (elapsed or 1):.0f} tasks/s)."
+            )
+        )
@@ -0,0 +1,123 @@
+"""Import projects, team members, stages or tasks from a file."""
+
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import DatabaseError
+
+from app_plan.importer import (
+    IMPORT_FORMATS,
+    IMPORT_KINDS,
+    ImportProgress,
+    ImportRecordError,
+    import_records,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    """Bulk load records of one kind from a CSV or JSON lines file."""
+
+    help = (
+        "Imports projects, team members, stages or tasks from CSV or "
+        "JSON lines with bulk inserts. Load the kinds in the order: "
+        f"{', '.join(IMPORT_KINDS)}."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("kind", choices=IMPORT_KINDS)
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=IMPORT_FORMATS,
+            default=None,
+            help="File format, guessed by the extension by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.PLAN_IMPORT_CHUNK_SIZE,
+            help="Number of records saved in one transaction.",
+        )
+        parser.add_argument(
+            "--source",
+            default=None,
+            help=(
+                "Key of the file in the ids of records without id, the "
+                "file name by default. Keep it when the file is renamed, "
+                "give different files of the same name different keys."
+            ),
+        )
+        parser.add_argument(
+            "--skip",
+            type=int,
+            default=0,
+            help="Number of records to skip, to resume a stopped import.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        file_format = options["file_format"]
+        if file_format is None:
+            file_format = (
+                "csv" if options["path"].endswith(".csv") else "jsonl"
+            )
+
+        skip: int = options["skip"]
+        if options["chunk_size"] < 1 or skip < 0:
+            raise CommandError(
+                "--chunk-size must be positive, --skip not negative."
+            )
+        started = time.monotonic()
+
+        def report(progress: ImportProgress) -> None:
+            """Print the progress after every committed chunk."""
+            rate = progress.records / (time.monotonic() - started or 1)
+            self.stdout.write(
+                f"{skip + progress.records} records processed "
+                f"(line {progress.line}, {progress.skipped} existing "
+                f"skipped), {rate:.0f} records/s"
+            )
+
+        records = islice(
+            read_records(options["path"], file_format), skip, None
+        )
+        try:
+            progress = import_records(
+                options["kind"],
+                records,
+                # id записей без id выводятся из ключа файла и номера
+                # строки, не из пути: файл можно перенести или скопировать
+                options["source"] or Path(options["path"]).name,
+                options["chunk_size"],
+                report,
+            )
+        except ImportRecordError as error:
+            raise CommandError(
+                f"{error} Chunks before the line are saved, run again to "
+                "resume: existing records are skipped."
+            ) from error
+        except DatabaseError as error:
+            raise CommandError(
+                f"{error} Chunks before the failed one are saved."
+            ) from error
+        except OSError as error:
+            raise CommandError(error) from error
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {skip + progress.records} {options['kind']} "
+                f"records in {time.monotonic() - started:.1f} s, "
+                f"{progress.skipped} of them existed and were skipped."
+            )
+        )
@@ -0,0 +1,63 @@
+"""Rebuild stored completion counters."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from app_plan.counters import recount_project_counters, recount_stage_counters
+from app_plan.models import Project, Stage
+
+
+class Command(BaseCommand):
+    """Recount completion counters of projects and stages."""
+
+    help = (
+        "Rebuilds stored task/stage counters of stages and projects "
+        "from scratch."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--project",
+            dest="projects",
+            action="append",
+            default=None,
+            help="Project id to recount (can be repeated). All by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of projects recounted in one transaction.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run it as management command."""
+        projects = Project.objects.order_by("pk")
+        if options["projects"]:
+            projects = projects.filter(pk__in=options["projects"])
+
+        batch_size: int = options["batch_size"]
+        project_ids = list(projects.values_list("pk", flat=True))
+        stages_updated = projects_updated = 0
+
+        # пакетами, чтобы не держать долгие блокировки на больших таблицах
+        for start in range(0, len(project_ids), batch_size):
+            end = start + batch_size
+            batch = project_ids[start:end]
+            with transaction.atomic():
+                stages_updated += recount_stage_counters(
+                    Stage.objects.filter(project_id__in=batch).values_list(
+                        "pk", flat=True
+                    )
+                )
+                projects_updated += recount_project_counters(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recounted {stages_updated} stages "
+                f"and {projects_updated} projects."
+            )
+        )
@@ -0,0 +1,74 @@
+"""Stored completion counters for projects and stages."""
+
+from typing import Any
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps: Any, schema_editor: Any) -> None:
+    """Calculate counters for the already existing stages and projects."""
+    Project = apps.get_model("app_plan", "Project")
+    Stage = apps.get_model("app_plan", "Stage")
+    Task = apps.get_model("app_plan", "Task")
+
+    def recount(child: Any, parent: Any, field: str, prefix: str) -> None:
+        counts = (
+            child.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+        )
+        total = counts.annotate(cnt=Count("pk")).values("cnt")
+        completed = counts.annotate(
+            cnt=Count("pk", filter=Q(status="done"))
+        ).values("cnt")
+        parent.objects.update(
+            **{
+                f"{prefix}_total": Coalesce(Subquery(total), 0),
+                f"{prefix}_completed": Coalesce(Subquery(completed), 0),
+            }
+        )
+
+    recount(Task, Stage, "stage", "tasks")
+    recount(Stage, Project, "project", "stages")
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="stages_completed",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Completed stages"
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="stages_total",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Total stages"
+            ),
+        ),
+        migrations.AddField(
+            model_name="stage",
+            name="tasks_completed",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Completed tasks"
+            ),
+        ),
+        migrations.AddField(
+            model_name="stage",
+            name="tasks_total",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Total tasks"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+"""Composite indexes for status and date-range queries."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0002_completion_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stage",
+            index=models.Index(
+                fields=["project", "status"], name="stage_project_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["stage", "status"], name="task_stage_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assignee", "status", "date_end"],
+                name="task_assignee_status_end_idx",
+            ),
+        ),
+    ]
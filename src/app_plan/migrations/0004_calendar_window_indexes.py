@@ -0,0 +1,26 @@
+"""Indexes for calendar window (interval overlap) queries."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0003_status_date_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stage",
+            index=models.Index(
+                fields=["date_end", "date_start"], name="stage_dates_end_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["date_end", "date_start"], name="task_dates_end_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+"""Index for keyset pagination of projects."""
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0004_calendar_window_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["created_at", "id"], name="project_created_idx"
+            ),
+        ),
+    ]
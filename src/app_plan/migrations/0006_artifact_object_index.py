@@ -0,0 +1,22 @@
+"""Index for generic relation lookups of artifacts."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0005_project_created_index"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="artifact",
+            index=models.Index(
+                fields=["content_type", "object_id"],
+                name="artifact_object_idx",
+            ),
+        ),
+    ]
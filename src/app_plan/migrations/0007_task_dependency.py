@@ -0,0 +1,70 @@
+"""Finish-to-start dependencies between tasks."""
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0006_artifact_object_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDependency",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "lag_days",
+                    models.IntegerField(default=0, verbose_name="Lag (days)"),
+                ),
+                (
+                    "predecessor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="successor_links",
+                        to="app_plan.task",
+                        verbose_name="Predecessor",
+                    ),
+                ),
+                (
+                    "successor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="predecessor_links",
+                        to="app_plan.task",
+                        verbose_name="Successor",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task dependency",
+                "verbose_name_plural": "Task dependencies",
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("predecessor", models.F("successor")),
+                            _negated=True,
+                        ),
+                        name="taskdependency_not_self",
+                    )
+                ],
+                "unique_together": {("predecessor", "successor")},
+            },
+        ),
+    ]
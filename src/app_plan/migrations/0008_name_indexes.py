@@ -0,0 +1,22 @@
+"""Indexes for prefix search of projects and stages by name."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0007_task_dependency"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["name"], name="project_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="stage",
+            index=models.Index(fields=["name"], name="stage_name_idx"),
+        ),
+    ]
@@ -0,0 +1,51 @@
+"""FULLTEXT indexes for the search of projects, stages, tasks, contacts.
+
+Created on MariaDB/MySQL only. SQLite gets FTS5 tables after every
+migration (see ``app_plan.search.ensure_sqlite_indexes``).
+"""
+
+from typing import Any
+
+from django.db import migrations
+
+FULLTEXT_INDEXES = (
+    ("app_plan_project", "project_fulltext_idx", ("name", "description")),
+    ("app_plan_stage", "stage_fulltext_idx", ("name", "description")),
+    ("app_plan_task", "task_fulltext_idx", ("name", "description")),
+    ("app_plan_contact", "contact_fulltext_idx", ("full_name", "role")),
+)
+
+
+def create_indexes(apps: Any, schema_editor: Any) -> None:
+    """Create FULLTEXT indexes on MariaDB/MySQL."""
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    quote = schema_editor.quote_name
+    for table, name, columns in FULLTEXT_INDEXES:
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX {quote(name)} ON {quote(table)} "
+            f"({', '.join(map(quote, columns))})"
+        )
+
+
+def drop_indexes(apps: Any, schema_editor: Any) -> None:
+    """Drop FULLTEXT indexes on MariaDB/MySQL."""
+    if schema_editor.connection.vendor != "mysql":
+        return
+
+    quote = schema_editor.quote_name
+    for table, name, _ in FULLTEXT_INDEXES:
+        schema_editor.execute(f"DROP INDEX {quote(name)} ON {quote(table)}")
+
+
+class Migration(migrations.Migration):
+    """Django Migration."""
+
+    dependencies = [
+        ("app_plan", "0008_name_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,7 +1,11 @@
 """Django ORM models for app_plan."""
 
+from datetime import date
+from typing import Any
+
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from app_auth.models import User
@@ -17,6 +21,56 @@ class StatusChoices(models.TextChoices):
     ARCHIVED = "archived", "Archived"
 
 
+def calc_percentage(completed: int, total: int) -> int:
+    """Return the rounded share of completed items in percent."""
+    if not total:
+        return 0
+    return round((completed / total) * 100)
+
+
+class ProjectQuerySet(models.QuerySet):
+    """Custom QuerySet for a Project model."""
+
+    def with_tree(self) -> "ProjectQuerySet":
+        """Prefetch the whole project hierarchy with a fixed query count.
+
+        Artifacts are generic relations and are loaded separately
+        (see ArtifactQuerySet.for_project_tree).
+        """
+        return self.select_related("manager").prefetch_related(
+            models.Prefetch(
+                "projectteammember_set",
+                queryset=ProjectTeamMember.objects.select_related(
+                    "user"
+                ).order_by("created_at"),
+            ),
+            models.Prefetch(
+                "stages",
+                queryset=Stage.objects.order_by("date_start", "created_at"),
+            ),
+            models.Prefetch(
+                "stages__tasks",
+                queryset=Task.objects.order_by("date_start", "created_at"),
+            ),
+            models.Prefetch(
+                "contacts",
+                queryset=Contact.objects.order_by("created_at"),
+            ),
+        )
+
+
+class PlanItemQuerySet(models.QuerySet):
+    """Custom QuerySet for scheduled items (stages and tasks)."""
+
+    def overlapping(
+        self,
+        date_from: date,
+        date_to: date,
+    ) -> "PlanItemQuerySet":
+        """Filter items whose [date_start, date_end] overlaps the window."""
+        return self.filter(date_end__gte=date_from, date_start__lte=date_to)
+
+
 class Project(UUIDModel):
     """Project Model."""
 
@@ -48,19 +102,29 @@ class Project(UUIDModel):
         default=StatusChoices.NOT_STARTED,
     )
 
+    # счетчики поддерживаются сигналами (см. app_plan.counters)
+    stages_total = models.PositiveIntegerField(
+        verbose_name="Total stages",
+        default=0,
+        editable=False,
+    )
+    stages_completed = models.PositiveIntegerField(
+        verbose_name="Completed stages",
+        default=0,
+        editable=False,
+    )
+
+    objects = ProjectQuerySet.as_manager()
+
     stages: models.Manager["Stage"]
 
     @property
     def completion_percentage(self) -> int:
         """Calculate the percentage of project completion.
 
-        Based on completed stages.
+        Based on the stored counters of completed stages.
         """
-        stages = self.stages.all()
-        if not stages.exists():
-            return 0
-        completed = stages.filter(status=StatusChoices.COMPLETED).count()
-        return round((completed / stages.count()) * 100)
+        return calc_percentage(self.stages_completed, self.stages_total)
 
     def __str__(self) -> str:
         """Model string representation."""
@@ -71,6 +135,15 @@ class Project(UUIDModel):
 
         verbose_name = "Project"
         verbose_name_plural = "Projects"
+        indexes = [
+            # порядок списка и ключ курсорной пагинации
+            models.Index(
+                fields=["created_at", "id"],
+                name="project_created_idx",
+            ),
+            # поиск по префиксу имени в виджетах автодополнения
+            models.Index(fields=["name"], name="project_name_idx"),
+        ]
 
 
 class ProjectTeamMember(UUIDModel):
@@ -130,19 +203,29 @@ class Stage(UUIDModel):
         default=StatusChoices.NOT_STARTED,
     )
 
+    # счетчики поддерживаются сигналами (см. app_plan.counters)
+    tasks_total = models.PositiveIntegerField(
+        verbose_name="Total tasks",
+        default=0,
+        editable=False,
+    )
+    tasks_completed = models.PositiveIntegerField(
+        verbose_name="Completed tasks",
+        default=0,
+        editable=False,
+    )
+
+    objects = PlanItemQuerySet.as_manager()
+
     tasks: models.Manager["Task"]
 
     @property
-    def completion_percentage(self) -> float:
+    def completion_percentage(self) -> int:
         """Calculate the percentage of stage completion.
 
-        Based on completed tasks.
+        Based on the stored counters of completed tasks.
         """
-        tasks = self.tasks.all()
-        if not tasks.exists():
-            return 0
-        completed_tasks = tasks.filter(status=StatusChoices.COMPLETED).count()
-        return round((completed_tasks / tasks.count()) * 100)
+        return calc_percentage(self.tasks_completed, self.tasks_total)
 
     def __str__(self) -> str:
         """Model string representation."""
@@ -158,6 +241,19 @@ class Stage(UUIDModel):
 
         verbose_name = "Project stage"
         verbose_name_plural = "Project stages"
+        indexes = [
+            models.Index(
+                fields=["project", "status"],
+                name="stage_project_status_idx",
+            ),
+            # пересечение с окном: date_end >= начала окна отсекает
+            # прошедшие записи, date_start проверяется по индексу
+            models.Index(
+                fields=["date_end", "date_start"],
+                name="stage_dates_end_idx",
+            ),
+            models.Index(fields=["name"], name="stage_name_idx"),
+        ]
 
 
 class Task(UUIDModel):
@@ -190,6 +286,8 @@ class Task(UUIDModel):
         default=StatusChoices.NOT_STARTED,
     )
 
+    objects = PlanItemQuerySet.as_manager()
+
     def __str__(self) -> str:
         """Model string representation."""
         base_str: str = f"Task {self.name} in stage {self.stage.name}"
@@ -204,6 +302,99 @@ class Task(UUIDModel):
 
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            models.Index(
+                fields=["stage", "status"],
+                name="task_stage_status_idx",
+            ),
+            models.Index(
+                fields=["assignee", "status", "date_end"],
+                name="task_assignee_status_end_idx",
+            ),
+            # пересечение с окном: date_end >= начала окна отсекает
+            # прошедшие записи, date_start проверяется по индексу
+            models.Index(
+                fields=["date_end", "date_start"],
+                name="task_dates_end_idx",
+            ),
+        ]
+
+
+class TaskDependency(UUIDModel):
+    """Finish-to-start dependency between two tasks of one project.
+
+    The successor may start not earlier than ``lag_days`` days after the
+    predecessor is finished (negative lag means lead).
+    """
+
+    predecessor = models.ForeignKey(
+        to=Task,
+        verbose_name="Predecessor",
+        on_delete=models.CASCADE,
+        related_name="successor_links",
+    )
+    successor = models.ForeignKey(
+        to=Task,
+        verbose_name="Successor",
+        on_delete=models.CASCADE,
+        related_name="predecessor_links",
+    )
+    lag_days = models.IntegerField(verbose_name="Lag (days)", default=0)
+
+    def clean(self) -> None:
+        """Allow links only between different tasks of the same project."""
+        if not (self.predecessor_id and self.successor_id):
+            return
+        if self.predecessor_id == self.successor_id:
+            raise ValidationError("A task can not depend on itself.")
+
+        projects = set(
+            Stage.objects.filter(
+                tasks__in=[self.predecessor_id, self.successor_id]
+            ).values_list("project_id", flat=True)
+        )
+        if len(projects) > 1:
+            raise ValidationError("Tasks must belong to the same project.")
+
+    def __str__(self) -> str:
+        """Model string representation."""
+        return f"Dependency {self.predecessor_id} -> {self.successor_id}"
+
+    class Meta:  # type:ignore
+        """Model metadata."""
+
+        verbose_name = "Task dependency"
+        verbose_name_plural = "Task dependencies"
+        unique_together = ("predecessor", "successor")
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(predecessor=models.F("successor")),
+                name="taskdependency_not_self",
+            ),
+        ]
+
+
+class ArtifactQuerySet(models.QuerySet):
+    """Custom QuerySet for an Artifact model."""
+
+    def for_project_tree(self, project_id: Any) -> "ArtifactQuerySet":
+        """Filter artifacts of a project, its stages and tasks in one query."""
+        get_ct = ContentType.objects.get_for_model
+        return self.filter(
+            models.Q(content_type=get_ct(Project), object_id=project_id)
+            | models.Q(
+                content_type=get_ct(Stage),
+                object_id__in=Stage.objects.filter(
+                    project_id=project_id
+                ).values("pk"),
+            )
+            | models.Q(
+                content_type=get_ct(Task),
+                object_id__in=Task.objects.filter(
+                    stage__project_id=project_id
+                ).values("pk"),
+            )
+        ).order_by("created_at")
 
 
 class Artifact(UUIDModel):
@@ -231,6 +422,8 @@ class Artifact(UUIDModel):
         fk_field="object_id",
     )
 
+    objects = ArtifactQuerySet.as_manager()
+
     def __str__(self) -> str:
         """Model string representation."""
         return self.title
@@ -240,6 +433,12 @@ class Artifact(UUIDModel):
 
         verbose_name = "Artifact"
         verbose_name_plural = "Artifacts"
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id"],
+                name="artifact_object_idx",
+            ),
+        ]
 
 
 class Contact(UUIDModel):
@@ -0,0 +1,19 @@
+"""Custom paginators for app_plan."""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ProjectCursorPagination(CursorPagination):
+    """Keyset pagination of projects by creation time.
+
+    Does not run COUNT(*) and does not use OFFSET for deep pages. DRF
+    seeks on the first ordering field only: the cursor keeps a
+    ``created_at`` value and skips the projects created at the same
+    microsecond by an offset. ``id`` makes the order of such projects
+    stable between pages.
+    """
+
+    ordering = ("created_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = settings.PLAN_MAX_PAGE_SIZE
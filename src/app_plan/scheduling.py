@@ -0,0 +1,258 @@
+"""Critical path scheduling of project tasks.
+
+Tasks and finish-to-start dependencies are loaded with two flat queries
+(see ``app_plan.arrays``) and converted to NumPy arrays. The DAG is
+sorted topologically (Kahn's algorithm), then forward and backward
+passes relax all edges leaving one topological level at once.
+
+All dates are day offsets from the earliest planned task start. Finish
+offsets are exclusive: a task with ``early_start=0`` and duration 3
+occupies days 0, 1 and 2.
+"""
+
+from datetime import date, timedelta
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from app_plan.arrays import date_ordinals, fetch_columns, index_of
+from app_plan.models import Task, TaskDependency
+
+
+class CycleError(Exception):
+    """The dependency graph contains a cycle."""
+
+    def __init__(self, task_ids: list[Any]) -> None:
+        """Keep ids of the tasks that could not be ordered."""
+        self.task_ids = task_ids
+        super().__init__(
+            f"Dependency cycle detected among {len(task_ids)} tasks."
+        )
+
+
+class ScheduleArrays(NamedTuple):
+    """Result of the critical path method over index-based arrays."""
+
+    order: np.ndarray
+    early_start: np.ndarray
+    early_finish: np.ndarray
+    late_start: np.ndarray
+    late_finish: np.ndarray
+    slack: np.ndarray
+    critical: np.ndarray
+
+
+class ProjectSchedule(NamedTuple):
+    """Schedule of a project's tasks."""
+
+    origin: date | None
+    finish: date | None
+    task_ids: list[Any]
+    arrays: ScheduleArrays
+
+    def to_date(self, offset: int) -> date:
+        """Convert a day offset to a calendar date."""
+        return self.origin + timedelta(days=int(offset))  # type: ignore
+
+    @property
+    def critical_path(self) -> list[Any]:
+        """Return ids of critical tasks in topological order."""
+        critical = self.arrays.critical
+        return [self.task_ids[i] for i in self.arrays.order if critical[i]]
+
+
+def _topological_levels(
+    n: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+) -> np.ndarray:
+    """Return the topological level of every node.
+
+    Kahn's algorithm runs over plain lists built from the CSR arrays:
+    its cost is linear in the size of the graph and, unlike a
+    level-by-level NumPy loop, does not depend on its depth.
+
+    Raises:
+        CycleError: If some nodes are not reachable from the sources.
+    """
+    # CSR-представление исходящих ребер
+    targets = dst[np.argsort(src, kind="stable")].tolist()
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    bounds = offsets.tolist()
+
+    indegree = np.bincount(dst, minlength=n).tolist()
+    level = [0] * n
+    queue = np.flatnonzero(np.equal(indegree, 0)).tolist()
+
+    # очередь растет во время обхода
+    for node in queue:
+        next_level = level[node] + 1
+        start, end = bounds[node], bounds[node + 1]
+        for target in targets[start:end]:
+            if level[target] < next_level:
+                level[target] = next_level
+            indegree[target] -= 1
+            if not indegree[target]:
+                queue.append(target)
+
+    if len(queue) < n:
+        raise CycleError(_cycle_nodes(src, dst, np.flatnonzero(indegree)))
+    return np.array(level, dtype=np.int64)
+
+
+def _cycle_nodes(
+    src: np.ndarray,
+    dst: np.ndarray,
+    unordered: np.ndarray,
+) -> list[int]:
+    """Return the nodes lying on cycles.
+
+    Kahn's algorithm leaves unordered both the cycles and everything
+    downstream of them. The downstream part is peeled off by the same
+    algorithm run backwards over the unordered subgraph.
+    """
+    mask = np.zeros(int(max(src.max(), dst.max())) + 1, dtype=bool)
+    mask[unordered] = True
+    inner = mask[src] & mask[dst]
+    sub_src, sub_dst = src[inner], dst[inner]
+
+    # обратное CSR-представление: входящие ребра узла
+    by_dst = np.argsort(sub_dst, kind="stable")
+    sources = sub_src[by_dst].tolist()
+    offsets = np.zeros(len(mask) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sub_dst, minlength=len(mask)), out=offsets[1:])
+    bounds = offsets.tolist()
+
+    outdegree = np.bincount(sub_src, minlength=len(mask))
+    queue = unordered[outdegree[unordered] == 0].tolist()
+    remaining = outdegree.tolist()
+    for node in queue:
+        mask[node] = False
+        start, end = bounds[node], bounds[node + 1]
+        for source in sources[start:end]:
+            remaining[source] -= 1
+            if not remaining[source]:
+                queue.append(source)
+    return np.flatnonzero(mask).tolist()
+
+
+def compute_schedule(
+    starts: np.ndarray,
+    durations: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    lags: np.ndarray,
+) -> ScheduleArrays:
+    """Run the critical path method over arrays.
+
+    Args:
+        starts (np.ndarray): Earliest allowed start of each task (offsets).
+        durations (np.ndarray): Duration of each task in days.
+        src (np.ndarray): Predecessor index of each dependency.
+        dst (np.ndarray): Successor index of each dependency.
+        lags (np.ndarray): Lag of each dependency in days.
+
+    Raises:
+        CycleError: If the dependencies contain a cycle.
+
+    Returns:
+        ScheduleArrays: Early/late dates, slack and critical flags.
+    """
+    n = len(starts)
+    level = _topological_levels(n, src, dst)
+
+    # ребра группируются по уровню предшественника: в проходе вперед
+    # к началу обработки группы все ее предшественники уже посчитаны
+    edge_order = np.argsort(level[src], kind="stable")
+    src, dst, lags = src[edge_order], dst[edge_order], lags[edge_order]
+    bounds = np.flatnonzero(np.diff(level[src])) + 1
+    groups = list(zip(np.r_[0, bounds], np.r_[bounds, len(src)]))
+
+    early_start = starts.astype(np.int64)
+    for lo, hi in groups:
+        s, d = src[lo:hi], dst[lo:hi]
+        finish = early_start[s] + durations[s] + lags[lo:hi]
+        np.maximum.at(early_start, d, finish)
+    early_finish = early_start + durations
+
+    project_finish = early_finish.max() if n else 0
+    late_finish = np.full(n, project_finish, dtype=np.int64)
+    for lo, hi in reversed(groups):
+        s, d = src[lo:hi], dst[lo:hi]
+        start = late_finish[d] - durations[d] - lags[lo:hi]
+        np.minimum.at(late_finish, s, start)
+    late_start = late_finish - durations
+
+    slack = late_start - early_start
+    return ScheduleArrays(
+        order=np.lexsort((early_start, level)),
+        early_start=early_start,
+        early_finish=early_finish,
+        late_start=late_start,
+        late_finish=late_finish,
+        slack=slack,
+        critical=slack == 0,
+    )
+
+
+def schedule_project(project_id: Any) -> ProjectSchedule:
+    """Load the project's tasks and dependencies and schedule them.
+
+    Planned task start dates are used as "start no earlier than"
+    constraints, durations are taken from the planned dates.
+
+    Raises:
+        CycleError: If the dependencies contain a cycle (``task_ids``
+            are converted to Task primary keys).
+    """
+    raw_ids, date_start, date_end = fetch_columns(
+        Task.objects.filter(stage__project_id=project_id)
+        .order_by()
+        .values_list("pk", "date_start", "date_end"),
+        3,
+    )
+    if not raw_ids:
+        return ProjectSchedule(None, None, [], compute_schedule(*_empty(5)))
+
+    days_start = date_ordinals(date_start)
+    days_end = date_ordinals(date_end)
+    origin = int(days_start.min())
+    starts = days_start - origin
+    durations = np.maximum(days_end - days_start + 1, 1)
+
+    predecessors, successors, lags = fetch_columns(
+        TaskDependency.objects.filter(
+            predecessor__stage__project_id=project_id,
+            successor__stage__project_id=project_id,
+        )
+        .order_by()
+        .values_list("predecessor_id", "successor_id", "lag_days"),
+        3,
+    )
+    # ключи связей переводятся в индексы задач бинарным поиском
+    ids = np.array(raw_ids)
+    src = index_of(ids, predecessors)
+    dst = index_of(ids, successors)
+
+    to_python = Task._meta.pk.to_python  # type: ignore
+    task_ids = [to_python(value) for value in raw_ids]
+    try:
+        arrays = compute_schedule(
+            starts,
+            durations,
+            src,
+            dst,
+            np.array(lags, dtype=np.int64),
+        )
+    except CycleError as exc:
+        raise CycleError([task_ids[i] for i in exc.task_ids]) from exc
+
+    first_day = date.fromordinal(origin)
+    finish = first_day + timedelta(days=int(arrays.early_finish.max()) - 1)
+    return ProjectSchedule(first_day, finish, task_ids, arrays)
+
+
+def _empty(count: int) -> list[np.ndarray]:
+    """Return empty integer arrays."""
+    return [np.empty(0, dtype=np.int64) for _ in range(count)]
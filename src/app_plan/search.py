@@ -0,0 +1,238 @@
+"""Full-text search over projects, stages, tasks and contacts.
+
+MariaDB/MySQL search FULLTEXT indexes (migration 0009) in boolean mode.
+SQLite, used for tests and local runs, searches FTS5 tables kept in sync
+by triggers (see ``ensure_sqlite_indexes``). Other backends fall back to
+``icontains`` over the same columns.
+
+Every word of the query must occur in the object, as a word or as a
+prefix of a word: "dep plan" finds "Deployment plan".
+"""
+
+import re
+from typing import Any, Iterable
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import (
+    BooleanField,
+    Case,
+    Expression,
+    FloatField,
+    Model,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+
+from app_plan.models import Contact, Project, Stage, Task
+
+# индексируемые колонки моделей, первая - название объекта
+SEARCH_FIELDS: dict[type[Model], tuple[str, ...]] = {
+    Project: ("name", "description"),
+    Stage: ("name", "description"),
+    Task: ("name", "description"),
+    Contact: ("full_name", "role"),
+}
+
+# типы объектов в ответе API и путь к id их проекта
+SEARCH_TYPES: dict[str, tuple[type[Model], str]] = {
+    "project": (Project, "pk"),
+    "stage": (Stage, "project_id"),
+    "task": (Task, "stage__project_id"),
+    "contact": (Contact, "project_id"),
+}
+
+# слов запроса больше этого числа не учитываются
+MAX_WORDS = 10
+
+
+def search_words(text: str) -> list[str]:
+    """Split the search text into words without query operators."""
+    return re.findall(r"\w+", text.lower())[:MAX_WORDS]
+
+
+def search_queryset(queryset: QuerySet, text: str) -> QuerySet:
+    """Filter objects matching the text and annotate their relevance.
+
+    Args:
+        queryset (QuerySet): Objects of a model from SEARCH_FIELDS.
+        text (str): Search text typed by the user.
+
+    Returns:
+        QuerySet: Matching objects with a ``search_rank`` annotation
+            (higher is more relevant), not ordered.
+    """
+    words = search_words(text)
+    if not words:
+        return queryset.none()
+
+    connection = connections[queryset.db]
+    fields = SEARCH_FIELDS[queryset.model]
+    if connection.vendor == "mysql":
+        return _mysql_search(connection, queryset, fields, words)
+    if connection.vendor == "sqlite":
+        return _sqlite_search(connection, queryset, words)
+    return _fallback_search(queryset, fields, words)
+
+
+def search_objects(
+    text: str,
+    types: Iterable[str],
+    limit: int,
+) -> list[dict[str, Any]]:
+    """Return the most relevant objects of the given types.
+
+    Every type is searched by its own query; relevance of different
+    types is compared as is.
+
+    Args:
+        text (str): Search text typed by the user.
+        types (Iterable[str]): Keys of SEARCH_TYPES.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list[dict[str, Any]]: Items with type, id, name, project id and
+            rank, the most relevant first.
+    """
+    results: list[dict[str, Any]] = []
+    for type_name in types:
+        model, project = SEARCH_TYPES[type_name]
+        rows = (
+            search_queryset(model._default_manager.all(), text)
+            .order_by("-search_rank")
+            .values_list("pk", SEARCH_FIELDS[model][0], project, "search_rank")
+        )
+        results.extend(
+            {
+                "type": type_name,
+                "id": pk,
+                "name": name,
+                "project": project_id,
+                "rank": rank,
+            }
+            for pk, name, project_id, rank in rows[:limit]
+        )
+
+    results.sort(key=lambda item: item["rank"], reverse=True)
+    return results[:limit]
+
+
+def ensure_sqlite_indexes(connection: BaseDatabaseWrapper) -> None:
+    """Create and fill FTS5 tables of the searched models on SQLite.
+
+    Runs after every ``migrate``: SQLite rebuilds a table when its
+    columns are altered, which drops the triggers of the old table. The
+    FTS5 tables keep the primary key of the objects, not their rowid:
+    UUID-keyed tables have an implicit rowid, which VACUUM may change.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model, fields in SEARCH_FIELDS.items():
+            table = model._meta.db_table
+            fts = quote(f"{table}_fts")
+            pk = quote(model._meta.pk.column)
+            columns = ", ".join(map(quote, (model._meta.pk.column, *fields)))
+            new = ", ".join(f"new.{quote(field)}" for field in fields)
+            # строка FTS5 ищется по индексу ключа, а не перебором
+            delete = (
+                f"DELETE FROM {fts} WHERE {fts} MATCH "
+                f"'{pk}:\"' || old.{pk} || '\"';"
+            )
+            insert = f"INSERT INTO {fts}({columns}) VALUES (new.{pk}, {new});"
+            triggers = {
+                "ai": ("INSERT", insert),
+                "ad": ("DELETE", delete),
+                "au": ("UPDATE", delete + insert),
+            }
+            # таблицы пересоздаются: заполнение заново стоит столько же,
+            # сколько перестроение, и заменяет таблицы старого формата
+            for suffix in triggers:
+                cursor.execute(
+                    "DROP TRIGGER IF EXISTS "
+                    f"{quote(f'{table}_fts_{suffix}')}"
+                )
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+            cursor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({columns})")
+            cursor.execute(
+                f"INSERT INTO {fts}({columns}) "
+                f"SELECT {columns} FROM {quote(table)}"
+            )
+            for suffix, (event, body) in triggers.items():
+                cursor.execute(
+                    f"CREATE TRIGGER {quote(f'{table}_fts_{suffix}')} "
+                    f"AFTER {event} ON {quote(table)} BEGIN {body} END"
+                )
+
+
+def _mysql_search(
+    connection: BaseDatabaseWrapper,
+    queryset: QuerySet,
+    fields: tuple[str, ...],
+    words: list[str],
+) -> QuerySet:
+    """Search the FULLTEXT index with MATCH ... AGAINST."""
+    quote = connection.ops.quote_name
+    table = quote(queryset.model._meta.db_table)
+    columns = ", ".join(f"{table}.{quote(field)}" for field in fields)
+    sql = f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)"
+    query = " ".join(f"+{word}*" for word in words)
+    # одинаковые MATCH в WHERE и SELECT вычисляются по индексу один раз
+    return queryset.filter(
+        RawSQL(sql, (query,), output_field=BooleanField())
+    ).annotate(search_rank=RawSQL(sql, (query,), output_field=FloatField()))
+
+
+def _sqlite_search(
+    connection: BaseDatabaseWrapper,
+    queryset: QuerySet,
+    words: list[str],
+) -> QuerySet:
+    """Search the FTS5 table of the model joined by primary key.
+
+    The join is expressed with ``extra()``: the ORM can not join a table
+    that is not a model, and a correlated subquery per row would repeat
+    the full-text query for every match.
+    """
+    quote = connection.ops.quote_name
+    table = queryset.model._meta.db_table
+    fts = f"{table}_fts"
+    pk = quote(queryset.model._meta.pk.column)
+    # только текстовые колонки: ключ в FTS5-таблице не ищется
+    columns = " ".join(SEARCH_FIELDS[queryset.model])
+    words_query = " ".join(f'"{word}"*' for word in words)
+    return queryset.extra(
+        tables=[fts],
+        where=[
+            f"{quote(fts)}.{pk} = {quote(table)}.{pk}",
+            f"{quote(fts)} MATCH %s",
+        ],
+        params=[f"{{{columns}}} : ({words_query})"],
+        # rank - bm25, отрицательный, чем меньше - тем релевантнее
+        select={"search_rank": f"-{quote(fts)}.rank"},
+    )
+
+
+def _fallback_search(
+    queryset: QuerySet,
+    fields: tuple[str, ...],
+    words: list[str],
+) -> QuerySet:
+    """Search with LIKE, words found in the name weigh more."""
+    condition = Q()
+    rank: Expression = Value(0.0)
+    for word in words:
+        word_condition = Q()
+        for field in fields:
+            word_condition |= Q(**{f"{field}__icontains": word})
+        condition &= word_condition
+        rank = rank + Case(
+            When(Q(**{f"{fields[0]}__icontains": word}), then=Value(2.0)),
+            default=Value(1.0),
+        )
+    return queryset.filter(condition).annotate(search_rank=rank)
@@ -1,12 +1,42 @@
 """DRF serializers for app_plan."""
 
+from typing import Any, cast
+
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_field
 from rest_framework.serializers import (
+    BooleanField,
+    CharField,
+    ChoiceField,
+    DateField,
+    DictField,
+    FloatField,
     HyperlinkedIdentityField,
+    IntegerField,
+    ListField,
+    ListSerializer,
     ModelSerializer,
+    MultipleChoiceField,
+    PrimaryKeyRelatedField,
+    Serializer,
+    SerializerMethodField,
     StringRelatedField,
+    UUIDField,
+    ValidationError,
 )
 
-from app_plan.models import Project
+from app_plan.export import EXPORT_FORMATS
+from app_plan.models import (
+    Artifact,
+    Contact,
+    Project,
+    ProjectTeamMember,
+    Stage,
+    Task,
+)
+from app_plan.search import SEARCH_TYPES, search_words
+from app_plan.services import CASCADE_STATUSES, bulk_save_tasks
+from app_plan.workload import PERIODS
 
 
 class ProjectListSerializer(ModelSerializer):
@@ -44,3 +74,510 @@ class ProjectDetailSerializer(ModelSerializer):
 
         model = Project
         fields = "__all__"
+
+
+class TreeArtifactSerializer(ModelSerializer):
+    """Serializer for an artifact inside the project tree."""
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Artifact
+        fields = ("id", "title", "description", "file")
+
+
+class TreeArtifactsMixin(Serializer):
+    """Take artifacts of an object from the preloaded map in the context.
+
+    The view puts ``{object_id: [Artifact, ...]}`` to ``context["artifacts"]``.
+    """
+
+    artifacts = SerializerMethodField()
+
+    @extend_schema_field(TreeArtifactSerializer(many=True))
+    def get_artifacts(self, obj: Any) -> list[dict]:
+        """Serialize preloaded artifacts of the object."""
+        artifacts = self.context.get("artifacts", {}).get(obj.pk, [])
+        serializer = TreeArtifactSerializer(
+            artifacts,
+            many=True,
+            context=self.context,
+        )
+        return cast(list[dict], serializer.data)
+
+
+class TreeTeamMemberSerializer(ModelSerializer):
+    """Serializer for a team member inside the project tree."""
+
+    username = CharField(source="user.username", read_only=True)
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = ProjectTeamMember
+        fields = ("id", "user", "username", "role")
+
+
+class TreeTaskSerializer(TreeArtifactsMixin, ModelSerializer):
+    """Serializer for a task inside the project tree."""
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Task
+        fields = (
+            "id",
+            "name",
+            "description",
+            "date_start",
+            "date_end",
+            "assignee",
+            "status",
+            "artifacts",
+        )
+
+
+class TreeStageSerializer(TreeArtifactsMixin, ModelSerializer):
+    """Serializer for a stage inside the project tree."""
+
+    tasks = TreeTaskSerializer(many=True, read_only=True)
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Stage
+        fields = (
+            "id",
+            "name",
+            "description",
+            "date_start",
+            "date_end",
+            "responsible",
+            "status",
+            "completion_percentage",
+            "tasks",
+            "artifacts",
+        )
+
+
+class TreeContactSerializer(ModelSerializer):
+    """Serializer for a contact inside the project tree."""
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Contact
+        fields = ("id", "full_name", "role", "email", "phone")
+
+
+class ProjectTreeSerializer(TreeArtifactsMixin, ModelSerializer):
+    """Serializer for the whole project hierarchy."""
+
+    manager = StringRelatedField(read_only=True)  # type: ignore
+    team = TreeTeamMemberSerializer(
+        source="projectteammember_set",
+        many=True,
+        read_only=True,
+    )
+    stages = TreeStageSerializer(many=True, read_only=True)
+    contacts = TreeContactSerializer(many=True, read_only=True)
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Project
+        fields = (
+            "id",
+            "name",
+            "description",
+            "date_start",
+            "date_end",
+            "manager",
+            "status",
+            "completion_percentage",
+            "team",
+            "stages",
+            "contacts",
+            "artifacts",
+        )
+
+
+class ProjectTransitionSerializer(Serializer):
+    """Target status of a cascading project transition."""
+
+    status = ChoiceField(
+        choices=[(s.value, s.label) for s in CASCADE_STATUSES]
+    )
+
+
+class ProjectTransitionResultSerializer(Serializer):
+    """Numbers of objects affected by a cascading transition."""
+
+    projects = IntegerField()
+    stages = IntegerField()
+    tasks = IntegerField()
+
+
+class ScheduledTaskSerializer(Serializer):
+    """Calculated schedule of a single task."""
+
+    id = UUIDField()
+    early_start = DateField()
+    early_finish = DateField()
+    late_start = DateField()
+    late_finish = DateField()
+    slack = IntegerField(help_text="Total float in days.")
+    critical = BooleanField()
+
+
+class ProjectScheduleSerializer(Serializer):
+    """Critical path schedule of a project."""
+
+    start = DateField(allow_null=True)
+    finish = DateField(allow_null=True)
+    critical_path = ListField(child=UUIDField())
+    tasks = ScheduledTaskSerializer(many=True)
+
+
+class DateWindowSerializer(Serializer):
+    """Query parameters of a date window."""
+
+    date_from = DateField()
+    date_to = DateField()
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Check that the window is not empty and not too wide."""
+        days = (attrs["date_to"] - attrs["date_from"]).days
+        if days < 0:
+            raise ValidationError("date_from must not be after date_to.")
+        if days > settings.PLAN_CALENDAR_MAX_DAYS:
+            raise ValidationError(
+                "The window must not exceed "
+                f"{settings.PLAN_CALENDAR_MAX_DAYS} days."
+            )
+        return attrs
+
+
+class CalendarQuerySerializer(DateWindowSerializer):
+    """Query parameters of the calendar window."""
+
+    project = UUIDField(required=False)
+    assignee = UUIDField(required=False, help_text="User id.")
+
+
+class CalendarStageSerializer(ModelSerializer):
+    """Serializer for a stage in the calendar window."""
+
+    project = PrimaryKeyRelatedField(read_only=True)  # type: ignore
+    responsible = StringRelatedField(read_only=True)  # type: ignore
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Stage
+        fields = (
+            "id",
+            "project",
+            "name",
+            "date_start",
+            "date_end",
+            "responsible",
+            "status",
+        )
+
+
+class CalendarTaskSerializer(ModelSerializer):
+    """Serializer for a task in the calendar window."""
+
+    stage = PrimaryKeyRelatedField(read_only=True)  # type: ignore
+    project = UUIDField(source="project_id", read_only=True)
+    assignee = StringRelatedField(read_only=True)  # type: ignore
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Task
+        fields = (
+            "id",
+            "project",
+            "stage",
+            "name",
+            "date_start",
+            "date_end",
+            "assignee",
+            "status",
+        )
+
+
+class CalendarSerializer(Serializer):
+    """Stages and tasks scheduled in the calendar window."""
+
+    date_from = DateField()
+    date_to = DateField()
+    stages = CalendarStageSerializer(many=True)
+    tasks = CalendarTaskSerializer(many=True)
+
+
+class WorkloadQuerySerializer(DateWindowSerializer):
+    """Query parameters of a workload report."""
+
+    period = ChoiceField(choices=PERIODS, default="week")
+
+
+class WorkloadPeriodSerializer(Serializer):
+    """A period of a workload report."""
+
+    start = DateField()
+    end = DateField()
+    capacity = IntegerField(help_text="Business days in the period.")
+
+
+class WorkloadRowSerializer(Serializer):
+    """Workload of one person, one value per period."""
+
+    id = UUIDField(help_text="Team member id (user id organization-wide).")
+    username = CharField()
+    task_days = ListField(
+        child=IntegerField(),
+        help_text="Sum of business days of all open tasks.",
+    )
+    load = ListField(
+        child=FloatField(),
+        help_text="Task days divided by capacity (1.0 = fully loaded).",
+    )
+    peak = ListField(
+        child=IntegerField(),
+        help_text="Maximum number of parallel tasks on one day.",
+    )
+
+
+class WorkloadSerializer(Serializer):
+    """Workload of people over a date window."""
+
+    date_from = DateField()
+    date_to = DateField()
+    period = CharField()
+    periods = WorkloadPeriodSerializer(many=True)
+    people = WorkloadRowSerializer(many=True)
+
+
+class CacheViewStatsSerializer(Serializer):
+    """Cache efficiency of one cached representation."""
+
+    hits = IntegerField()
+    misses = IntegerField()
+    hit_ratio = FloatField(allow_null=True)
+
+
+class CacheStatsSerializer(Serializer):
+    """Cache efficiency of project representations."""
+
+    detail = CacheViewStatsSerializer()
+    tree = CacheViewStatsSerializer()
+    workload = CacheViewStatsSerializer()
+    invalidations = IntegerField(help_text="Invalidated project versions.")
+
+
+class DatabasePoolSerializer(Serializer):
+    """Connections of one database pool of a worker."""
+
+    size = IntegerField()
+    open = IntegerField()
+    idle = IntegerField()
+
+
+class DatabaseWorkerSerializer(Serializer):
+    """Database pools of the worker which served the request."""
+
+    pid = IntegerField()
+    pools = DictField(child=DatabasePoolSerializer())
+
+
+class DatabaseStatsSerializer(Serializer):
+    """Reuse of pooled database connections."""
+
+    created = IntegerField(help_text="Connections opened.")
+    reused = IntegerField(help_text="Connections taken from a pool.")
+    discarded = IntegerField(
+        help_text="Connections closed as dead, too old or broken."
+    )
+    waits = IntegerField(help_text="Checkouts waiting for a free connection.")
+    wait_ms = IntegerField(help_text="Total time of the waits in ms.")
+    timeouts = IntegerField(help_text="Waits ended without a connection.")
+    reuse_ratio = FloatField(allow_null=True)
+    worker = DatabaseWorkerSerializer()
+
+
+class TaskBulkListSerializer(ListSerializer):
+    """Validate and persist a batch of tasks together.
+
+    Referenced stages, team members and updated tasks are loaded with one
+    query per model instead of one query per item.
+    """
+
+    def validate(self, attrs: list[dict]) -> list[dict]:
+        """Check references and dates of all items at once."""
+        max_items = settings.PLAN_BULK_MAX_TASKS
+        if len(attrs) > max_items:
+            raise ValidationError(f"No more than {max_items} tasks allowed.")
+
+        task_ids = [item["id"] for item in attrs if item.get("id")]
+        self.existing_tasks = Task.objects.in_bulk(task_ids)
+
+        # для обновляемых задач недостающие поля берем из базы
+        items = [self._merge_with_existing(item) for item in attrs]
+
+        stages = Stage.objects.in_bulk(
+            {item.get("stage_id") for item in items}
+        )
+        members = dict(
+            ProjectTeamMember.objects.filter(
+                pk__in={item.get("assignee_id") for item in items}
+            ).values_list("pk", "project_id")
+        )
+
+        errors: dict[str, dict[str, str]] = {}
+        seen_ids: set = set()
+        for index, item in enumerate(items):
+            item_errors = self._validate_item(item, stages, members)
+            # повторное обновление задачи в пакете затерло бы первое
+            if item.get("id") in seen_ids:
+                item_errors = {"id": "Task repeated in the batch."}
+            elif item.get("id"):
+                seen_ids.add(item["id"])
+            if item_errors:
+                errors[str(index)] = item_errors
+        if errors:
+            raise ValidationError(errors)
+
+        return attrs
+
+    def _merge_with_existing(self, item: dict) -> dict:
+        """Return the item completed with stored values of the task."""
+        if not item.get("id"):
+            return item
+        task = self.existing_tasks.get(item["id"])
+        if task is None:
+            return item
+        return {
+            "stage_id": task.stage_id,
+            "assignee_id": task.assignee_id,
+            "date_start": task.date_start,
+            "date_end": task.date_end,
+        } | item
+
+    def _validate_item(
+        self,
+        item: dict,
+        stages: dict[Any, Stage],
+        members: dict[Any, Any],
+    ) -> dict[str, str]:
+        """Return validation errors of a single item."""
+        if item.get("id") and item["id"] not in self.existing_tasks:
+            return {"id": "Task not found."}
+
+        stage = stages.get(item.get("stage_id"))
+        if stage is None:
+            return {"stage": "Stage not found."}
+
+        errors: dict[str, str] = {}
+        assignee_id = item.get("assignee_id")
+        if assignee_id and members.get(assignee_id) != stage.project_id:
+            errors["assignee"] = "Assignee is not in the stage's project team."
+
+        date_start, date_end = item["date_start"], item["date_end"]
+        if date_start > date_end:
+            errors["date_end"] = "End date is before start date."
+        elif date_start < stage.date_start or date_end > stage.date_end:
+            errors["date_start"] = "Task dates must be inside the stage."
+        return errors
+
+    def create(self, validated_data: list[dict]) -> list[Task]:
+        """Persist the batch with bulk inserts/updates in one transaction."""
+        return bulk_save_tasks(validated_data, self.existing_tasks)
+
+
+class TaskBulkItemSerializer(ModelSerializer):
+    """A task in a batch. Items with an id update existing tasks."""
+
+    id = UUIDField(required=False)
+    stage = UUIDField(source="stage_id", required=False)
+    assignee = UUIDField(source="assignee_id", required=False, allow_null=True)
+
+    class Meta:  # type: ignore
+        """Serializer metadata."""
+
+        model = Task
+        fields = (
+            "id",
+            "stage",
+            "name",
+            "description",
+            "date_start",
+            "date_end",
+            "assignee",
+            "status",
+        )
+        extra_kwargs = {
+            "name": {"required": False},
+            "date_start": {"required": False},
+            "date_end": {"required": False},
+        }
+        list_serializer_class = TaskBulkListSerializer
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Require the fields that have no default for new tasks."""
+        if not attrs.get("id"):
+            missing = {"stage_id", "name", "date_start", "date_end"} - set(
+                attrs
+            )
+            if missing:
+                raise ValidationError(
+                    {
+                        name.removesuffix("_id"): "Required for new tasks."
+                        for name in sorted(missing)
+                    }
+                )
+        return attrs
+
+
+class SearchQuerySerializer(Serializer):
+    """Query parameters of the full-text search."""
+
+    q = CharField(max_length=200, help_text="Words to search for.")
+    types = MultipleChoiceField(
+        choices=tuple(SEARCH_TYPES),
+        required=False,
+        help_text="Types of objects to search, all by default.",
+    )
+    limit = IntegerField(
+        min_value=1,
+        max_value=settings.PLAN_SEARCH_MAX_RESULTS,
+        default=20,
+    )
+
+    def validate_q(self, value: str) -> str:
+        """Check that the query contains words."""
+        if not search_words(value):
+            raise ValidationError("The query must contain a word.")
+        return value
+
+
+class SearchResultSerializer(Serializer):
+    """An object found by the full-text search."""
+
+    type = ChoiceField(choices=tuple(SEARCH_TYPES))
+    id = UUIDField()
+    name = CharField()
+    project = UUIDField(help_text="Project the object belongs to.")
+    rank = FloatField(help_text="Relevance, higher is better.")
+
+
+class ExportQuerySerializer(Serializer):
+    """Query parameters of the streaming export."""
+
+    output = ChoiceField(
+        choices=tuple(EXPORT_FORMATS),
+        default="csv",
+        help_text="File format: CSV with a header or JSON lines.",
+    )
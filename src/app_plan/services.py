@@ -0,0 +1,131 @@
+"""Set-based write operations for app_plan."""
+
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from app_plan.cache import invalidate_projects
+from app_plan.counters import recount_stage_counters
+from app_plan.models import Project, Stage, StatusChoices, Task
+
+# статусы, которые каскадно распространяются на этапы и задачи
+CASCADE_STATUSES = (StatusChoices.COMPLETED, StatusChoices.ARCHIVED)
+
+
+def bulk_save_tasks(
+    items: list[dict[str, Any]],
+    existing_tasks: dict[Any, Task],
+) -> list[Task]:
+    """Create and update tasks with bulk queries in one transaction.
+
+    Signals are not sent, so the stage counters are recounted for all
+    touched stages afterwards.
+
+    Args:
+        items (list[dict[str, Any]]): Validated task data. Items with an
+            "id" update tasks from ``existing_tasks``, the rest are created.
+        existing_tasks (dict[Any, Task]): Updated tasks by primary key.
+
+    Returns:
+        list[Task]: Saved tasks in the order of items.
+    """
+    batch_size: int = settings.PLAN_BULK_BATCH_SIZE
+    saved: list[Task] = []
+    to_create: list[Task] = []
+    to_update: list[Task] = []
+    update_fields: set[str] = set()
+    stage_ids: set[Any] = set()
+
+    for item in items:
+        data = dict(item)
+        task_id = data.pop("id", None)
+        if not task_id:
+            task = Task(**data)
+            to_create.append(task)
+        else:
+            task = existing_tasks[task_id]
+            # старый этап тоже нужно пересчитать при переносе задачи
+            stage_ids.add(task.stage_id)
+            for field, value in data.items():
+                setattr(task, field, value)
+            update_fields.update(data)
+            to_update.append(task)
+        stage_ids.add(task.stage_id)
+        saved.append(task)
+
+    with transaction.atomic():
+        Task.objects.bulk_create(to_create, batch_size=batch_size)
+        if to_update:
+            # bulk_update не проставляет auto_now поля
+            now = timezone.now()
+            for task in to_update:
+                task.updated_at = now
+            Task.objects.bulk_update(
+                to_update,
+                fields=sorted(update_fields | {"updated_at"}),
+                batch_size=batch_size,
+            )
+        recount_stage_counters(stage_ids)
+        invalidate_projects(
+            Stage.objects.filter(pk__in=stage_ids).values_list(
+                "project_id", flat=True
+            )
+        )
+
+    return saved
+
+
+def transition_projects(
+    project_ids: list[Any],
+    status: str,
+) -> dict[str, int]:
+    """Move projects with all their stages and tasks to a final status.
+
+    Uses one UPDATE per table inside a transaction, signals are not sent.
+    Completion counters are set directly: everything is completed for
+    COMPLETED, nothing is completed for ARCHIVED.
+
+    Args:
+        project_ids (list[Any]): Primary keys of the projects.
+        status (str): One of CASCADE_STATUSES.
+
+    Raises:
+        ValueError: If the status can not be cascaded.
+
+    Returns:
+        dict[str, int]: Affected projects, stages and tasks.
+    """
+    if status not in CASCADE_STATUSES:
+        raise ValueError(f"Status {status!r} can not be cascaded.")
+
+    is_completed = status == StatusChoices.COMPLETED
+    now = timezone.now()
+    project_ids = list(project_ids)
+    stages = Stage.objects.filter(project_id__in=project_ids)
+
+    with transaction.atomic():
+        # фильтр по stage_id через подзапрос: без JOIN в UPDATE для MySQL
+        tasks_count = Task.objects.filter(
+            stage_id__in=stages.values("pk")
+        ).update(status=status, updated_at=now)
+        stages_count = stages.update(
+            status=status,
+            updated_at=now,
+            tasks_completed=F("tasks_total") if is_completed else Value(0),
+        )
+        projects_count = Project.objects.filter(pk__in=project_ids).update(
+            status=status,
+            updated_at=now,
+            stages_completed=(F("stages_total") if is_completed else Value(0)),
+        )
+        # сигналы не отправлялись - кэш проектов сбрасывается явно
+        invalidate_projects(project_ids)
+
+    return {
+        "projects": projects_count,
+        "stages": stages_count,
+        "tasks": tasks_count,
+    }
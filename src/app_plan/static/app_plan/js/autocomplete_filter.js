@@ -0,0 +1,17 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // выбор в фильтре списка перезагружает страницу с новым параметром
+    $(document).on('change', 'select.autocomplete-list-filter', function() {
+        const url = new URL(window.location.href);
+        const isnull = this.name.replace(/__[^_]+__exact$/, '__isnull');
+        url.searchParams.delete(this.name);
+        url.searchParams.delete(isnull);
+        url.searchParams.delete('p');
+        if (this.value) {
+            url.searchParams.set(this.name, this.value);
+        }
+        window.location.href = url.toString();
+    });
+}
@@ -0,0 +1,153 @@
+"""Tests of app_plan.
+
+Run with the SQLite settings of ``core.test_settings``, where the
+``replica1`` and ``replica2`` aliases mirror the primary database.
+"""
+
+import json
+from contextlib import ExitStack
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from app_auth.models import User
+from app_plan import cache
+from app_plan.conditional import project_validators
+from app_plan.export import iter_chunks
+from app_plan.models import Project, ProjectTeamMember
+from core.db import routers
+
+
+@override_settings(PLAN_EXPORT_CHUNK_SIZE=2)
+class ExportViewTests(TransactionTestCase):
+    """Streaming export read from replicas."""
+
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self) -> None:
+        """Create projects, log in a staff user."""
+        routers._lags.clear()
+        self.projects = Project.objects.bulk_create(
+            Project(
+                name=f"Project {number}",
+                date_start=date(2025, 1, 1),
+                date_end=date(2025, 12, 31),
+            )
+            for number in range(5)
+        )
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create_user(username="staff", is_staff=True)
+        )
+
+    def test_streams_chunks_from_one_replica(self) -> None:
+        """Rows are read in chunks from one replica after the view."""
+        response = self.client.get(
+            "/api/plan/export/projects/", {"output": "ndjson"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # строки читаются только при чтении тела ответа
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(
+                    CaptureQueriesContext(connections[alias])
+                )
+                for alias in (DEFAULT_DB_ALIAS, "replica1", "replica2")
+            }
+            lines = response.getvalue().decode().splitlines()
+
+        self.assertEqual(
+            sorted(json.loads(line)["id"] for line in lines),
+            sorted(str(project.pk) for project in self.projects),
+        )
+        queries = {alias: len(context) for alias, context in captured.items()}
+        self.assertEqual(queries[DEFAULT_DB_ALIAS], 0)
+        # 5 строк по 2 за запрос - три запроса к одной реплике
+        self.assertEqual(
+            sorted((queries["replica1"], queries["replica2"])), [0, 3]
+        )
+
+    def test_lagging_replicas_export_primary(self) -> None:
+        """With every replica lagging the rows come from the primary."""
+        with self.settings(DB_REPLICA_MAX_LAG=-1):
+            response = self.client.get("/api/plan/export/projects/")
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as ctx:
+                content = response.getvalue().decode()
+        self.assertEqual(len(content.splitlines()), 1 + len(self.projects))
+        self.assertEqual(len(ctx), 3)
+
+
+class ExportChunkTests(SimpleTestCase):
+    """Arguments of the chunked reading."""
+
+    def test_chunk_size_must_be_positive(self) -> None:
+        """A chunk size below 1 is rejected before any query."""
+        for chunk_size in (0, -1):
+            with self.assertRaises(ValueError):
+                next(iter_chunks("tasks", chunk_size))
+
+
+class UserCacheTests(TestCase):
+    """Cached projects follow the names of their users."""
+
+    def setUp(self) -> None:
+        """Create a project with a manager and a team member."""
+        self.manager = User.objects.create_user(username="manager")
+        self.member = User.objects.create_user(username="member")
+        self.project = Project.objects.create(
+            name="Project",
+            date_start=date(2025, 1, 1),
+            date_end=date(2025, 12, 31),
+            manager=self.manager,
+        )
+        ProjectTeamMember.objects.create(
+            project=self.project, user=self.member, role="Developer"
+        )
+        self.other = Project.objects.create(
+            name="Other",
+            date_start=date(2025, 1, 1),
+            date_end=date(2025, 12, 31),
+        )
+
+    def versions(self) -> tuple[int, int]:
+        """Return the cache versions of both projects."""
+        return cache._version(self.project.pk), cache._version(self.other.pk)
+
+    def test_rename_invalidates_user_projects(self) -> None:
+        """Renaming the manager or a member makes only their project stale."""
+        for user in (self.manager, self.member):
+            before = self.versions()
+            user.username = f"{user.username}-renamed"
+            with self.captureOnCommitCallbacks(execute=True):
+                user.save()
+            after = self.versions()
+            self.assertNotEqual(after[0], before[0])
+            self.assertEqual(after[1], before[1])
+
+    def test_rename_changes_validators(self) -> None:
+        """A renamed member changes the ETag and Last-Modified."""
+        before = project_validators(self.project.pk, "detail:json")
+        self.member.username = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.save()
+        after = project_validators(self.project.pk, "detail:json")
+        assert before is not None and after is not None
+        self.assertNotEqual(after.etag, before.etag)
+        self.assertGreater(after.last_modified, before.last_modified)
+
+    def test_login_keeps_cache(self) -> None:
+        """Saving only the last login does not invalidate anything."""
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.member.save(update_fields=["last_login"])
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.versions(), before)
@@ -3,7 +3,22 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from app_plan.views import ProjectViewSet
+from app_plan.async_views import (
+    AsyncCalendarView,
+    AsyncProjectListView,
+    AsyncProjectTreeView,
+    AsyncProjectView,
+)
+from app_plan.views import (
+    CacheStatsView,
+    CalendarView,
+    DatabaseStatsView,
+    ExportView,
+    ProjectViewSet,
+    SearchView,
+    TaskBulkView,
+    WorkloadView,
+)
 
 router = routers.DefaultRouter()
 router.register(r"projects", ProjectViewSet, basename="projects")
@@ -11,5 +26,33 @@ router.register(r"projects", ProjectViewSet, basename="projects")
 app_name = "app_plan"
 
 urlpatterns = [
+    path("calendar/", CalendarView.as_view(), name="calendar"),
+    path("tasks/bulk/", TaskBulkView.as_view(), name="tasks-bulk"),
+    path("workload/", WorkloadView.as_view(), name="workload"),
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("db/stats/", DatabaseStatsView.as_view(), name="db-stats"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("export/<str:table>/", ExportView.as_view(), name="export"),
+    # асинхронные варианты для ASGI-сервера (см. app_plan.async_views)
+    path(
+        "async/projects/",
+        AsyncProjectListView.as_view(),
+        name="async-projects-list",
+    ),
+    path(
+        "async/projects/<str:pk>/",
+        AsyncProjectView.as_view(),
+        name="async-projects-detail",
+    ),
+    path(
+        "async/projects/<str:pk>/tree/",
+        AsyncProjectTreeView.as_view(),
+        name="async-projects-tree",
+    ),
+    path(
+        "async/calendar/",
+        AsyncCalendarView.as_view(),
+        name="async-calendar",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,21 +1,587 @@
 """API endpoints in the app_plan."""
 
-from rest_framework.viewsets import ModelViewSet
+from typing import Any, Callable, Iterator
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import F, QuerySet
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import ModelSerializer
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+)
+from rest_framework.views import APIView
+from rest_framework.viewsets import ModelViewSet
 
-from app_plan.models import Project
-from app_plan.serializers import ProjectDetailSerializer, ProjectListSerializer
+from app_plan.cache import (
+    ORGANIZATION,
+    cache_stats,
+    get_or_build,
+    reset_cache_stats,
+)
+from app_plan.conditional import project_validators
+from app_plan.export import EXPORT_FORMATS, EXPORT_TABLES, export_table
+from app_plan.models import Artifact, Project, Stage, Task
+from app_plan.pagination import ProjectCursorPagination
+from app_plan.scheduling import CycleError, schedule_project
+from app_plan.search import SEARCH_TYPES, search_objects
+from app_plan.serializers import (
+    CacheStatsSerializer,
+    CalendarQuerySerializer,
+    CalendarSerializer,
+    DatabaseStatsSerializer,
+    ExportQuerySerializer,
+    ProjectDetailSerializer,
+    ProjectListSerializer,
+    ProjectScheduleSerializer,
+    ProjectTransitionResultSerializer,
+    ProjectTransitionSerializer,
+    ProjectTreeSerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
+    TaskBulkItemSerializer,
+    WorkloadQuerySerializer,
+    WorkloadSerializer,
+)
+from app_plan.services import transition_projects
+from app_plan.workload import (
+    Workload,
+    organization_workload,
+    project_workload,
+)
+from core.db.pool import pool_stats, reset_pool_stats
+from core.db.routers import replica_reads, routing_state, use_replicas
 
 
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="pagination",
+                enum=["page", "cursor"],
+                description="Pagination mode (page numbers by default).",
+            ),
+            OpenApiParameter(name="cursor", description="Cursor mode only."),
+            OpenApiParameter(
+                name="page_size",
+                type=int,
+                description="Cursor mode only.",
+            ),
+        ],
+    ),
+)
 class ProjectViewSet(ModelViewSet):
     """DRF ViewSet for a Project model."""
 
     queryset = (
         Project.objects.all().order_by("created_at").select_related("manager")
     )
+    cursor_pagination_class = ProjectCursorPagination
+
+    @property
+    def paginator(self) -> BasePagination | None:
+        """Use keyset pagination if the client asked for it."""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def get_queryset(self) -> QuerySet[Project]:
+        """Prefetch the whole hierarchy for the project tree."""
+        queryset = super().get_queryset()
+        if self.action == "tree":
+            return queryset.with_tree()  # type: ignore[attr-defined]
+        return queryset
 
     def get_serializer_class(self) -> type[ModelSerializer]:
         """Return different serializers for list and detail actions."""
         if self.action == "list":
             return ProjectListSerializer
+        if self.action == "tree":
+            return ProjectTreeSerializer
         return ProjectDetailSerializer
+
+    @use_replicas
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """Return a page of projects with completion percentages."""
+        return super().list(request, *args, **kwargs)
+
+    @use_replicas
+    def retrieve(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        """Return the project details, cached until the project changes.
+
+        Supports conditional requests (ETag, Last-Modified).
+        """
+        return self.cached_response(
+            "detail",
+            lambda: super(ProjectViewSet, self)
+            .retrieve(request, *args, **kwargs)
+            .data,
+        )
+
+    @action(detail=True, methods=["get"])
+    @use_replicas
+    def tree(
+        self,
+        request: Request,
+        pk: str | None = None,
+    ) -> Response:
+        """Return the whole project hierarchy in a fixed number of queries.
+
+        Team, stages with tasks, contacts and artifacts of all levels.
+        Cached until anything in the hierarchy changes, supports
+        conditional requests (ETag, Last-Modified).
+        """
+        return self.cached_response("tree", self.build_tree)
+
+    def build_tree(self) -> dict[str, Any]:
+        """Serialize the project hierarchy."""
+        project = self.get_object()
+
+        # артефакты всех уровней - одним запросом, сгруппированные по объекту
+        artifacts: dict = {}
+        for artifact in Artifact.objects.for_project_tree(  # type: ignore
+            project.pk
+        ):
+            artifacts.setdefault(artifact.object_id, []).append(artifact)
+
+        context = self.get_serializer_context()
+        context["artifacts"] = artifacts
+        return self.get_serializer(project, context=context).data
+
+    def cached_response(
+        self,
+        name: str,
+        build: Callable[[], dict[str, Any]],
+    ) -> Response:
+        """Serve a project representation with conditional GET support.
+
+        An unchanged project gets 304 without serialization, a changed
+        one is served from the versioned cache when possible.
+
+        Args:
+            name (str): Name of the representation (see CACHED_VIEWS).
+            build (Callable[[], dict[str, Any]]): Serializes the project.
+        """
+        try:
+            project_id = UUID(str(self.kwargs[self.lookup_field]))
+        except ValueError:
+            # некорректный id - обычный путь с ответом 404
+            return Response(build())
+
+        validators = project_validators(
+            project_id,
+            f"{name}:{self.request.accepted_renderer.format}",
+        )
+        if validators is None:
+            return Response(build())
+
+        last_modified = int(validators.last_modified.timestamp())
+        not_modified = get_conditional_response(
+            self.request,
+            etag=validators.etag,
+            last_modified=last_modified,
+        )
+        if not_modified is not None:
+            response = Response(status=not_modified.status_code)
+        else:
+            # ссылки на файлы абсолютные и зависят от адреса сервиса
+            origin = f"{self.request.scheme}://{self.request.get_host()}"
+            response = Response(
+                get_or_build(
+                    project_id,
+                    name,
+                    origin,
+                    build,
+                    settings.PLAN_PROJECT_CACHE_TIMEOUT,
+                )
+            )
+
+        response["ETag"] = validators.etag
+        response["Last-Modified"] = http_date(last_modified)
+        # клиент должен перепроверять ответ при каждом запросе
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @extend_schema(responses=ProjectScheduleSerializer)
+    @action(detail=True, methods=["get"])
+    @use_replicas
+    def schedule(self, request: Request, pk: str | None = None) -> Response:
+        """Calculate the critical path schedule of the project's tasks.
+
+        Earliest/latest dates and slack of every task, critical path.
+        """
+        project = self.get_object()
+        try:
+            schedule = schedule_project(project.pk)
+        except CycleError as exc:
+            raise ValidationError(
+                {"detail": str(exc), "tasks": exc.task_ids}
+            ) from exc
+
+        arrays, to_date = schedule.arrays, schedule.to_date
+        tasks = [
+            {
+                "id": task_id,
+                "early_start": to_date(arrays.early_start[i]),
+                "early_finish": to_date(arrays.early_finish[i] - 1),
+                "late_start": to_date(arrays.late_start[i]),
+                "late_finish": to_date(arrays.late_finish[i] - 1),
+                "slack": int(arrays.slack[i]),
+                "critical": bool(arrays.critical[i]),
+            }
+            for i, task_id in enumerate(schedule.task_ids)
+        ]
+        serializer = ProjectScheduleSerializer(
+            {
+                "start": schedule.origin,
+                "finish": schedule.finish,
+                "critical_path": schedule.critical_path,
+                "tasks": tasks,
+            }
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[WorkloadQuerySerializer],
+        responses=WorkloadSerializer,
+    )
+    @action(detail=True, methods=["get"])
+    @use_replicas
+    def workload(self, request: Request, pk: str | None = None) -> Response:
+        """Return the workload of the team members per period.
+
+        Open tasks in the window, business days only. Cached per project.
+        """
+        project = self.get_object()
+        query = WorkloadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        return Response(
+            cached_workload(
+                project.pk,
+                params,
+                lambda: project_workload(project.pk, **params),
+            )
+        )
+
+    @extend_schema(
+        request=ProjectTransitionSerializer,
+        responses=ProjectTransitionResultSerializer,
+    )
+    @action(detail=True, methods=["post"], permission_classes=[IsAdminUser])
+    def transition(self, request: Request, pk: str | None = None) -> Response:
+        """Complete or archive the project with all its stages and tasks.
+
+        Available to staff users only.
+        """
+        project = self.get_object()
+        serializer = ProjectTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        affected = transition_projects(
+            [project.pk],
+            serializer.validated_data["status"],
+        )
+        return Response(ProjectTransitionResultSerializer(affected).data)
+
+
+class CalendarView(APIView):
+    """Stages and tasks overlapping a date window."""
+
+    @extend_schema(
+        parameters=[CalendarQuerySerializer],
+        responses=CalendarSerializer,
+    )
+    @use_replicas
+    def get(self, request: Request) -> Response:
+        """Return stages and tasks scheduled between date_from and date_to.
+
+        Optionally filtered by project and by assignee (User id).
+        """
+        query = CalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        stages = self.get_stages(params)
+        tasks = self.get_tasks(params)
+
+        serializer = CalendarSerializer(
+            {
+                "date_from": params["date_from"],
+                "date_to": params["date_to"],
+                "stages": stages,
+                "tasks": tasks,
+            }
+        )
+        return Response(serializer.data)
+
+    @staticmethod
+    def get_stages(params: dict) -> QuerySet[Stage]:
+        """Build the queryset of stages in the window."""
+        stages = Stage.objects.overlapping(  # type: ignore[attr-defined]
+            params["date_from"],
+            params["date_to"],
+        ).select_related("responsible__user")
+        if "project" in params:
+            stages = stages.filter(project_id=params["project"])
+        if "assignee" in params:
+            stages = stages.filter(responsible__user_id=params["assignee"])
+        return stages.order_by("date_start", "date_end")
+
+    @staticmethod
+    def get_tasks(params: dict) -> QuerySet[Task]:
+        """Build the queryset of tasks in the window."""
+        tasks = (
+            Task.objects.overlapping(  # type: ignore[attr-defined]
+                params["date_from"],
+                params["date_to"],
+            )
+            .select_related("assignee__user")
+            .annotate(project_id=F("stage__project_id"))
+        )
+        if "project" in params:
+            tasks = tasks.filter(stage__project_id=params["project"])
+        if "assignee" in params:
+            tasks = tasks.filter(assignee__user_id=params["assignee"])
+        return tasks.order_by("date_start", "date_end")
+
+
+class TaskBulkView(APIView):
+    """Batch creation and update of tasks."""
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        request=TaskBulkItemSerializer(many=True),
+        responses={
+            200: TaskBulkItemSerializer(many=True),
+            201: TaskBulkItemSerializer(many=True),
+        },
+    )
+    def post(self, request: Request) -> Response:
+        """Create or update a list of tasks of one or more stages.
+
+        Items with an id update existing tasks, the others are created.
+        The whole batch is validated together and saved in one transaction.
+        Responds 201 if any task was created, 200 if all were updated.
+        """
+        serializer = TaskBulkItemSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        created = any(not item.get("id") for item in serializer.validated_data)
+        serializer.save()
+        return Response(
+            serializer.data,
+            status=HTTP_201_CREATED if created else HTTP_200_OK,
+        )
+
+
+class WorkloadView(APIView):
+    """Workload of all users across projects."""
+
+    @extend_schema(
+        parameters=[WorkloadQuerySerializer],
+        responses=WorkloadSerializer,
+    )
+    @use_replicas
+    def get(self, request: Request) -> Response:
+        """Return the workload of users with open tasks per period.
+
+        Tasks of all projects are summed per user, business days only.
+        """
+        query = WorkloadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        return Response(
+            cached_workload(
+                ORGANIZATION,
+                params,
+                lambda: organization_workload(**params),
+            )
+        )
+
+
+def cached_workload(
+    scope: Any,
+    params: dict[str, Any],
+    build: Callable[[], Workload],
+) -> dict[str, Any]:
+    """Return serialized workload from the cache or build and cache it.
+
+    Args:
+        scope (Any): Project id or ORGANIZATION.
+        params (dict[str, Any]): Validated WorkloadQuerySerializer data.
+        build (Callable[[], Workload]): Calculates the workload.
+    """
+
+    def serialize() -> dict[str, Any]:
+        workload = build()
+        load = workload.load
+        return WorkloadSerializer(
+            {
+                "date_from": workload.date_from,
+                "date_to": workload.date_to,
+                "period": workload.period,
+                "periods": [
+                    {
+                        "start": start,
+                        "end": workload.period_end(column),
+                        "capacity": int(workload.capacity[column]),
+                    }
+                    for column, start in enumerate(workload.period_starts)
+                ],
+                "people": [
+                    {
+                        "id": person,
+                        "username": workload.usernames[row],
+                        "task_days": workload.task_days[row].tolist(),
+                        "load": load[row].round(3).tolist(),
+                        "peak": workload.peak[row].tolist(),
+                    }
+                    for row, person in enumerate(workload.people)
+                ],
+            }
+        ).data
+
+    return get_or_build(
+        scope,
+        "workload",
+        f"{params['date_from']}:{params['date_to']}:{params['period']}",
+        serialize,
+        settings.PLAN_WORKLOAD_CACHE_TIMEOUT,
+    )
+
+
+class CacheStatsView(APIView):
+    """Efficiency of the project cache shared by all workers."""
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=CacheStatsSerializer)
+    def get(self, request: Request) -> Response:
+        """Return hits, misses and hit ratio per cached representation.
+
+        Also the number of invalidated project versions.
+        """
+        return Response(CacheStatsSerializer(cache_stats()).data)
+
+    @extend_schema(responses={204: None})
+    def delete(self, request: Request) -> Response:
+        """Reset the counters."""
+        reset_cache_stats()
+        return Response(status=HTTP_204_NO_CONTENT)
+
+
+class DatabaseStatsView(APIView):
+    """Reuse of the pooled database connections of all workers."""
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=DatabaseStatsSerializer)
+    def get(self, request: Request) -> Response:
+        """Return connections created, reused and discarded, waits.
+
+        Also the pools of the worker which served the request.
+        """
+        return Response(DatabaseStatsSerializer(pool_stats()).data)
+
+    @extend_schema(responses={204: None})
+    def delete(self, request: Request) -> Response:
+        """Reset the counters."""
+        reset_pool_stats()
+        return Response(status=HTTP_204_NO_CONTENT)
+
+
+class SearchView(APIView):
+    """Ranked full-text search of projects, stages, tasks and contacts."""
+
+    @extend_schema(
+        parameters=[SearchQuerySerializer],
+        responses=SearchResultSerializer(many=True),
+    )
+    @use_replicas
+    def get(self, request: Request) -> Response:
+        """Return objects containing all words of the query.
+
+        The most relevant objects of all requested types come first.
+        """
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        results = search_objects(
+            params["q"],
+            sorted(params.get("types") or SEARCH_TYPES),
+            params["limit"],
+        )
+        return Response(SearchResultSerializer(results, many=True).data)
+
+
+class ExportView(APIView):
+    """Streaming export of all projects, stages or tasks."""
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "table",
+                OpenApiTypes.STR,
+                OpenApiParameter.PATH,
+                enum=tuple(EXPORT_TABLES),
+            ),
+            ExportQuerySerializer,
+        ],
+        responses={
+            (200, content_type): OpenApiTypes.STR
+            for content_type in EXPORT_FORMATS.values()
+        },
+    )
+    def get(self, request: Request, table: str) -> StreamingHttpResponse:
+        """Stream the table as a file, rows are read in chunks.
+
+        Memory of the worker does not depend on the number of rows.
+        """
+        if table not in EXPORT_TABLES:
+            raise Http404
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        output = query.validated_data["output"]
+
+        def rows() -> Iterator[str]:
+            # строки читаются уже после выхода из представления и
+            # промежуточного слоя, поэтому со своим состоянием маршрутизации
+            with routing_state(), replica_reads():
+                yield from export_table(
+                    table, output, settings.PLAN_EXPORT_CHUNK_SIZE
+                )
+
+        response = StreamingHttpResponse(
+            rows(),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{table}.{output}"'
+        )
+        return response
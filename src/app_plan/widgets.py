@@ -0,0 +1,75 @@
+"""Custom admin widgets for app_plan."""
+
+from typing import Any
+
+from django.contrib.admin.widgets import (
+    AutocompleteSelect,
+    ForeignKeyRawIdWidget,
+)
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import ManyToOneRel
+from django.urls import NoReverseMatch, reverse
+from django.utils.http import urlencode
+from django.utils.text import Truncator
+
+
+class SelectRelatedRawIdWidget(ForeignKeyRawIdWidget):
+    """Raw id widget that loads the label object with its relations.
+
+    The label is ``str(obj)``, and ``__str__`` of stages and tasks
+    dereferences related objects, so the object is loaded with joins.
+    """
+
+    def __init__(
+        self,
+        rel: ManyToOneRel,
+        *args: Any,
+        select_related: tuple[str, ...] = (),
+        **kwargs: Any,
+    ) -> None:
+        """Remember the relations the label needs."""
+        self.select_related = select_related
+        super().__init__(rel, *args, **kwargs)
+
+    def label_and_url_for_value(self, value: Any) -> tuple[str, str]:
+        """Build the label and the change URL of the selected object."""
+        model = self.rel.model
+        key = self.rel.get_related_field().name
+        try:
+            obj = (
+                model._default_manager.using(self.db)
+                .select_related(*self.select_related)
+                .get(**{key: value})
+            )
+        except (ValueError, ObjectDoesNotExist, ValidationError):
+            return "", ""
+
+        try:
+            url = reverse(
+                f"{self.admin_site.name}:"
+                f"{obj._meta.app_label}_{obj._meta.model_name}_change",
+                args=(obj.pk,),
+            )
+        except NoReverseMatch:
+            # модель не зарегистрирована в админке
+            url = ""
+
+        return Truncator(obj).words(14), url
+
+
+class ProjectAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete select searching among objects of one project.
+
+    The project id is added to the URL of the autocomplete view, the
+    related model admin restricts the search results by it.
+    """
+
+    def __init__(self, *args: Any, project_id: Any, **kwargs: Any) -> None:
+        """Remember the project to search in."""
+        self.project_id = project_id
+        super().__init__(*args, **kwargs)
+
+    def get_url(self) -> str:
+        """Add the project to the URL of the autocomplete view."""
+        query = urlencode({"project": self.project_id})
+        return f"{super().get_url()}?{query}"
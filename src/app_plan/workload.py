@@ -0,0 +1,241 @@
+"""Workload of people over a date window.
+
+Assignee/date intervals of open tasks are loaded with one flat query
+(see ``app_plan.arrays``). The number of tasks a person works on each
+day is built with difference arrays: +1 on the first day of a task, -1
+after its last day and a cumulative sum along the days. Days are then
+summed into periods with ``np.add.reduceat``. Only business days
+(Monday to Friday) count as load and capacity.
+
+Serialized reports are cached per project and for the whole
+organization by the views, see ``app_plan.cache``.
+"""
+
+from datetime import date, timedelta
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from app_auth.models import User
+from app_plan.arrays import date_ordinals, fetch_columns, index_of
+from app_plan.models import ProjectTeamMember, StatusChoices, Task
+
+PERIODS = ("day", "week", "month")
+
+# завершенные и архивные задачи никого не загружают
+WORKLOAD_STATUSES = (StatusChoices.NOT_STARTED, StatusChoices.IN_PROGRESS)
+
+
+class Workload(NamedTuple):
+    """Allocation matrices of people (rows) over periods (columns)."""
+
+    date_from: date
+    date_to: date
+    period: str
+    period_starts: list[date]
+    capacity: np.ndarray
+    people: list[Any]
+    usernames: list[str]
+    task_days: np.ndarray
+    peak: np.ndarray
+
+    @property
+    def load(self) -> np.ndarray:
+        """Return the share of capacity taken by tasks (1.0 = full)."""
+        return self.task_days / np.maximum(self.capacity, 1)
+
+    def period_end(self, column: int) -> date:
+        """Return the last day of a period inside the window."""
+        if column + 1 < len(self.period_starts):
+            return self.period_starts[column + 1] - timedelta(days=1)
+        return self.date_to
+
+
+def compute_workload(
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    people: int,
+    days: int,
+) -> np.ndarray:
+    """Count the tasks of every person on every day of the window.
+
+    Args:
+        rows (np.ndarray): Person index of each task.
+        starts (np.ndarray): First day of each task (window offset).
+        ends (np.ndarray): Last day of each task (window offset).
+        people (int): Number of people.
+        days (int): Number of days in the window.
+
+    Returns:
+        np.ndarray: people x days matrix of active task counts.
+    """
+    width = days + 1
+    starts = np.clip(starts, 0, days)
+    stops = np.clip(ends + 1, 0, days)
+
+    # разностный массив в плоском виде: bincount быстрее add.at
+    diff = np.bincount(
+        rows * width + starts,
+        minlength=people * width,
+    ) - np.bincount(rows * width + stops, minlength=people * width)
+    return np.cumsum(diff.reshape(people, width)[:, :-1], axis=1)
+
+
+def period_bounds(days: np.ndarray, period: str) -> np.ndarray:
+    """Return offsets of the first day of every period in the window.
+
+    Args:
+        days (np.ndarray): Days of the window (datetime64[D]).
+        period (str): "day", "week" (from Monday) or "month".
+    """
+    if period == "day":
+        return np.arange(len(days))
+    if period == "week":
+        # 1970-01-01 - четверг: сдвиг на 3 дня начинает недели с понедельника
+        keys = (days.astype(np.int64) + 3) // 7
+    else:
+        keys = days.astype("datetime64[M]").astype(np.int64)
+    return np.r_[0, np.flatnonzero(np.diff(keys)) + 1]
+
+
+def build_workload(
+    date_from: date,
+    date_to: date,
+    period: str,
+    people: list[Any],
+    usernames: list[str],
+    owners: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+) -> Workload:
+    """Aggregate task intervals of people into periods.
+
+    Args:
+        date_from (date): First day of the window.
+        date_to (date): Last day of the window.
+        period (str): One of PERIODS.
+        people (list[Any]): Row ids.
+        usernames (list[str]): Row names.
+        owners (np.ndarray): Row index of each task.
+        starts (np.ndarray): Start ordinal of each task.
+        ends (np.ndarray): End ordinal of each task.
+
+    Returns:
+        Workload: Task days, peak load and capacity per period.
+    """
+    origin = date_from.toordinal()
+    days = np.arange(
+        np.datetime64(date_from, "D"),
+        np.datetime64(date_to, "D") + 1,
+    )
+    business = np.is_busday(days)
+
+    daily = compute_workload(
+        owners,
+        starts - origin,
+        ends - origin,
+        len(people),
+        len(days),
+    )
+    daily *= business
+
+    bounds = period_bounds(days, period)
+    task_days = np.add.reduceat(daily, bounds, axis=1)
+    peak = np.maximum.reduceat(daily, bounds, axis=1)
+
+    return Workload(
+        date_from=date_from,
+        date_to=date_to,
+        period=period,
+        period_starts=[date_from + timedelta(days=int(i)) for i in bounds],
+        capacity=np.add.reduceat(business.astype(np.int64), bounds),
+        people=people,
+        usernames=usernames,
+        task_days=task_days,
+        peak=peak,
+    )
+
+
+def project_workload(
+    project_id: Any,
+    date_from: date,
+    date_to: date,
+    period: str,
+) -> Workload:
+    """Return the workload of the project's team members.
+
+    Every team member gets a row, even without tasks in the window.
+    """
+    members, usernames = fetch_columns(
+        ProjectTeamMember.objects.filter(project_id=project_id)
+        .order_by("user__username")
+        .values_list("pk", "user__username"),
+        2,
+    )
+    assignees, date_start, date_end = fetch_columns(
+        Task.objects.overlapping(date_from, date_to)  # type: ignore
+        .filter(
+            stage__project_id=project_id,
+            assignee__isnull=False,
+            status__in=WORKLOAD_STATUSES,
+        )
+        .order_by()
+        .values_list("assignee_id", "date_start", "date_end"),
+        3,
+    )
+    owners = index_of(np.array(members), assignees)
+    # исполнитель из чужого проекта не попадает в команду
+    known = owners >= 0
+
+    to_python = ProjectTeamMember._meta.pk.to_python  # type: ignore
+    return build_workload(
+        date_from,
+        date_to,
+        period,
+        [to_python(value) for value in members],
+        list(usernames),
+        owners[known],
+        date_ordinals(date_start)[known],
+        date_ordinals(date_end)[known],
+    )
+
+
+def organization_workload(
+    date_from: date,
+    date_to: date,
+    period: str,
+) -> Workload:
+    """Return the workload of all users across projects.
+
+    Only users with open tasks in the window get a row.
+    """
+    users, date_start, date_end = fetch_columns(
+        Task.objects.overlapping(date_from, date_to)  # type: ignore
+        .filter(assignee__isnull=False, status__in=WORKLOAD_STATUSES)
+        .order_by()
+        .values_list("assignee__user_id", "date_start", "date_end"),
+        3,
+    )
+    user_keys, owners = np.unique(np.array(users), return_inverse=True)
+
+    to_python = User._meta.pk.to_python  # type: ignore
+    user_ids = [to_python(value) for value in user_keys.tolist()]
+    names = dict(
+        User.objects.filter(pk__in=user_ids).values_list("pk", "username")
+    )
+    rows = sorted(range(len(user_ids)), key=lambda i: names[user_ids[i]])
+    # строки упорядочены по имени пользователя
+    position = np.empty(len(rows), dtype=np.int64)
+    position[rows] = np.arange(len(rows))
+
+    return build_workload(
+        date_from,
+        date_to,
+        period,
+        [user_ids[i] for i in rows],
+        [names[user_ids[i]] for i in rows],
+        position[owners.reshape(-1)],
+        date_ordinals(date_start),
+        date_ordinals(date_end),
+    )
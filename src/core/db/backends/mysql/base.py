@@ -0,0 +1,83 @@
+"""MySQL/MariaDB backend returning connections to a per-process pool.
+
+Enabled by a ``POOL`` dictionary with a positive ``SIZE`` in the
+database settings (see ``core.db.pool.PoolSettings``); without it the
+backend works as the Django one. Django still "closes" the connection at
+the end of every request (``CONN_MAX_AGE = 0``), which puts it back to
+the pool for any thread of the worker.
+"""
+
+from typing import Any
+
+from django.db.backends.mysql import base
+
+from core.db.pool import ConnectionPool, PoolSettings, get_pool
+
+# модуль драйвера (MySQLdb), в заглушках типов Django его нет
+Database = base.Database  # type: ignore[attr-defined]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Django MySQL wrapper taking its connections from the pool."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Read the pool settings of the database."""
+        super().__init__(*args, **kwargs)
+        self.pool_settings = PoolSettings.from_dict(
+            self.settings_dict.get("POOL") or {}
+        )
+        # соединение взято из пула уже настроенным
+        self.pool_reused = False
+
+    @property
+    def pool(self) -> ConnectionPool | None:
+        """Return the pool of the database in this process if enabled."""
+        if self.pool_settings.size <= 0:
+            return None
+        return get_pool(self.alias, self.pool_settings, Database.Error)
+
+    def get_new_connection(self, conn_params: dict[str, Any]) -> Any:
+        """Take a connection from the pool or open a new one."""
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection, self.pool_reused = pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            self._ping,
+        )
+        return connection
+
+    def init_connection_state(self) -> None:
+        """Configure the session once, pooled connections keep it."""
+        if not self.pool_reused:
+            super().init_connection_state()
+
+    def _close(self) -> None:
+        """Return the connection to the pool instead of closing it."""
+        pool = self.pool
+        if pool is None or self.connection is None:
+            super()._close()  # type: ignore[misc]
+            return
+
+        # закрытое внутри транзакции соединение остается у Django
+        usable = not self.in_atomic_block and (
+            not self.errors_occurred or self.is_usable()
+        )
+        if usable:
+            try:
+                # незавершенная транзакция не переходит к другому запросу
+                self.connection.rollback()
+            except Database.Error:
+                usable = False
+        pool.release(self.connection, usable)
+
+    @staticmethod
+    def _ping(connection: Any) -> bool:
+        """Return whether a pooled connection is alive."""
+        try:
+            connection.ping()
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,331 @@
+"""Per-process pool of database connections.
+
+Django keeps at most one connection per thread and, with
+``CONN_MAX_AGE = 0``, opens a new one for every request. The pool keeps
+the connections closed by all threads of a worker open for the next
+requests instead, limits their number per worker and checks the ones
+idle for a while before reuse (see ``core.db.backends.mysql``).
+
+Usage counters are accumulated in the process and added to shared
+counters in the cache after requests (at most every ``FLUSH_INTERVAL``
+seconds), so ``pool_stats`` sums all workers.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, NamedTuple
+
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db.utils import OperationalError
+
+from core.shared_counters import increment
+
+# как часто счетчики процесса переносятся в кэш, в секундах
+FLUSH_INTERVAL = 10
+
+COUNTERS = ("created", "reused", "discarded", "waits", "wait_ms", "timeouts")
+
+
+class PoolSettings(NamedTuple):
+    """Limits of a pool, the ``POOL`` key of the database settings."""
+
+    # соединений на воркер, 0 - без пула
+    size: int
+    # ожидание свободного соединения, в секундах
+    timeout: float
+    # соединения старше пересоздаются, в секундах
+    max_lifetime: float
+    # простаивавшие дольше соединения проверяются перед выдачей
+    check_after: float
+
+    @classmethod
+    def from_dict(cls, options: dict[str, Any]) -> "PoolSettings":
+        """Build the settings from the ``POOL`` dictionary."""
+        return cls(
+            size=int(options.get("SIZE", 0)),
+            timeout=float(options.get("TIMEOUT", 10)),
+            max_lifetime=float(options.get("MAX_LIFETIME", 600)),
+            check_after=float(options.get("CHECK_AFTER", 10)),
+        )
+
+
+class _Idle(NamedTuple):
+    """A connection waiting in the pool."""
+
+    connection: Any
+    created: float
+    released: float
+
+
+class ConnectionPool:
+    """Connections of one database shared by the threads of a process."""
+
+    def __init__(
+        self,
+        settings: PoolSettings,
+        error: type[Exception],
+    ) -> None:
+        """Create an empty pool.
+
+        Args:
+            settings (PoolSettings): Limits of the pool.
+            error (type[Exception]): Base error of the database driver.
+        """
+        self.settings = settings
+        self.error = error
+        self._counts: Counter[str] = Counter()
+        self._idle: deque[_Idle] = deque()
+        # время создания выданных соединений (по id объекта)
+        self._in_use: dict[int, float] = {}
+        # места, занятые проверяемыми и открываемыми сейчас соединениями
+        self._reserved = 0
+        # очередь потоков, ожидающих соединение
+        self._waiters: deque[object] = deque()
+        self._condition = threading.Condition()
+
+    @property
+    def idle(self) -> int:
+        """Return the number of connections waiting in the pool."""
+        return len(self._idle)
+
+    @property
+    def open(self) -> int:
+        """Return the number of open connections, idle and in use."""
+        return len(self._idle) + len(self._in_use) + self._reserved
+
+    def acquire(
+        self,
+        connect: Callable[[], Any],
+        check: Callable[[Any], bool],
+    ) -> tuple[Any, bool]:
+        """Return an idle connection or a new one within the size limit.
+
+        Args:
+            connect (Callable): Opens a new connection.
+            check (Callable): Returns whether a connection is alive.
+
+        Raises:
+            OperationalError: No connection was released in time.
+
+        Returns:
+            tuple[Any, bool]: The connection and whether it was reused.
+        """
+        started = time.monotonic()
+        with self._condition:
+            waited = bool(self._waiters) or self._exhausted
+            if waited:
+                self._wait_turn(started)
+            wait_ms = round((time.monotonic() - started) * 1000)
+            idle = self._idle.pop() if self._idle else None
+            # проверка и открытие соединения - без блокировки пула
+            self._reserved += 1
+
+        connection, discarded = None, False
+        try:
+            if idle is not None:
+                if self._fit(idle, check):
+                    connection = idle.connection
+                else:
+                    discarded = True
+                    self._close(idle.connection)
+            reused = connection is not None
+            if not reused:
+                connection = connect()
+        finally:
+            with self._condition:
+                self._reserved -= 1
+                self._counts["discarded"] += discarded
+                if connection is None:
+                    self._condition.notify_all()
+                else:
+                    self._counts["reused" if reused else "created"] += 1
+                    self._in_use[id(connection)] = (
+                        idle.created  # type: ignore[union-attr]
+                        if reused
+                        else time.monotonic()
+                    )
+                if waited:
+                    self._counts["waits"] += 1
+                    self._counts["wait_ms"] += wait_ms
+        return connection, reused
+
+    @property
+    def _exhausted(self) -> bool:
+        """Return whether a connection can neither be reused nor opened."""
+        return not self._idle and self.open >= self.settings.size
+
+    def _wait_turn(self, started: float) -> None:
+        """Wait under the lock until a connection is free for this thread.
+
+        Waiting threads are served in the order of arrival, so a thread
+        releasing and taking connections in a loop can not starve them.
+        """
+        turn = object()
+        self._waiters.append(turn)
+        try:
+            while self._waiters[0] is not turn or self._exhausted:
+                remaining = started + self.settings.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._counts["timeouts"] += 1
+                    raise OperationalError(
+                        "No database connection released within "
+                        f"{self.settings.timeout} s (pool size "
+                        f"{self.settings.size})."
+                    )
+                self._condition.wait(remaining)
+        finally:
+            self._waiters.remove(turn)
+            # следующий в очереди проверит, не освободилось ли еще место
+            self._condition.notify_all()
+
+    def release(self, connection: Any, usable: bool) -> None:
+        """Return a connection to the pool or close it if not usable."""
+        now = time.monotonic()
+        with self._condition:
+            created = self._in_use.pop(id(connection), None)
+            # соединение не из этого пула или слишком старое
+            if created is None or now - created > self.settings.max_lifetime:
+                usable = False
+            elif usable:
+                self._idle.append(_Idle(connection, created, now))
+            if not usable:
+                self._counts["discarded"] += 1
+            self._condition.notify_all()
+        if not usable:
+            self._close(connection)
+
+    def close_idle(self) -> None:
+        """Close the connections waiting in the pool."""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for item in idle:
+            self._close(item.connection)
+
+    def take_counts(self) -> Counter[str]:
+        """Return the usage counters and start new ones."""
+        with self._condition:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def _fit(self, idle: _Idle, check: Callable[[Any], bool]) -> bool:
+        """Return whether an idle connection may be reused."""
+        now = time.monotonic()
+        if now - idle.created > self.settings.max_lifetime:
+            return False
+        return now - idle.released <= self.settings.check_after or check(
+            idle.connection
+        )
+
+    def _close(self, connection: Any) -> None:
+        """Close a connection ignoring errors of a dead one."""
+        try:
+            connection.close()
+        except self.error:
+            pass
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def get_pool(
+    alias: str,
+    settings: PoolSettings,
+    error: type[Exception],
+) -> ConnectionPool:
+    """Return the pool of a database alias in this process."""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(settings, error)
+        return pool
+
+
+def pool_stats() -> dict[str, Any]:
+    """Return connection usage of all workers and pools of this one.
+
+    Returns:
+        dict[str, Any]: Shared counters (connections created, reused and
+            discarded, waits for a free connection, their total time in
+            ms and timeouts), the reuse ratio and the size, open and
+            idle connections of every pool of the current worker.
+    """
+    flush_pool_stats(force=True)
+    values = cache.get_many([_stat_key(name) for name in COUNTERS])
+    stats: dict[str, Any] = {
+        name: values.get(_stat_key(name), 0) for name in COUNTERS
+    }
+    checkouts = stats["created"] + stats["reused"]
+    stats["reuse_ratio"] = (
+        round(stats["reused"] / checkouts, 4) if checkouts else None
+    )
+    stats["worker"] = {
+        "pid": os.getpid(),
+        "pools": {
+            alias: {
+                "size": pool.settings.size,
+                "open": pool.open,
+                "idle": pool.idle,
+            }
+            for alias, pool in list(_pools.items())
+        },
+    }
+    return stats
+
+
+def reset_pool_stats() -> None:
+    """Reset the shared counters."""
+    for pool in list(_pools.values()):
+        pool.take_counts()
+    cache.delete_many([_stat_key(name) for name in COUNTERS])
+
+
+def flush_pool_stats(force: bool = False, **kwargs: Any) -> None:
+    """Add the counters of this process to the shared ones.
+
+    Connected to ``request_finished`` after the handler closing the
+    connections of the request, so the cache backend may use the
+    database as well.
+    """
+    global _flushed_at
+
+    if not force and time.monotonic() - _flushed_at < FLUSH_INTERVAL:
+        return
+    _flushed_at = time.monotonic()
+    total: Counter[str] = Counter()
+    for pool in list(_pools.values()):
+        total.update(pool.take_counts())
+    for name, delta in total.items():
+        if delta:
+            increment(_stat_key(name), delta)
+
+
+def _stat_key(name: str) -> str:
+    """Return the cache key of a counter."""
+    return f"db:pool:{name}"
+
+
+def _close_idle_pools() -> None:
+    """Close idle connections before fork, they can not be shared."""
+    for pool in list(_pools.values()):
+        pool.close_idle()
+
+
+def _forget_pools() -> None:
+    """Drop the pools inherited from the parent process.
+
+    Connections in use belong to the parent; closing them in the child
+    would end the sessions of the parent.
+    """
+    global _pools_lock
+
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(before=_close_idle_pools, after_in_child=_forget_pools)
+request_finished.connect(flush_pool_stats)
@@ -0,0 +1,233 @@
+"""Routing of read queries to database replicas.
+
+All queries go to the primary database unless a view allows reads from
+replicas (``use_replicas``). Even then a request reads from the primary:
+
+- after it wrote anything (read-after-write within the request);
+- inside a transaction of the primary;
+- when every replica lags more than ``DB_REPLICA_MAX_LAG`` seconds or is
+  unavailable.
+
+A request reads from one replica chosen at random on its first read, so
+all its reads see the same state. The lag of a replica is checked at
+most every ``DB_REPLICA_CHECK_INTERVAL`` seconds per process.
+
+The state of a request is kept by ``ReplicaRoutingMiddleware`` in a
+context variable, so it follows async requests and the threads of their
+``sync_to_async`` calls. Outside a request, and in work done after the
+response is returned without its own ``routing_state``, all queries go
+to the primary.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator, TypeVar, cast
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponseBase
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Routing:
+    """Routing state of one request."""
+
+    def __init__(self) -> None:
+        # представление разрешило чтение с реплик
+        self.replica_reads = False
+        # запрос уже писал в основную БД
+        self.written = False
+        # БД, выбранная для всех чтений запроса с реплик
+        self.read_alias: str | None = None
+
+
+_routing: ContextVar[_Routing] = ContextVar("db_routing")
+
+# отставание реплик: время проверки и секунды (None - реплика недоступна)
+_lags: dict[str, tuple[float, float | None]] = {}
+
+
+class ReplicaRouter:
+    """Send reads allowed by the view to a replica, the rest to primary."""
+
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        """Return the database of the request's reads."""
+        state = _state()
+        if not state.replica_reads or state.written:
+            return None
+        # чтение внутри транзакции должно видеть ее изменения
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if state.read_alias is None:
+            state.read_alias = _choose_replica()
+        return state.read_alias
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str:
+        """Return the primary, the following reads go to it as well."""
+        _state().written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool:
+        """Allow relations between objects of the primary and replicas."""
+        return True
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        model_name: str | None = None,
+        **hints: Any,
+    ) -> bool | None:
+        """Migrate the primary only, replicas receive the changes."""
+        if db in settings.DB_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Give every request its own routing state.
+
+    The state is not set by the ``request_started`` signal: under ASGI
+    its receivers run in a separate task and the context variable set
+    there does not reach the request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Keep the next handler."""
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(
+        self,
+        request: HttpRequest,
+    ) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        """Process the request with a new routing state."""
+        if self.async_mode:
+            return self.__acall__(request)
+        with routing_state():
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        """Process the request of an async handler."""
+        with routing_state():
+            return await self.get_response(request)
+
+
+@contextmanager
+def routing_state() -> Iterator[None]:
+    """Route the queries of the block with a state of their own.
+
+    Besides requests, wraps work done after the middleware has returned,
+    such as the generator of a streaming response.
+    """
+    token = _routing.set(_Routing())
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def replica_reads(enabled: bool = True) -> Iterator[None]:
+    """Allow (or forbid) reads from replicas within the block."""
+    state = _state()
+    previous, state.replica_reads = state.replica_reads, enabled
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+
+
+def use_replicas(view: F) -> F:
+    """Decorate a view or a view method (sync or async) reading replicas.
+
+    Authentication and permission checks of DRF views run before the
+    handler, so they still read the primary.
+    """
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with replica_reads():
+                return await view(*args, **kwargs)
+
+        return cast(F, async_wrapper)
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with replica_reads():
+            return view(*args, **kwargs)
+
+    return cast(F, wrapper)
+
+
+def replica_lag(alias: str) -> float | None:
+    """Return how many seconds a replica is behind the primary.
+
+    Returns:
+        float | None: None if the replica is unavailable or does not
+            replicate (the replication threads are stopped).
+    """
+    now = time.monotonic()
+    checked = _lags.get(alias)
+    interval = settings.DB_REPLICA_CHECK_INTERVAL
+    if checked is None or now - checked[0] >= interval:
+        checked = _lags[alias] = (now, _measure_lag(alias))
+    return checked[1]
+
+
+def _state() -> _Routing:
+    """Return the routing state of the current request."""
+    state = _routing.get(None)
+    if state is None:
+        # вне запроса (команды, прогрев) реплики не разрешены; состояние
+        # не сохраняется, иначе оно осталось бы у потока между запросами
+        return _Routing()
+    return state
+
+
+def _choose_replica() -> str:
+    """Return a random replica lagging within the limit or the primary."""
+    replicas = [
+        alias
+        for alias in settings.DB_REPLICAS
+        if (lag := replica_lag(alias)) is not None
+        and lag <= settings.DB_REPLICA_MAX_LAG
+    ]
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+def _measure_lag(alias: str) -> float | None:
+    """Query the replication status of a replica."""
+    connection = connections[alias]
+    if connection.vendor != "mysql":
+        # другие СУБД (SQLite в локальных проверках) считаются синхронными
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            # MariaDB 10.5.1+ и MySQL 8.0.22+, нужна привилегия
+            # REPLICA MONITOR (REPLICATION CLIENT в MySQL)
+            cursor.execute("SHOW REPLICA STATUS")
+            columns = [column[0] for column in cursor.description or ()]
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        # сервер не реплика, например узел синхронного кластера
+        return 0.0
+    status = dict(zip(columns, row))
+    lag = status.get(
+        "Seconds_Behind_Master", status.get("Seconds_Behind_Source")
+    )
+    return None if lag is None else float(lag)
@@ -0,0 +1,261 @@
+"""Tests of the routing of reads to replicas (``core.db.routers``).
+
+Run with the SQLite settings of ``core.test_settings``, where the
+``replica1`` and ``replica2`` aliases mirror the primary database.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import Context
+from datetime import date
+from typing import Any, Iterator
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpRequest
+from django.test import (
+    AsyncClient,
+    Client,
+    TransactionTestCase,
+    override_settings,
+)
+
+from app_auth.models import User
+from app_plan.models import Project
+from core.db import routers
+from core.db.routers import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    replica_reads,
+    use_replicas,
+)
+
+REPLICAS = {"replica1", "replica2"}
+
+
+def read_alias() -> str:
+    """Return the database of a read of projects."""
+    return Project.objects.all().db
+
+
+def start_request() -> None:
+    """Start the routing state of a new request, as the middleware does."""
+    routers._routing.set(routers._Routing())
+
+
+@contextmanager
+def spy_reads() -> Iterator[list[str | None]]:
+    """Collect the databases chosen for reads within the block."""
+    reads: list[str | None] = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(router: ReplicaRouter, model: Any, **hints: Any) -> Any:
+        alias = db_for_read(router, model, **hints)
+        reads.append(alias)
+        return alias
+
+    with mock.patch.object(ReplicaRouter, "db_for_read", spy):
+        yield reads
+
+
+def create_project() -> Project:
+    """Write a project to the database."""
+    return Project.objects.create(
+        name="Project",
+        date_start=date(2025, 1, 1),
+        date_end=date(2025, 12, 31),
+    )
+
+
+@override_settings(DB_REPLICA_MAX_LAG=5, DB_REPLICA_CHECK_INTERVAL=5)
+class ReplicaRouterTests(TransactionTestCase):
+    """Reads go to a replica only when nothing requires the primary."""
+
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self) -> None:
+        """Start a new request with fresh replica lags."""
+        routers._lags.clear()
+        start_request()
+
+    def test_primary_by_default(self) -> None:
+        """Views not allowing replicas read the primary."""
+        self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_sticky_replica(self) -> None:
+        """All reads of a request go to the same replica."""
+        with replica_reads():
+            alias = read_alias()
+            self.assertIn(alias, REPLICAS)
+            for _ in range(20):
+                self.assertEqual(read_alias(), alias)
+
+    def test_replica_reads_see_primary_data(self) -> None:
+        """A replica mirrors the primary in tests."""
+        project = create_project()
+        start_request()
+        with replica_reads():
+            self.assertTrue(Project.objects.filter(pk=project.pk).exists())
+
+    def test_write_pins_primary(self) -> None:
+        """Reads after a write in the request go to the primary."""
+        with replica_reads():
+            create_project()
+            self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+        self.assertEqual(
+            ReplicaRouter().db_for_write(Project), DEFAULT_DB_ALIAS
+        )
+
+    def test_atomic_block_reads_primary(self) -> None:
+        """Reads in a transaction of the primary see its changes."""
+        with replica_reads():
+            with transaction.atomic():
+                self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_lag_above_limit(self) -> None:
+        """A lagging replica is skipped, all lagging - the primary."""
+        lags = {"replica1": 30.0, "replica2": 1.0}
+        with mock.patch.object(routers, "_measure_lag", side_effect=lags.get):
+            with replica_reads():
+                self.assertEqual(read_alias(), "replica2")
+
+        routers._lags.clear()
+        start_request()
+        with mock.patch.object(routers, "_measure_lag", return_value=30.0):
+            with replica_reads():
+                self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_unavailable_replica(self) -> None:
+        """Unavailable replicas are skipped, none left - the primary."""
+        lags = {"replica1": None, "replica2": 0.0}
+        with mock.patch.object(routers, "_measure_lag", side_effect=lags.get):
+            with replica_reads():
+                self.assertEqual(read_alias(), "replica2")
+
+        routers._lags.clear()
+        start_request()
+        with mock.patch.object(routers, "_measure_lag", return_value=None):
+            with replica_reads():
+                self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_lag_checked_once_per_interval(self) -> None:
+        """The lag of a replica is measured at most once per interval."""
+        with mock.patch.object(
+            routers, "_measure_lag", return_value=0.0
+        ) as measure:
+            for _ in range(3):
+                start_request()
+                with replica_reads():
+                    read_alias()
+        self.assertEqual(measure.call_count, len(REPLICAS))
+
+    def test_migrate_primary_only(self) -> None:
+        """Replicas are not migrated."""
+        router = ReplicaRouter()
+        for alias in REPLICAS:
+            self.assertFalse(router.allow_migrate(alias, "app_plan"))
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, "app_plan"))
+
+
+class AsyncReplicaRouterTests(TransactionTestCase):
+    """The routing state follows async requests and their threads."""
+
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self) -> None:
+        """Reset the replica lags."""
+        routers._lags.clear()
+
+    async def test_async_view_reads_replica(self) -> None:
+        """An async view reads one replica through sync_to_async."""
+        # запись вне запроса не закрепляет запрос за основной БД
+        await sync_to_async(create_project)()
+        with spy_reads() as reads:
+            response = await AsyncClient().get("/api/plan/async/projects/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertTrue(reads)
+        self.assertEqual(len(set(reads)), 1)
+        self.assertIn(reads[0], REPLICAS)
+
+    async def test_concurrent_requests_do_not_share_state(self) -> None:
+        """Writes and replica reads of one task do not leak to another."""
+
+        @use_replicas
+        async def reading_view(request: Any) -> list[str]:
+            aliases = []
+            for _ in range(3):
+                aliases.append(await sync_to_async(read_alias)())
+                await asyncio.sleep(0)
+            return aliases
+
+        @use_replicas
+        async def writing_view(request: Any) -> list[str]:
+            await sync_to_async(create_project)()
+            await asyncio.sleep(0)
+            return [await sync_to_async(read_alias)()]
+
+        async def primary_view(request: Any) -> list[str]:
+            await asyncio.sleep(0)
+            return [await sync_to_async(read_alias)()]
+
+        async def request(view: Any) -> Any:
+            # как у ASGI-сервера: каждый запрос в своей задаче
+            middleware = ReplicaRoutingMiddleware(view)
+            return await middleware.__acall__(HttpRequest())
+
+        reading, writing, primary = await asyncio.gather(
+            request(reading_view),
+            request(writing_view),
+            request(primary_view),
+        )
+        self.assertEqual(len(set(reading)), 1)
+        self.assertIn(reading[0], REPLICAS)
+        self.assertEqual(writing, [DEFAULT_DB_ALIAS])
+        self.assertEqual(primary, [DEFAULT_DB_ALIAS])
+
+    def tearDown(self) -> None:
+        """Close the connections opened by the threads of sync_to_async."""
+        for connection in connections.all(initialized_only=True):
+            connection.close()
+
+
+class StreamingReplicaRouterTests(TransactionTestCase):
+    """Streamed responses do not leave their state to the thread."""
+
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self) -> None:
+        """Reset the replica lags, log in a staff user."""
+        routers._lags.clear()
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create_user(username="staff", is_staff=True)
+        )
+
+    def test_next_request_routes_fresh(self) -> None:
+        """After a streamed export the lag guard applies again."""
+        # пустой контекст - как у нового потока воркера
+        Context().run(self._stream_exports)
+
+    def _stream_exports(self) -> None:
+        """Consume exports after the middleware has returned."""
+        create_project()
+        response = self.client.get("/api/plan/export/projects/")
+        with spy_reads() as reads:
+            content = response.getvalue()
+        self.assertIn(b"Project", content)
+        self.assertEqual(len(set(reads)), 1)
+        self.assertIn(reads[0], REPLICAS)
+        self.assertIsNone(routers._routing.get(None))
+
+        routers._lags.clear()
+        with mock.patch.object(routers, "_measure_lag", return_value=999.0):
+            response = self.client.get("/api/plan/export/projects/")
+            with spy_reads() as reads:
+                content = response.getvalue()
+            self.assertIn(b"Project", content)
+            self.assertEqual(set(reads), {DEFAULT_DB_ALIAS})
+            with replica_reads():
+                self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
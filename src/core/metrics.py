@@ -0,0 +1,410 @@
+"""Prometheus metrics of HTTP requests, aggregated across workers.
+
+``MetricsMiddleware`` measures every request: its duration, status code
+and the number and time of the database queries it ran, labelled by the
+name of the resolved URL pattern (``app_plan:projects-list``,
+``admin:app_plan_task_changelist`` and so on). Samples are accumulated
+in the process and added to shared counters in the cache after requests
+(at most every ``FLUSH_INTERVAL`` seconds), like the statistics of the
+connection pool, so ``/metrics`` returns the sums of all workers. The
+project cache and connection pool counters are exported as well.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+
+from app_plan.cache import CACHED_VIEWS, INVALIDATIONS, cache_stats
+from core.db.pool import pool_stats
+from core.shared_counters import increment
+
+# как часто счетчики процесса переносятся в кэш, в секундах
+FLUSH_INTERVAL = 10
+
+# границы корзин гистограммы длительности запросов, в секундах
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# прочие методы объединяются в "other", чтобы не плодить серии
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+# время хранится в микросекундах: incr в Redis и Memcached целочисленный
+MICROSECONDS = 1_000_000
+
+# семейства метрик запросов: тип и описание
+REQUEST_METRICS = {
+    "http_requests_total": (
+        "counter",
+        "Requests by view, method and status code.",
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "Duration of requests by view and method.",
+    ),
+    "http_request_db_queries_total": (
+        "counter",
+        "Database queries run by requests.",
+    ),
+    "http_request_db_duration_seconds_total": (
+        "counter",
+        "Time of the database queries run by requests.",
+    ),
+}
+
+# счетчики пула соединений (core.db.pool): метрика, множитель, описание
+POOL_METRICS = {
+    "created": (
+        "db_pool_connections_created_total",
+        1,
+        "Database connections opened.",
+    ),
+    "reused": (
+        "db_pool_connections_reused_total",
+        1,
+        "Database connections taken from a pool.",
+    ),
+    "discarded": (
+        "db_pool_connections_discarded_total",
+        1,
+        "Database connections closed as dead, too old or broken.",
+    ),
+    "waits": (
+        "db_pool_waits_total",
+        1,
+        "Checkouts waiting for a free database connection.",
+    ),
+    "wait_ms": (
+        "db_pool_wait_seconds_total",
+        0.001,
+        "Time spent waiting for a free database connection.",
+    ),
+    "timeouts": (
+        "db_pool_timeouts_total",
+        1,
+        "Waits for a database connection ended without one.",
+    ),
+}
+
+REGISTRY_KEY = "metrics:series"
+
+Labels = tuple[tuple[str, str], ...]
+# серия: имя образца (с суффиксом _bucket, _sum, _count) и метки
+Series = tuple[str, Labels]
+
+_lock = threading.Lock()
+_counts: Counter[Series] = Counter()
+# все серии процесса по ключам их счетчиков в кэше
+_series: dict[str, Series] = {}
+_flushed_at = time.monotonic()
+
+
+class QueryTimer:
+    """Count the database queries of a request and their time."""
+
+    def __init__(self) -> None:
+        """Start with no queries."""
+        self.count = 0
+        self.duration = 0.0
+
+
+# запросы к БД текущего HTTP-запроса: контекст копируется в потоки
+# sync_to_async, поэтому учитываются и запросы асинхронных представлений
+_queries: ContextVar[QueryTimer | None] = ContextVar(
+    "metrics_queries", default=None
+)
+
+
+class MetricsMiddleware:
+    """Measure the duration and database queries of every request.
+
+    Works in both modes, so requests of the async views under an ASGI
+    server do not hold a thread for the middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Keep the next handler."""
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(
+        self,
+        request: HttpRequest,
+    ) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        """Process the request and record its metrics."""
+        if self.async_mode:
+            return self.__acall__(request)
+
+        queries = QueryTimer()
+        token = _queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        observe_request(
+            request,
+            response.status_code,
+            time.perf_counter() - started,
+            queries,
+        )
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        """Process the request of an async handler."""
+        queries = QueryTimer()
+        token = _queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        observe_request(
+            request,
+            response.status_code,
+            time.perf_counter() - started,
+            queries,
+        )
+        return response
+
+
+def observe_request(
+    request: HttpRequest,
+    status: int,
+    duration: float,
+    queries: QueryTimer,
+) -> None:
+    """Add a finished request to the counters of the process.
+
+    Args:
+        request (HttpRequest): The request, resolved or not.
+        status (int): Status code of the response.
+        duration (float): Time of the request in seconds.
+        queries (QueryTimer): Database queries of the request.
+    """
+    match = request.resolver_match
+    method = request.method if request.method in METHODS else "other"
+    labels: Labels = (
+        ("view", match.view_name if match else "unmatched"),
+        ("method", method or "other"),
+    )
+
+    samples: Counter[Series] = Counter()
+    samples["http_requests_total", (*labels, ("status", str(status)))] = 1
+    histogram = "http_request_duration_seconds"
+    for bound in DURATION_BUCKETS:
+        # пустые корзины тоже нужны: гистограмма кумулятивная
+        samples[f"{histogram}_bucket", (*labels, ("le", str(bound)))] = int(
+            duration <= bound
+        )
+    samples[f"{histogram}_bucket", (*labels, ("le", "+Inf"))] = 1
+    samples[f"{histogram}_count", labels] = 1
+    samples[f"{histogram}_sum", labels] = round(duration * MICROSECONDS)
+    samples["http_request_db_queries_total", labels] = queries.count
+    samples["http_request_db_duration_seconds_total", labels] = round(
+        queries.duration * MICROSECONDS
+    )
+    with _lock:
+        _counts.update(samples)
+
+
+def flush_metrics(force: bool = False, **kwargs: Any) -> None:
+    """Add the counters of this process to the shared ones.
+
+    The list of series in the cache is completed by every flush, so a
+    series lost by concurrent updates of the list appears again.
+    """
+    global _counts, _flushed_at
+
+    if not force and time.monotonic() - _flushed_at < FLUSH_INTERVAL:
+        return
+    with _lock:
+        _flushed_at = time.monotonic()
+        counts, _counts = _counts, Counter()
+
+    for series, delta in counts.items():
+        key = _series_key(series)
+        _series.setdefault(key, series)
+        if delta:
+            increment(key, delta)
+
+    registry = cache.get(REGISTRY_KEY) or {}
+    if not _series.keys() <= registry.keys():
+        cache.set(REGISTRY_KEY, {**registry, **_series}, timeout=None)
+
+
+def render_metrics() -> str:
+    """Return the shared metrics in the Prometheus text format."""
+    registry: dict[str, Series] = cache.get(REGISTRY_KEY) or {}
+    values = cache.get_many(list(registry))
+    families: dict[str, list[tuple[Series, float]]] = {
+        name: [] for name in REQUEST_METRICS
+    }
+    for key, (name, labels) in registry.items():
+        value = values.get(key, 0)
+        if name.endswith(("_sum", "_seconds_total")):
+            value /= MICROSECONDS
+        family = name.removesuffix("_bucket").removesuffix("_count")
+        family = family.removesuffix("_sum")
+        if family in families:
+            families[family].append(((name, labels), value))
+
+    lines: list[str] = []
+    for family, (kind, help_text) in REQUEST_METRICS.items():
+        lines += [f"# HELP {family} {help_text}", f"# TYPE {family} {kind}"]
+        lines += [
+            _sample(name, labels, value)
+            for (name, labels), value in sorted(
+                families[family], key=_sample_order
+            )
+        ]
+
+    stats = cache_stats()
+    for kind in ("hits", "misses"):
+        family = f"plan_cache_{kind}_total"
+        lines += [
+            f"# HELP {family} Project cache {kind} by representation.",
+            f"# TYPE {family} counter",
+        ]
+        lines += [
+            _sample(family, (("view", view),), stats[view][kind])
+            for view in CACHED_VIEWS
+        ]
+    family = "plan_cache_invalidations_total"
+    lines += [
+        f"# HELP {family} Invalidated project versions.",
+        f"# TYPE {family} counter",
+        _sample(family, (), stats[INVALIDATIONS]),
+    ]
+
+    pool = pool_stats()
+    for counter, (family, scale, help_text) in POOL_METRICS.items():
+        lines += [
+            f"# HELP {family} {help_text}",
+            f"# TYPE {family} counter",
+            _sample(family, (), pool[counter] * scale),
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Return the metrics of all workers for Prometheus.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` or a staff user,
+    unless ``METRICS_PUBLIC`` is set.
+    """
+    if not _allowed(request):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+
+    flush_metrics(force=True)
+    return HttpResponse(
+        render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def time_query(
+    execute: Callable,
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    """Run a query and add it to the timer of the current request."""
+    queries = _queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.count += 1
+        queries.duration += time.perf_counter() - started
+
+
+def install_timer(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """Wrap the queries of a connection (once, it may reconnect)."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def _allowed(request: HttpRequest) -> bool:
+    """Check the access of a scrape to the metrics."""
+    if settings.METRICS_PUBLIC:
+        return True
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    """Return a sample line of the text format."""
+    if labels:
+        pairs = ",".join(
+            f'{label}="{_escape(text)}"' for label, text in labels
+        )
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value}"
+
+
+def _sample_order(sample: tuple[Series, float]) -> tuple:
+    """Sort samples by labels, buckets of a histogram by their bounds."""
+    (name, labels), _ = sample
+    le = dict(labels).get("le")
+    return (
+        tuple(pair for pair in labels if pair[0] != "le"),
+        name,
+        float(le) if le else 0.0,
+    )
+
+
+def _escape(text: str) -> str:
+    """Escape a label value."""
+    return text.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _series_key(series: Series) -> str:
+    """Return the cache key of a series counter."""
+    digest = hashlib.sha1(
+        repr(series).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"metrics:{digest}"
+
+
+request_finished.connect(flush_metrics)
+connection_created.connect(install_timer)
+# соединения, открытые до загрузки модуля (прогрев при preload)
+for _connection in connections.all(initialized_only=True):
+    install_timer(_connection)
@@ -9,9 +9,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import sys
 from os import getenv
 from pathlib import Path
+from tempfile import gettempdir
 
 from dotenv import find_dotenv, load_dotenv
 
@@ -64,6 +66,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # метрики для Prometheus (core.metrics) - первым, чтобы учесть все
+    "core.metrics.MetricsMiddleware",
+    # состояние маршрутизации чтений на реплики (core.db.routers)
+    "core.db.routers.ReplicaRoutingMiddleware",
     # django out of the box
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,9 +104,17 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Соединения с БД:
+# - DJANGO_DB_POOL_SIZE > 0 - пул соединений на воркер (core.db.pool), общий
+#   для всех потоков воркера (подходит и для ASGI), Django возвращает
+#   соединение в пул после каждого запроса;
+# - DJANGO_DB_POOL_SIZE = 0 - постоянные соединения Django на поток
+#   (DJANGO_DB_CONN_MAX_AGE секунд, для ASGI должно быть 0).
+DB_POOL_SIZE = int(getenv("DJANGO_DB_POOL_SIZE", "4"))
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "core.db.backends.mysql",
         "NAME": getenv("MYSQL_DATABASE", ""),
         "USER": getenv("MYSQL_USER", ""),
         "PASSWORD": getenv("MYSQL_PASSWORD", ""),
@@ -109,6 +123,75 @@ DATABASES = {
         "OPTIONS": {
             "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
         },
+        "CONN_MAX_AGE": (
+            0
+            if DB_POOL_SIZE
+            else int(getenv("DJANGO_DB_CONN_MAX_AGE", "60"))
+        ),
+        # проверка постоянного соединения перед первым запросом к нему
+        "CONN_HEALTH_CHECKS": getenv("DJANGO_DB_HEALTH_CHECKS", "1") == "1",
+        "POOL": {
+            "SIZE": DB_POOL_SIZE,
+            # ожидание свободного соединения, с
+            "TIMEOUT": float(getenv("DJANGO_DB_POOL_TIMEOUT", "10")),
+            # время жизни соединения (меньше wait_timeout сервера), с
+            "MAX_LIFETIME": float(
+                getenv("DJANGO_DB_POOL_MAX_LIFETIME", "600")
+            ),
+            # соединения, простаивавшие дольше, проверяются ping, с
+            "CHECK_AFTER": float(getenv("DJANGO_DB_POOL_CHECK_AFTER", "10")),
+        },
+    }
+}
+
+# Реплики для чтения (core.db.routers): адреса через запятую, host или
+# host:port, с теми же базой и учетной записью, что и основная БД
+for number, address in enumerate(
+    filter(None, getenv("DJANGO_DB_REPLICAS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        # в тестах реплика - та же БД, что и основная
+        "TEST": {"MIRROR": "default"},
+    }
+DB_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["core.db.routers.ReplicaRouter"]
+
+# отставание реплики, после которого чтение идет с основной БД, с
+DB_REPLICA_MAX_LAG = float(getenv("DJANGO_DB_REPLICA_MAX_LAG", "5"))
+# как часто проверяется отставание реплик, с
+DB_REPLICA_CHECK_INTERVAL = float(
+    getenv("DJANGO_DB_REPLICA_CHECK_INTERVAL", "5")
+)
+
+# токен доступа к /metrics (Authorization: Bearer ...), без него метрики
+# доступны только сотрудникам (is_staff)
+METRICS_TOKEN = getenv("DJANGO_METRICS_TOKEN", "")
+# открыть /metrics без проверки доступа (только во внутренней сети)
+METRICS_PUBLIC = getenv("DJANGO_METRICS_PUBLIC", "0") == "1"
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# По умолчанию - файловый кэш: он общий для всех воркеров gunicorn в
+# контейнере. Для нескольких контейнеров подключается общий бэкенд
+# (например, django.core.cache.backends.redis.RedisCache), для тестов -
+# django.core.cache.backends.locmem.LocMemCache.
+CACHES = {
+    "default": {
+        "BACKEND": getenv("DJANGO_CACHE_BACKEND")
+        or "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": getenv("DJANGO_CACHE_LOCATION")
+        or str(Path(gettempdir()) / "planning_cache"),
+        "KEY_PREFIX": "planning",
+        # OPTIONS зависят от бэкенда, поэтому задаются JSON-строкой
+        "OPTIONS": json.loads(
+            getenv("DJANGO_CACHE_OPTIONS") or '{"MAX_ENTRIES": 10000}'
+        ),
     }
 }
 
@@ -166,3 +249,33 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 # абсолютный путь к папке, куда Django будет сохранять загруженные файлы.
 MEDIA_ROOT = BASE_DIR / "media"
+
+# Настройки сервиса планирования
+
+# максимальная ширина окна календаря (в днях)
+PLAN_CALENDAR_MAX_DAYS = int(getenv("PLAN_CALENDAR_MAX_DAYS", "366"))
+
+# максимальный размер страницы при курсорной пагинации
+PLAN_MAX_PAGE_SIZE = int(getenv("PLAN_MAX_PAGE_SIZE", "100"))
+
+# ограничения пакетной записи задач
+PLAN_BULK_MAX_TASKS = int(getenv("PLAN_BULK_MAX_TASKS", "10000"))
+PLAN_BULK_BATCH_SIZE = int(getenv("PLAN_BULK_BATCH_SIZE", "1000"))
+
+# время жизни кэша отчетов о загрузке (в секундах)
+PLAN_WORKLOAD_CACHE_TIMEOUT = int(getenv("PLAN_WORKLOAD_CACHE_TIMEOUT", "300"))
+
+# время жизни кэша карточек и деревьев проектов (в секундах)
+PLAN_PROJECT_CACHE_TIMEOUT = int(getenv("PLAN_PROJECT_CACHE_TIMEOUT", "3600"))
+
+# количество строк на странице встроенных форм админки
+PLAN_ADMIN_INLINE_PAGE_SIZE = int(getenv("PLAN_ADMIN_INLINE_PAGE_SIZE", "50"))
+
+# максимальное количество результатов полнотекстового поиска
+PLAN_SEARCH_MAX_RESULTS = int(getenv("PLAN_SEARCH_MAX_RESULTS", "100"))
+
+# количество строк, читаемых из базы за один запрос при выгрузке
+PLAN_EXPORT_CHUNK_SIZE = int(getenv("PLAN_EXPORT_CHUNK_SIZE", "2000"))
+
+# количество записей, сохраняемых в одной транзакции при загрузке
+PLAN_IMPORT_CHUNK_SIZE = int(getenv("PLAN_IMPORT_CHUNK_SIZE", "5000"))
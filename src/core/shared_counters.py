@@ -0,0 +1,19 @@
+"""Counters shared by all workers through the Django cache."""
+
+from django.core.cache import cache
+
+
+def increment(key: str, delta: int = 1) -> None:
+    """Increase a shared counter, creating it if it does not exist.
+
+    Args:
+        key (str): Cache key of the counter, prefixed by its module.
+        delta (int): Amount to add.
+    """
+    if cache.add(key, delta, timeout=None):
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # счетчик вытеснен из кэша между add и incr
+        cache.set(key, delta, timeout=None)
@@ -0,0 +1,26 @@
+"""Settings of the test run: SQLite primary database and two replicas.
+
+Run the tests from ``src/``::
+
+    python manage.py test --settings=core.test_settings
+"""
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import BASE_DIR
+
+# реплики в тестах - та же БД, что и основная (TEST MIRROR)
+DATABASES = {
+    alias: {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / f"{alias}.sqlite3",
+        "TEST": {} if alias == "default" else {"MIRROR": "default"},
+    }
+    for alias in ("default", "replica1", "replica2")
+}
+DB_REPLICAS = ["replica1", "replica2"]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("auth/", include("app_auth.urls")),
     path("api/plan/", include("app_plan.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
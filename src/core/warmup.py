@@ -0,0 +1,90 @@
+"""Warm-up of a preloaded application and memory reports of its workers.
+
+Used by the hooks of ``gunicorn.conf.py``. In the production profile the
+application is loaded and warmed up in the master process before the
+workers are forked, so every worker (including the ones restarted after
+``max_requests``) starts with the URL resolver, serializers and caches
+ready and shares their memory with the master copy-on-write.
+"""
+
+import resource
+import sys
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import get_resolver
+
+SMAPS_ROLLUP = Path("/proc/self/smaps_rollup")
+
+
+def warm_up() -> float:
+    """Initialize what the first requests would initialize lazily.
+
+    Populates the URL resolver, builds the OpenAPI schema (it introspects
+    every view and serializer), loads the content types and opens a
+    connection to the primary database. The connections are closed at the
+    end: a connection must not be shared by the forked workers.
+
+    Returns:
+        float: Duration of the warm-up in seconds.
+    """
+    # импорт здесь: модуль используется и до загрузки приложения
+    from django.contrib.contenttypes.models import ContentType
+    from drf_spectacular.drainage import GENERATOR_STATS
+    from drf_spectacular.generators import SchemaGenerator
+
+    started = time.perf_counter()
+
+    # регулярные выражения всех маршрутов компилируются при заполнении
+    get_resolver()._populate()
+
+    # предупреждения генератора схемы в логах сервера не нужны
+    with GENERATOR_STATS.silence():
+        SchemaGenerator().get_schema(request=None, public=True)
+
+    try:
+        # реплики подключаются при первом чтении: недоступная реплика не
+        # должна мешать запуску
+        connections[DEFAULT_DB_ALIAS].ensure_connection()
+        # кэш типов содержимого живет в процессе и переживает fork
+        ContentType.objects.get_for_models(*apps.get_models())
+    finally:
+        connections.close_all()
+
+    return time.perf_counter() - started
+
+
+def memory_usage() -> dict[str, int]:
+    """Return the memory of the current process in kilobytes.
+
+    Returns:
+        dict[str, int]: ``rss`` (resident), ``pss`` (proportional: shared
+            pages are divided between the processes sharing them) and
+            ``shared``. Where ``/proc`` is not available only the peak
+            ``rss`` is returned.
+    """
+    try:
+        lines = SMAPS_ROLLUP.read_text().splitlines()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS возвращает байты, Linux - килобайты
+        return {"rss": peak // 1024 if sys.platform == "darwin" else peak}
+
+    values: dict[str, int] = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        values[name] = int(value.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+    }
+
+
+def format_memory(usage: dict[str, int]) -> str:
+    """Return the memory usage as a log-friendly string."""
+    return ", ".join(
+        f"{name} {value // 1024} MB" for name, value in usage.items()
+    )